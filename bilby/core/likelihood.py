@@ -51,6 +51,30 @@ class Likelihood(object):
         """
         return self.log_likelihood() - self.noise_log_likelihood()
 
+    def log_likelihood_ratio_batch(self, parameters):
+        """Log likelihood ratio for many points
+
+        This implementation sets the parameters and evaluates
+        :meth:`log_likelihood_ratio` for each point, subclasses can provide
+        vectorised implementations.
+
+        Parameters
+        ==========
+        parameters: dict, pandas.DataFrame
+            The parameters, each value is an array with one entry per point
+
+        Returns
+        =======
+        array_like: The log likelihood ratio of each point
+        """
+        parameters = {key: np.atleast_1d(value) for key, value in dict(parameters).items()}
+        number_of_points = len(next(iter(parameters.values())))
+        log_l = np.zeros(number_of_points)
+        for ii in range(number_of_points):
+            self.parameters.update({key: value[ii] for key, value in parameters.items()})
+            log_l[ii] = self.log_likelihood_ratio()
+        return log_l
+
     @property
     def meta_data(self):
         return getattr(self, '_meta_data', None)
@@ -1,4 +1,5 @@
 import math
+from bisect import bisect_right
 from numbers import Number
 import numpy as np
 from scipy.interpolate import interp2d
@@ -266,3 +267,134 @@ def round_up_to_power_of_two(x):
 
     """
     return 2**math.ceil(np.log2(x))
+
+
+class BicubicInterp2d(object):
+    def __init__(self, x, y, z, fill_value=None):
+        """Bicubic spline interpolation on a rectilinear grid
+
+        The interpolating bicubic spline is the one used by
+        :code:`scipy.interpolate.interp2d` with :code:`kind="cubic"`. On each
+        grid cell the spline is stored through its value and first and mixed
+        derivatives at the grid points, so that it can be evaluated at
+        unsorted points with a bicubic Hermite polynomial.
+
+        Parameters
+        ==========
+        x: array_like
+            The increasing x values of the grid
+        y: array_like
+            The increasing y values of the grid
+        z: array_like
+            The values on the grid with shape :code:`(len(y), len(x))`
+        fill_value: float, optional
+            The value returned outside of the grid, if None, None is returned
+            for float input and nan for array input
+        """
+        from scipy.interpolate import RectBivariateSpline
+
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        z = np.asarray(z, dtype=float)
+        if z.shape != (len(self.y), len(self.x)):
+            raise ValueError("BicubicInterp2d requires z to have shape (len(y), len(x))")
+        if np.any(np.diff(self.x) <= 0) or np.any(np.diff(self.y) <= 0):
+            raise ValueError("BicubicInterp2d requires strictly increasing x and y")
+        self.fill_value = fill_value
+        self.x_min, self.x_max = self.x[0], self.x[-1]
+        self.y_min, self.y_max = self.y[0], self.y[-1]
+        spline = RectBivariateSpline(self.x, self.y, z.T, kx=3, ky=3, s=0)
+        self._coefficients = np.stack([
+            z.T, spline(self.x, self.y, dx=1), spline(self.x, self.y, dy=1),
+            spline(self.x, self.y, dx=1, dy=1)], axis=-1).reshape(-1, 4)
+        self._x_widths = np.diff(self.x)
+        self._y_widths = np.diff(self.y)
+        self._x_list = self.x.tolist()
+        self._y_list = self.y.tolist()
+
+    def __call__(self, x, y):
+        """Evaluate the interpolant at pairs of points
+
+        Parameters
+        ==========
+        x: float, array_like
+            The x values
+        y: float, array_like
+            The y values, arrays must have the same shape as x
+
+        Returns
+        =======
+        float, array_like: The interpolated values
+        """
+        x, y = UnsortedInterp2d._sanitize_inputs(x, y)
+        if isinstance(x, Number) and isinstance(y, Number):
+            return self._evaluate_float(x, y)
+        output = np.empty(np.shape(x))
+        bad = (x < self.x_min) | (x > self.x_max) | (y < self.y_min) | (y > self.y_max)
+        output[bad] = np.nan if self.fill_value is None else self.fill_value
+        good = ~bad
+        if np.all(good):
+            output[...] = self._evaluate_array(np.ravel(x), np.ravel(y)).reshape(output.shape)
+        elif np.any(good):
+            output[good] = self._evaluate_array(x[good], y[good])
+        return output
+
+    def _evaluate_array(self, x, y):
+        n_y = len(self.y)
+        ix = np.searchsorted(self.x, x, side="right")
+        ix -= 1
+        np.minimum(ix, len(self.x) - 2, out=ix)
+        iy = np.searchsorted(self.y, y, side="right")
+        iy -= 1
+        np.minimum(iy, n_y - 2, out=iy)
+        dx = self._x_widths[ix]
+        dy = self._y_widths[iy]
+        x_weights = _hermite_weights((x - self.x[ix]) / dx, dx)
+        y_weights = _hermite_weights((y - self.y[iy]) / dy, dy)
+        index = ix * n_y + iy
+        output = 0
+        for corner_x in range(2):
+            value_x, slope_x = x_weights[corner_x]
+            for corner_y in range(2):
+                value_y, slope_y = y_weights[corner_y]
+                coefficients = self._coefficients[index + (corner_x * n_y + corner_y)].T
+                output = output + (
+                    value_x * (value_y * coefficients[0] + slope_y * coefficients[2]) +
+                    slope_x * (value_y * coefficients[1] + slope_y * coefficients[3]))
+        return output
+
+    def _evaluate_float(self, x, y):
+        if x < self.x_min or x > self.x_max or y < self.y_min or y > self.y_max:
+            return self.fill_value
+        n_x = len(self._x_list)
+        n_y = len(self._y_list)
+        ix = min(max(bisect_right(self._x_list, x) - 1, 0), n_x - 2)
+        iy = min(max(bisect_right(self._y_list, y) - 1, 0), n_y - 2)
+        dx = self._x_list[ix + 1] - self._x_list[ix]
+        dy = self._y_list[iy + 1] - self._y_list[iy]
+        x_weights = _hermite_weights((x - self._x_list[ix]) / dx, dx)
+        y_weights = _hermite_weights((y - self._y_list[iy]) / dy, dy)
+        index = ix * n_y + iy
+        coefficients = (
+            self._coefficients[index:index + 2].tolist() +
+            self._coefficients[index + n_y:index + n_y + 2].tolist())
+        output = 0.
+        for corner_x in range(2):
+            for corner_y in range(2):
+                value, derivative_x, derivative_y, derivative_xy = coefficients[2 * corner_x + corner_y]
+                value_x, slope_x = x_weights[corner_x]
+                value_y, slope_y = y_weights[corner_y]
+                output += (
+                    value_x * (value_y * value + slope_y * derivative_y) +
+                    slope_x * (value_y * derivative_x + slope_y * derivative_xy))
+        return output
+
+
+def _hermite_weights(tt, width):
+    """Cubic Hermite basis functions for the values and derivatives at the
+    two ends of an interval, the derivative terms are scaled by the width"""
+    ss = 1 - tt
+    return (
+        ((1 + 2 * tt) * ss * ss, tt * ss * ss * width),
+        (tt * tt * (3 - 2 * tt), - tt * tt * ss * width),
+    )
@@ -85,11 +85,11 @@ def inject_signal_into_gwpy_timeseries(
 
     signal = np.zeros(len(data))
 
+    det_responses = ifo.antenna_responses(
+        parameters['ra'], parameters['dec'], parameters['geocent_time'],
+        parameters['psi'], waveform_polarizations.keys())
     for mode in waveform_polarizations.keys():
-        det_response = ifo.antenna_response(
-            parameters['ra'], parameters['dec'], parameters['geocent_time'],
-            parameters['psi'], mode)
-        signal += waveform_polarizations[mode] * det_response
+        signal += waveform_polarizations[mode] * det_responses[mode]
     time_shift = ifo.time_delay_from_geocenter(
         parameters['ra'], parameters['dec'], parameters['geocent_time'])
 
@@ -1,6 +1,10 @@
 """ Functions for adding calibration factors to waveform templates.
 """
 
+import os
+from collections import OrderedDict
+from collections.abc import Iterator
+
 import numpy as np
 from scipy.interpolate import interp1d
 
@@ -64,28 +68,80 @@ def write_calibration_file(filename, frequency_array, calibration_draws, calibra
         Location and filename to save the file
     frequency_array: array-like
         The frequency values where the calibration response was calculated
-    calibration_draws: array-like
+    calibration_draws: array-like or iterator
         Array which contains the calibration responses as a function of the frequency array specified.
         Shape is (number_of_response_curves x len(frequency_array))
+        Alternatively, an iterator of such arrays, e.g., a generator yielding blocks of curves. Each block is
+        appended to the file as it is produced so the full set of curves never needs to be held in memory.
     calibration_parameter_draws: data_frame
         Parameters used to generate the random draws of the calibration response curves
 
     """
-    import tables
+    if not isinstance(calibration_draws, Iterator):
+        calibration_draws = [np.asarray(calibration_draws)]
+    with CalibrationFileWriter(filename, frequency_array, calibration_parameter_draws) as calibration_file:
+        for block in calibration_draws:
+            calibration_file.append(block)
 
-    calibration_file = tables.open_file(filename, 'w')
-    deltaR_group = calibration_file.create_group(calibration_file.root, 'deltaR')
 
-    # Save output
-    calibration_file.create_carray(deltaR_group, 'draws_amp_rel', obj=np.abs(calibration_draws))
-    calibration_file.create_carray(deltaR_group, 'draws_phase', obj=np.angle(calibration_draws))
-    calibration_file.create_carray(deltaR_group, 'freq', obj=frequency_array)
+class CalibrationFileWriter(object):
 
-    calibration_file.close()
+    def __init__(self, filename, frequency_array, calibration_parameter_draws=None):
+        """
+        Write calibration response curves to a file in the format read by `read_calibration_file` block by block,
+        so the full set of curves never needs to be held in memory. If an error occurs inside the with statement
+        the partially written file is removed.
+
+        Parameters
+        ----------
+        filename: str
+            Location and filename to save the file
+        frequency_array: array-like
+            The frequency values where the calibration response was calculated
+        calibration_parameter_draws: data_frame
+            Parameters used to generate the random draws of the calibration response curves, these are written
+            when the file is closed
+        """
+        import tables
+
+        self.filename = filename
+        self.calibration_parameter_draws = calibration_parameter_draws
+        self._file = tables.open_file(filename, 'w')
+        deltaR_group = self._file.create_group(self._file.root, 'deltaR')
+        atom = tables.Float64Atom()
+        shape = (0, len(frequency_array))
+        self._amplitude = self._file.create_earray(deltaR_group, 'draws_amp_rel', atom=atom, shape=shape)
+        self._phase = self._file.create_earray(deltaR_group, 'draws_phase', atom=atom, shape=shape)
+        self._file.create_carray(deltaR_group, 'freq', obj=frequency_array)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self.filename)
+
+    def append(self, calibration_draws):
+        """
+        Append calibration response curves to the file
 
-    # Save calibration parameter draws
-    if calibration_parameter_draws is not None:
-        calibration_parameter_draws.to_hdf(filename, key='CalParams', data_columns=True, format='table')
+        Parameters
+        ----------
+        calibration_draws: array-like
+            The calibration responses, shape is (number_of_curves x len(frequency_array))
+        """
+        calibration_draws = np.atleast_2d(calibration_draws)
+        self._amplitude.append(np.abs(calibration_draws))
+        self._phase.append(np.angle(calibration_draws))
+
+    def close(self):
+        """ Close the file and write the calibration parameter draws """
+        self._file.close()
+        if self.calibration_parameter_draws is not None:
+            self.calibration_parameter_draws.to_hdf(self.filename, key='CalParams', data_columns=True, format='table')
 
 
 class Recalibrate(object):
@@ -128,6 +184,35 @@ class Recalibrate(object):
         self.set_calibration_parameters(**params)
         return np.ones_like(frequency_array)
 
+    def get_calibration_factors(self, frequency_array, parameters):
+        """Apply the calibration model for many sets of parameters
+
+        This evaluates :code:`get_calibration_factor` for each set of
+        parameters in turn, subclasses may overwrite this with a vectorised
+        implementation.
+
+        Parameters
+        ==========
+        frequency_array: array-like
+            The frequency values to calculate the calibration factor for.
+        parameters: dict, pandas.DataFrame
+            Mapping from sampling parameter names, including the calibration
+            parameters, to arrays of values, one per calibration curve.
+
+        Returns
+        =======
+        calibration_factors : array-like
+            The factors to multiply the strain by with shape
+            (number of curves, len(frequency_array)).
+        """
+        parameters = {key: np.atleast_1d(parameters[key]) for key in parameters}
+        number_of_curves = len(next(iter(parameters.values())))
+        calibration_factors = np.zeros((number_of_curves, len(frequency_array)), dtype=complex)
+        for ii in range(number_of_curves):
+            calibration_factors[ii] = self.get_calibration_factor(
+                frequency_array, **{key: parameters[key][ii] for key in parameters})
+        return calibration_factors
+
     def set_calibration_parameters(self, **params):
         self.params.update({key[len(self.prefix):]: params[key] for key in params
                             if self.prefix in key})
@@ -139,6 +224,7 @@ class Recalibrate(object):
 class CubicSpline(Recalibrate):
 
     name = 'cubic_spline'
+    _maximum_spline_basis_cache_entries = 8
 
     def __init__(self, prefix, minimum_frequency, maximum_frequency, n_points):
         """
@@ -168,6 +254,7 @@ class CubicSpline(Recalibrate):
         self.maximum_frequency = maximum_frequency
         self._log_spline_points = np.linspace(
             np.log10(minimum_frequency), np.log10(maximum_frequency), n_points)
+        self._spline_basis_cache = OrderedDict()
 
     @property
     def log_spline_points(self):
@@ -196,18 +283,92 @@ class CubicSpline(Recalibrate):
             The factor to multiply the strain by.
         """
         self.set_calibration_parameters(**params)
-        amplitude_parameters = [self.params['amplitude_{}'.format(ii)]
-                                for ii in range(self.n_points)]
-        delta_amplitude = interp1d(
-            self.log_spline_points, amplitude_parameters, kind='cubic',
-            bounds_error=False, fill_value=0)(np.log10(frequency_array))
-
-        phase_parameters = [
-            self.params['phase_{}'.format(ii)] for ii in range(self.n_points)]
-        delta_phase = interp1d(
-            self.log_spline_points, phase_parameters, kind='cubic',
-            bounds_error=False, fill_value=0)(np.log10(frequency_array))
+        basis = self.spline_basis_matrix(frequency_array)
+        amplitude_parameters = np.array([self.params['amplitude_{}'.format(ii)]
+                                         for ii in range(self.n_points)])
+        delta_amplitude = np.dot(basis, amplitude_parameters)
+
+        phase_parameters = np.array([
+            self.params['phase_{}'.format(ii)] for ii in range(self.n_points)])
+        delta_phase = np.dot(basis, phase_parameters)
 
         calibration_factor = (1 + delta_amplitude) * (2 + 1j * delta_phase) / (2 - 1j * delta_phase)
 
         return calibration_factor
+
+    def spline_basis_matrix(self, frequency_array):
+        """Linear map from the spline node values to the interpolated values
+
+        The cubic spline interpolant is linear in the values at the nodes,
+        so the interpolated values are :code:`basis @ node_values`.
+        Frequencies outside the range of the nodes map to zero.
+
+        The matrices for the most recently used frequency arrays are cached,
+        so repeated calls with the same frequencies only cost a comparison
+        of the frequency arrays.
+
+        Parameters
+        ==========
+        frequency_array: array-like
+            The frequency values to interpolate to.
+
+        Returns
+        =======
+        basis: array-like
+            The basis matrix with shape (len(frequency_array), n_points).
+        """
+        frequency_array = np.asarray(frequency_array)
+        if frequency_array.ndim == 1 and len(frequency_array) > 0:
+            key = (len(frequency_array), frequency_array[0], frequency_array[-1])
+        else:
+            key = None
+        if key in self._spline_basis_cache:
+            cached_frequency_array, basis = self._spline_basis_cache[key]
+            if np.array_equal(frequency_array, cached_frequency_array):
+                self._spline_basis_cache.move_to_end(key)
+                return basis
+        with np.errstate(divide='ignore'):
+            log_frequency_array = np.log10(frequency_array)
+        basis = interp1d(
+            self.log_spline_points, np.eye(self.n_points), kind='cubic', axis=0,
+            bounds_error=False, fill_value=0)(log_frequency_array)
+        if key is not None:
+            self._spline_basis_cache[key] = (frequency_array.copy(), basis)
+            self._spline_basis_cache.move_to_end(key)
+            while len(self._spline_basis_cache) > self._maximum_spline_basis_cache_entries:
+                self._spline_basis_cache.popitem(last=False)
+        return basis
+
+    def get_calibration_factors(self, frequency_array, parameters):
+        """Apply the calibration model for many sets of parameters at once
+
+        The spline interpolation is applied to all sets of node values with
+        a single matrix product with :code:`spline_basis_matrix`.
+
+        Parameters
+        ==========
+        frequency_array: array-like
+            The frequency values to calculate the calibration factor for.
+        parameters: dict, pandas.DataFrame
+            Mapping from sampling parameter names, including the calibration
+            parameters, to arrays of values, one per calibration curve.
+
+        Returns
+        =======
+        calibration_factors : array-like
+            The factors to multiply the strain by with shape
+            (number of curves, len(frequency_array)).
+        """
+        basis = self.spline_basis_matrix(frequency_array)
+        amplitude_parameters = np.array([
+            np.atleast_1d(parameters['{}amplitude_{}'.format(self.prefix, ii)])
+            for ii in range(self.n_points)])
+        phase_parameters = np.array([
+            np.atleast_1d(parameters['{}phase_{}'.format(self.prefix, ii)])
+            for ii in range(self.n_points)])
+        delta_amplitude = np.dot(amplitude_parameters.T, basis.T)
+        delta_phase = np.dot(phase_parameters.T, basis.T)
+
+        calibration_factors = (1 + delta_amplitude) * (2 + 1j * delta_phase) / (2 - 1j * delta_phase)
+
+        return calibration_factors
@@ -275,6 +275,38 @@ class Interferometer(object):
         polarization_tensor = gwutils.get_polarization_tensor(ra, dec, time, psi, mode)
         return np.einsum('ij,ij->', self.geometry.detector_tensor, polarization_tensor)
 
+    def antenna_responses(self, ra, dec, time, psi, modes=('plus', 'cross'), cached_gmst=False):
+        """
+        Calculate the antenna response for several polarization modes at once
+
+        Unlike :code:`antenna_response`, the polarization basis is only
+        constructed once for all of the modes and the sky location, time
+        and polarisation angle can be arrays.
+
+        Parameters
+        ==========
+        ra: float, array_like
+            right ascension in radians
+        dec: float, array_like
+            declination in radians
+        time: float, array_like
+            geocentric GPS time
+        psi: float, array_like
+            binary polarisation angle counter-clockwise about the direction of propagation
+        modes: iterable
+            polarisation modes (e.g. 'plus', 'cross')
+        cached_gmst: bool, optional
+            If True, use :code:`bilby.gw.utils.cached_greenwich_mean_sidereal_time`
+            rather than evaluating the sidereal time with LAL for each time
+
+        Returns
+        =======
+        dict: The antenna response for each mode with the broadcast shape of the inputs
+
+        """
+        return gwutils.get_antenna_responses(
+            self.geometry.detector_tensor, ra, dec, time, psi, modes, cached_gmst=cached_gmst)
+
     def get_detector_response(self, waveform_polarizations, parameters):
         """ Get the detector response for a particular waveform
 
@@ -289,18 +321,21 @@ class Interferometer(object):
         =======
         array_like: A 3x3 array representation of the detector response (signal observed in the interferometer)
         """
-        signal = {}
-        for mode in waveform_polarizations.keys():
-            det_response = self.antenna_response(
-                parameters['ra'],
-                parameters['dec'],
-                parameters['geocent_time'],
-                parameters['psi'], mode)
+        det_responses = self.antenna_responses(
+            parameters['ra'],
+            parameters['dec'],
+            parameters['geocent_time'],
+            parameters['psi'], waveform_polarizations.keys())
 
-            signal[mode] = waveform_polarizations[mode] * det_response
-        signal_ifo = sum(signal.values())
+        # Work only on the frequencies in the band, as a slice if the band is contiguous
+        band = self.strain_data.frequency_band
+        if band is None:
+            band = self.strain_data.frequency_mask
+        frequencies = self.strain_data.frequency_array[band]
 
-        signal_ifo *= self.strain_data.frequency_mask
+        signal_in_band = np.zeros(len(frequencies), dtype=complex)
+        for mode in waveform_polarizations.keys():
+            signal_in_band += waveform_polarizations[mode][band] * det_responses[mode]
 
         time_shift = self.time_delay_from_geocenter(
             parameters['ra'], parameters['dec'], parameters['geocent_time'])
@@ -310,12 +345,18 @@ class Interferometer(object):
         dt_geocent = parameters['geocent_time'] - self.strain_data.start_time
         dt = dt_geocent + time_shift
 
-        signal_ifo[self.strain_data.frequency_mask] = signal_ifo[self.strain_data.frequency_mask] * np.exp(
-            -1j * 2 * np.pi * dt * self.strain_data.frequency_array[self.strain_data.frequency_mask])
+        if isinstance(band, slice) and len(frequencies) > 1:
+            signal_in_band *= gwutils.time_shift_phasor(
+                dt, frequencies[0], (frequencies[-1] - frequencies[0]) / (len(frequencies) - 1),
+                len(frequencies))
+        else:
+            signal_in_band *= np.exp(-1j * 2 * np.pi * dt * frequencies)
+
+        signal_in_band *= self.calibration_model.get_calibration_factor(
+            frequencies, prefix='recalib_{}_'.format(self.name), **parameters)
 
-        signal_ifo[self.strain_data.frequency_mask] *= self.calibration_model.get_calibration_factor(
-            self.strain_data.frequency_array[self.strain_data.frequency_mask],
-            prefix='recalib_{}_'.format(self.name), **parameters)
+        signal_ifo = np.zeros(len(self.strain_data.frequency_array), dtype=complex)
+        signal_ifo[band] = signal_in_band
 
         return signal_ifo
 
@@ -509,7 +550,7 @@ class Interferometer(object):
                        "Use Interferometer.geometry.unit_vector_along_arm instead.")
         return self.geometry.unit_vector_along_arm(arm)
 
-    def time_delay_from_geocenter(self, ra, dec, time):
+    def time_delay_from_geocenter(self, ra, dec, time, cached_gmst=False):
         """
         Calculate the time delay from the geocenter for the interferometer.
 
@@ -517,18 +558,22 @@ class Interferometer(object):
 
         Parameters
         ==========
-        ra: float
+        ra: float, array_like
             right ascension of source in radians
-        dec: float
+        dec: float, array_like
             declination of source in radians
-        time: float
+        time: float, array_like
             GPS time
+        cached_gmst: bool, optional
+            If True, use :code:`bilby.gw.utils.cached_greenwich_mean_sidereal_time`
+            rather than evaluating the sidereal time with LAL for each time
 
         Returns
         =======
-        float: The time delay from geocenter in seconds
+        float, array_like: The time delay from geocenter in seconds
         """
-        return gwutils.time_delay_geocentric(self.geometry.vertex, np.array([0, 0, 0]), ra, dec, time)
+        return gwutils.time_delay_geocentric(
+            self.geometry.vertex, np.array([0, 0, 0]), ra, dec, time, cached_gmst=cached_gmst)
 
     def vertex_position_geocentric(self):
         """
@@ -46,6 +46,7 @@ class InterferometerStrainData(object):
 
         self._frequency_mask_updated = False
         self._frequency_mask = None
+        self._frequency_band = None
         self._frequency_domain_strain = None
         self._time_domain_strain = None
         self._channel = None
@@ -159,6 +160,30 @@ class InterferometerStrainData(object):
         self._frequency_mask = mask
         self._frequency_mask_updated = True
 
+    @property
+    def frequency_band(self):
+        """ Contiguous slice of the frequency array selected by the frequency mask
+
+        Slicing with this rather than indexing with the boolean mask gives
+        views rather than copies of the in-band data.
+
+        Returns
+        =======
+        band: slice, None
+            The slice equivalent to the frequency mask, None if the mask is not
+            a single contiguous band, e.g., if there are notches.
+        """
+        mask = self.frequency_mask
+        band = self._frequency_band
+        if band is not None and np.count_nonzero(mask) == band.stop - band.start and mask[band].all():
+            return band
+        indices = np.flatnonzero(mask)
+        if len(indices) > 0 and indices[-1] - indices[0] + 1 == len(indices):
+            self._frequency_band = slice(indices[0], indices[-1] + 1)
+        else:
+            self._frequency_band = None
+        return self._frequency_band
+
     @property
     def alpha(self):
         return 2 * self.roll_off / self.duration
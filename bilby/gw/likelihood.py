@@ -3,25 +3,34 @@ import os
 import json
 import copy
 import math
+import hashlib
+import tempfile
+import multiprocessing
 
 import attr
 import numpy as np
 import pandas as pd
+import scipy.fft
+import scipy.linalg
 from scipy.special import logsumexp
 
 from ..core.likelihood import Likelihood
 from ..core.utils import BilbyJsonEncoder, decode_bilby_json
 from ..core.utils import (
-    logger, UnsortedInterp2d, create_frequency_series, create_time_series,
+    logger, BicubicInterp2d, create_frequency_series, create_time_series,
     speed_of_light, solar_mass, radius_of_earth, gravitational_constant,
     round_up_to_power_of_two)
 from ..core.prior import Interped, Prior, Uniform, PriorDict, DeltaFunction
 from .detector import InterferometerList, get_empty_interferometer, calibration
 from .prior import BBHPriorDict, CBCPriorDict, Cosmological
+from .conversion import (
+    component_masses_to_chirp_mass, chirp_mass_and_mass_ratio_to_total_mass,
+    total_mass_and_mass_ratio_to_component_masses
+)
 from .source import lal_binary_black_hole
 from .utils import (
     noise_weighted_inner_product, build_roq_weights, zenith_azimuth_to_ra_dec,
-    ln_i0
+    ln_i0, time_shift_phasor
 )
 from .waveform_generator import WaveformGenerator
 
@@ -71,10 +80,14 @@ class GravitationalWaveTransient(Likelihood):
         If a dict, dictionary containing the lookup_table, distance_array,
         (distance) prior_array, and reference_distance used to construct
         the table.
-        If a string the name of a file containing these quantities.
+        If a string the name of a file containing these quantities, or of a
+        directory in which the table is stored with a file name derived from
+        a hash of the distance grid, distance prior, reference distance and
+        phase marginalization, so that analyses can share a table.
         The lookup table is stored after construction in either the
-        provided string or a default location:
-        '.distance_marginalization_lookup_dmin{}_dmax{}_n{}.npz'
+        provided location or the directory given by the
+        :code:`BILBY_CACHE_DIR` environment variable, defaulting to the
+        current directory.
     calibration_lookup_table: dict, optional
         If a dict, contains the arrays over which to marginalize for each interferometer or the filepaths of the
         calibration files.
@@ -109,6 +122,28 @@ class GravitationalWaveTransient(Likelihood):
           Earth's center, this is the default
         - e.g., :code:`H1`: sample in the time of arrival at H1
 
+    time_marginalization_zero_padding: float, optional
+        If given, the time-marginalized likelihood is evaluated on a grid with
+        this many times more points than the number of in-band frequencies,
+        rounded up to an efficient FFT length and limited to the full grid.
+        Only the in-band frequencies are transformed. Values of at least two
+        are recommended. By default the grid spacing is
+        :code:`2 / sampling_frequency`.
+    fft_workers: int, optional
+        The number of workers passed to :code:`scipy.fft` when marginalizing
+        over time, default is 1.
+    distance_marginalization_npool: int, optional
+        The number of processes used to build the distance marginalization
+        lookup table, default is 1.
+    calibration_svd_tolerance: float, optional
+        If given, the calibration response curves of each interferometer are
+        compressed with a singular value decomposition, keeping the fewest
+        singular vectors with a relative (Frobenius norm) reconstruction
+        error below this tolerance. The cost of the calibration-marginalized
+        likelihood then scales with the number of singular vectors rather
+        than the number of response curves. The reconstruction errors are
+        stored in :code:`calibration_reconstruction_errors`.
+
     Returns
     =======
     Likelihood: `bilby.core.likelihood.Likelihood`
@@ -126,17 +161,31 @@ class GravitationalWaveTransient(Likelihood):
         optimal_snr_squared_array = attr.ib()
         d_inner_h_squared_tc_array = attr.ib()
 
+    @attr.s
+    class _WhitenedData:
+        fingerprint = attr.ib()
+        weighted_data = attr.ib()
+        inverse_power_spectral_density = attr.ib()
+        weighted_data_conjugate = attr.ib()
+        time_marginalization_indices = attr.ib()
+
     def __init__(
         self, interferometers, waveform_generator, time_marginalization=False,
         distance_marginalization=False, phase_marginalization=False, calibration_marginalization=False, priors=None,
         distance_marginalization_lookup_table=None, calibration_lookup_table=None,
         number_of_response_curves=1000, starting_index=0, jitter_time=True, reference_frame="sky",
-        time_reference="geocenter"
+        time_reference="geocenter", time_marginalization_zero_padding=None, fft_workers=1,
+        distance_marginalization_npool=1, calibration_svd_tolerance=None
     ):
 
         self.waveform_generator = waveform_generator
         super(GravitationalWaveTransient, self).__init__(dict())
         self.interferometers = InterferometerList(interferometers)
+        self._whitened_data_cache = dict()
+        self.time_marginalization_zero_padding = time_marginalization_zero_padding
+        self.fft_workers = fft_workers
+        self.distance_marginalization_npool = distance_marginalization_npool
+        self.calibration_svd_tolerance = calibration_svd_tolerance
         self.time_marginalization = time_marginalization
         self.distance_marginalization = distance_marginalization
         self.phase_marginalization = phase_marginalization
@@ -186,9 +235,8 @@ class GravitationalWaveTransient(Likelihood):
             self._distance_array = np.linspace(
                 self.priors['luminosity_distance'].minimum,
                 self.priors['luminosity_distance'].maximum, int(1e4))
-            self.distance_prior_array = np.array(
-                [self.priors['luminosity_distance'].prob(distance)
-                 for distance in self._distance_array])
+            self.distance_prior_array = np.asarray(
+                self.priors['luminosity_distance'].prob(self._distance_array), dtype=float)
             self._ref_dist = self.priors['luminosity_distance'].rescale(0.5)
             self._setup_distance_marginalization(
                 distance_marginalization_lookup_table)
@@ -244,16 +292,28 @@ class GravitationalWaveTransient(Likelihood):
         interferometer: bilby.gw.detector.Interferometer
             The bilby interferometer object
 
+        Returns
+        =======
+        calculated_snrs: _CalculatedSNRs
+            When marginalizing over time the :code:`d_inner_h_array` is
+            evaluated at the times within the support of the time prior,
+            :code:`self._times[self._time_window]`, with a leading dimension
+            over the response curves when also marginalizing over calibration.
+
         """
         signal = interferometer.get_detector_response(
             waveform_polarizations, self.parameters)
         _mask = interferometer.frequency_mask
+        whitened_data = self._get_whitened_data(interferometer)
 
         if 'recalib_index' in self.parameters:
             signal[_mask] *= self.calibration_draws[interferometer.name][int(self.parameters['recalib_index'])]
 
-        d_inner_h = interferometer.inner_product(signal=signal)
-        optimal_snr_squared = interferometer.optimal_snr_squared(signal=signal)
+        in_band_signal = signal[_mask]
+        d_inner_h = np.vdot(in_band_signal, whitened_data.weighted_data)
+        optimal_snr_squared_integrand = (
+            in_band_signal.real ** 2 + in_band_signal.imag ** 2) * whitened_data.inverse_power_spectral_density
+        optimal_snr_squared = np.sum(optimal_snr_squared_integrand)
         complex_matched_filter_snr = d_inner_h / (optimal_snr_squared**0.5)
 
         d_inner_h_array = None
@@ -261,38 +321,37 @@ class GravitationalWaveTransient(Likelihood):
 
         if self.time_marginalization and self.calibration_marginalization:
 
-            d_inner_h_integrand = np.tile(
-                interferometer.frequency_domain_strain.conjugate() * signal /
-                interferometer.power_spectral_density_array, (self.number_of_response_curves, 1)).T
-
-            d_inner_h_integrand[_mask] *= self.calibration_draws[interferometer.name].T
+            weights, basis = self._calibration_draws_factors[interferometer.name]
+            indices = whitened_data.time_marginalization_indices
+            d_inner_h_integrand = np.zeros(
+                (len(basis), self._time_marginalization_fft_length), dtype=complex)
+            d_inner_h_integrand[:, indices % self._time_marginalization_fft_length] = \
+                basis[:, :len(indices)] * \
+                (in_band_signal[:len(indices)] * whitened_data.weighted_data_conjugate[indices])
 
-            d_inner_h_array =\
-                4 / self.waveform_generator.duration * np.fft.fft(
-                    d_inner_h_integrand[0:-1], axis=0).T
+            d_inner_h_array = scipy.fft.fft(
+                d_inner_h_integrand, axis=1, workers=self.fft_workers)[:, self._time_window]
+            if weights is not None:
+                d_inner_h_array = np.dot(weights, d_inner_h_array)
 
-            optimal_snr_squared_integrand = 4. / self.waveform_generator.duration *\
-                np.abs(signal)**2 / interferometer.power_spectral_density_array
-            optimal_snr_squared_array = np.dot(optimal_snr_squared_integrand[_mask],
-                                               self.calibration_abs_draws[interferometer.name].T)
+            optimal_snr_squared_array = self._calibration_product(
+                self._calibration_abs_draws_factors[interferometer.name], optimal_snr_squared_integrand)
 
         elif self.time_marginalization and not self.calibration_marginalization:
-            d_inner_h_array =\
-                4 / self.waveform_generator.duration * np.fft.fft(
-                    signal[0:-1] *
-                    interferometer.frequency_domain_strain.conjugate()[0:-1] /
-                    interferometer.power_spectral_density_array[0:-1])
+            indices = whitened_data.time_marginalization_indices
+            d_inner_h_integrand = np.zeros(self._time_marginalization_fft_length, dtype=complex)
+            d_inner_h_integrand[indices % self._time_marginalization_fft_length] = \
+                in_band_signal[:len(indices)] * whitened_data.weighted_data_conjugate[indices]
+            d_inner_h_array = scipy.fft.fft(
+                d_inner_h_integrand, workers=self.fft_workers)[self._time_window]
 
         elif self.calibration_marginalization and ('recalib_index' not in self.parameters):
-            d_inner_h_integrand = 4. / self.waveform_generator.duration * \
-                interferometer.frequency_domain_strain.conjugate() * signal / \
-                interferometer.power_spectral_density_array
-            d_inner_h_array = np.dot(d_inner_h_integrand[_mask], self.calibration_draws[interferometer.name].T)
+            d_inner_h_integrand = in_band_signal * whitened_data.weighted_data.conjugate()
+            d_inner_h_array = self._calibration_product(
+                self._calibration_draws_factors[interferometer.name], d_inner_h_integrand)
 
-            optimal_snr_squared_integrand = 4. / self.waveform_generator.duration *\
-                np.abs(signal)**2 / interferometer.power_spectral_density_array
-            optimal_snr_squared_array = np.dot(optimal_snr_squared_integrand[_mask],
-                                               self.calibration_abs_draws[interferometer.name].T)
+            optimal_snr_squared_array = self._calibration_product(
+                self._calibration_abs_draws_factors[interferometer.name], optimal_snr_squared_integrand)
 
         return self._CalculatedSNRs(
             d_inner_h=d_inner_h, optimal_snr_squared=optimal_snr_squared,
@@ -301,6 +360,66 @@ class GravitationalWaveTransient(Likelihood):
             optimal_snr_squared_array=optimal_snr_squared_array,
             d_inner_h_squared_tc_array=None)
 
+    @staticmethod
+    def _calibration_product(factors, integrand):
+        """ The product of the (compressed) calibration draws and an in-band
+        integrand, one value per response curve """
+        weights, basis = factors
+        product = np.dot(basis, integrand)
+        if weights is not None:
+            product = np.dot(weights, product)
+        return product
+
+    def _get_whitened_data(self, interferometer):
+        """ The noise-weighted data of an interferometer
+
+        The data divided by the power spectral density and scaled by
+        :code:`4 / duration` is computed once and stored, it is recomputed
+        when the strain data, power spectral density or frequency mask of the
+        interferometer are set to new values.
+
+        Parameters
+        ==========
+        interferometer: bilby.gw.detector.Interferometer
+            The interferometer
+
+        Returns
+        =======
+        whitened_data: _WhitenedData
+            The in-band noise-weighted data, :code:`weighted_data`, in-band
+            inverse power spectral density,
+            :code:`inverse_power_spectral_density`, the full-length
+            complex conjugate of the noise-weighted data,
+            :code:`weighted_data_conjugate`, and the in-band frequency
+            indices transformed when marginalizing over time,
+            :code:`time_marginalization_indices`.
+        """
+        strain_data = interferometer.strain_data
+        if strain_data._frequency_domain_strain is None:
+            strain_data.frequency_domain_strain
+        power_spectral_density = interferometer.power_spectral_density
+        fingerprint = (
+            (interferometer, strain_data._frequency_domain_strain, strain_data.frequency_array,
+             strain_data.frequency_mask, power_spectral_density,
+             getattr(power_spectral_density, 'psd_array', None)),
+            (strain_data.window_factor, self.waveform_generator.duration))
+        whitened_data = self._whitened_data_cache.get(interferometer.name)
+        if whitened_data is not None and fingerprint[1] == whitened_data.fingerprint[1] and all(
+                new is old for new, old in zip(fingerprint[0], whitened_data.fingerprint[0])):
+            return whitened_data
+        mask = strain_data.frequency_mask
+        power_spectral_density_array = interferometer.power_spectral_density_array
+        weighted_data_conjugate = 4 / self.waveform_generator.duration * (
+            interferometer.frequency_domain_strain.conjugate() / power_spectral_density_array)
+        whitened_data = self._WhitenedData(
+            fingerprint=fingerprint,
+            weighted_data=weighted_data_conjugate[mask].conjugate(),
+            inverse_power_spectral_density=4 / self.waveform_generator.duration / power_spectral_density_array[mask],
+            weighted_data_conjugate=weighted_data_conjugate,
+            time_marginalization_indices=np.flatnonzero(mask[:-1]))
+        self._whitened_data_cache[interferometer.name] = whitened_data
+        return whitened_data
+
     def _check_marginalized_prior_is_set(self, key):
         if key in self.priors and self.priors[key].is_fixed:
             raise ValueError(
@@ -372,16 +491,14 @@ class GravitationalWaveTransient(Likelihood):
                 self.parameters['geocent_time'] += self.parameters['time_jitter']
 
             d_inner_h_array = np.zeros(
-                (self.number_of_response_curves, len(self.interferometers.frequency_array[0:-1])),
+                (self.number_of_response_curves, len(self._time_window)),
                 dtype=np.complex128)
             optimal_snr_squared_array = np.zeros(self.number_of_response_curves, dtype=np.complex128)
 
         elif self.time_marginalization:
             if self.jitter_time:
                 self.parameters['geocent_time'] += self.parameters['time_jitter']
-            d_inner_h_array = np.zeros(
-                len(self.interferometers.frequency_array[0:-1]),
-                dtype=np.complex128)
+            d_inner_h_array = np.zeros(len(self._time_window), dtype=np.complex128)
 
         elif self.calibration_marginalization:
             d_inner_h_array = np.zeros(self.number_of_response_curves, dtype=np.complex128)
@@ -434,6 +551,158 @@ class GravitationalWaveTransient(Likelihood):
 
         return float(log_l.real)
 
+    def log_likelihood_ratio_batch(self, parameters, block_size=64, cached_gmst=False):
+        """ Log likelihood ratio for many points
+
+        The waveforms are generated for each point, the detector responses,
+        inner products and the time, distance and phase marginalizations are
+        computed for blocks of points with two-dimensional array operations.
+        Calibration marginalization and subclasses with a different
+        `calculate_snrs` evaluate :meth:`log_likelihood_ratio` for each point.
+
+        Parameters
+        ==========
+        parameters: dict, pandas.DataFrame
+            The parameters, each value is an array with one entry per point
+        block_size: int
+            The number of points processed together, this limits the memory
+            of the arrays of detector responses
+        cached_gmst: bool
+            If True, the sidereal times of the detector responses are given by
+            :code:`bilby.gw.utils.cached_greenwich_mean_sidereal_time`, which
+            agrees with LAL to ~1e-9 radians, rather than by LAL for each point
+
+        Returns
+        =======
+        array_like: The log likelihood ratio of each point
+        """
+        if (self.calibration_marginalization or 'recalib_index' in parameters or
+                type(self).calculate_snrs is not GravitationalWaveTransient.calculate_snrs or
+                type(self).log_likelihood_ratio is not GravitationalWaveTransient.log_likelihood_ratio):
+            return super(GravitationalWaveTransient, self).log_likelihood_ratio_batch(parameters)
+        parameters = {key: np.atleast_1d(value) for key, value in dict(parameters).items()}
+        number_of_points = len(next(iter(parameters.values())))
+        log_l = np.zeros(number_of_points)
+        for start in range(0, number_of_points, block_size):
+            block = range(start, min(start + block_size, number_of_points))
+            log_l[block.start:block.stop] = self._log_likelihood_ratio_block(
+                [{key: value[ii] for key, value in parameters.items()} for ii in block],
+                cached_gmst=cached_gmst)
+        return log_l
+
+    def _log_likelihood_ratio_block(self, points, cached_gmst=False):
+        """ Vectorised log likelihood ratio for a list of parameter dicts """
+        points = list(points)
+        number_of_points = len(points)
+        log_l = np.full(number_of_points, np.nan_to_num(-np.inf))
+        polarizations = dict()
+        valid = np.zeros(number_of_points, dtype=bool)
+        sky_parameters = dict(
+            ra=np.zeros(number_of_points), dec=np.zeros(number_of_points),
+            geocent_time=np.zeros(number_of_points), psi=np.zeros(number_of_points))
+        for ii, point in enumerate(points):
+            self.parameters.update(point)
+            waveform_polarizations = \
+                self.waveform_generator.frequency_domain_strain(self.parameters)
+            if waveform_polarizations is None:
+                continue
+            valid[ii] = True
+            for mode in waveform_polarizations:
+                if mode not in polarizations:
+                    polarizations[mode] = np.zeros(
+                        (number_of_points, len(waveform_polarizations[mode])), dtype=complex)
+                polarizations[mode][ii] = waveform_polarizations[mode]
+            self.parameters.update(self.get_sky_frame_parameters())
+            for key in sky_parameters:
+                sky_parameters[key][ii] = self.parameters[key]
+            points[ii] = self.parameters.copy()
+        if not np.any(valid):
+            return log_l
+        points = [point for point, is_valid in zip(points, valid) if is_valid]
+        polarizations = {mode: polarizations[mode][valid] for mode in polarizations}
+        sky_parameters = {key: value[valid] for key, value in sky_parameters.items()}
+        if self.time_marginalization and self.jitter_time:
+            time_jitter = np.array([point['time_jitter'] for point in points])
+            sky_parameters['geocent_time'] = sky_parameters['geocent_time'] + time_jitter
+
+        d_inner_h = 0.
+        optimal_snr_squared = 0.
+        d_inner_h_array = 0.
+        for interferometer in self.interferometers:
+            signal = self._batch_detector_response(
+                polarizations, interferometer, sky_parameters, points, cached_gmst)
+            whitened_data = self._get_whitened_data(interferometer)
+            d_inner_h = d_inner_h + np.dot(signal.conjugate(), whitened_data.weighted_data)
+            optimal_snr_squared = optimal_snr_squared + np.dot(
+                signal.real ** 2 + signal.imag ** 2, whitened_data.inverse_power_spectral_density)
+            if self.time_marginalization:
+                indices = whitened_data.time_marginalization_indices
+                integrand = np.zeros((len(points), self._time_marginalization_fft_length), dtype=complex)
+                integrand[:, indices % self._time_marginalization_fft_length] = \
+                    signal[:, :len(indices)] * whitened_data.weighted_data_conjugate[indices]
+                d_inner_h_array = d_inner_h_array + scipy.fft.fft(
+                    integrand, axis=1, workers=self.fft_workers)[:, self._time_window]
+
+        distance = np.array([point.get('luminosity_distance', np.nan) for point in points])
+        if self.time_marginalization:
+            log_l_tc_array = self._batch_marginalized_likelihood(
+                d_inner_h_array, optimal_snr_squared[:, np.newaxis], distance[:, np.newaxis])
+            times = self._times[self._time_window]
+            if self.jitter_time:
+                times = times + time_jitter[:, np.newaxis]
+            time_prior_array = self.priors['geocent_time'].prob(times) * self._delta_tc
+            log_l[valid] = logsumexp(
+                log_l_tc_array, b=np.broadcast_to(time_prior_array, log_l_tc_array.shape), axis=1)
+        else:
+            log_l[valid] = self._batch_marginalized_likelihood(
+                d_inner_h, optimal_snr_squared, distance)
+        return log_l
+
+    def _batch_marginalized_likelihood(self, d_inner_h, h_inner_h, distance):
+        """ Distance, phase or un-marginalized likelihood of arrays of
+        inner products, the arrays are broadcast against each other """
+        if self.distance_marginalization:
+            d_inner_h_ref = d_inner_h * distance / self._ref_dist
+            h_inner_h_ref = h_inner_h.real * distance ** 2 / self._ref_dist ** 2
+            if self.phase_marginalization:
+                d_inner_h_ref = np.abs(d_inner_h_ref)
+            else:
+                d_inner_h_ref = np.real(d_inner_h_ref)
+            d_inner_h_ref, h_inner_h_ref = np.broadcast_arrays(d_inner_h_ref, h_inner_h_ref)
+            return self._interp_dist_margd_loglikelihood(
+                np.ascontiguousarray(d_inner_h_ref), np.ascontiguousarray(h_inner_h_ref))
+        elif self.phase_marginalization:
+            return ln_i0(abs(d_inner_h)) - h_inner_h.real / 2
+        else:
+            return np.real(d_inner_h) - h_inner_h.real / 2
+
+    def _batch_detector_response(self, polarizations, interferometer, sky_parameters, points, cached_gmst=False):
+        """ In-band detector responses for a block of points
+
+        Equivalent to :meth:`bilby.gw.detector.Interferometer.get_detector_response`
+        evaluated for each point, only the frequencies in the frequency mask
+        are returned.
+        """
+        mask = interferometer.frequency_mask
+        frequencies = interferometer.frequency_array[mask]
+        signal = 0
+        responses = interferometer.antenna_responses(
+            sky_parameters['ra'], sky_parameters['dec'],
+            sky_parameters['geocent_time'], sky_parameters['psi'], polarizations.keys(),
+            cached_gmst=cached_gmst)
+        for mode in polarizations:
+            signal = signal + polarizations[mode][:, mask] * responses[mode][:, np.newaxis]
+        time_shift = interferometer.time_delay_from_geocenter(
+            sky_parameters['ra'], sky_parameters['dec'], sky_parameters['geocent_time'],
+            cached_gmst=cached_gmst)
+        dt = (sky_parameters['geocent_time'] - interferometer.strain_data.start_time) + time_shift
+        signal *= np.exp(-1j * 2 * np.pi * np.outer(dt, frequencies))
+        for ii, point in enumerate(points):
+            point = dict(point, **{key: sky_parameters[key][ii] for key in sky_parameters})
+            signal[ii] *= interferometer.calibration_model.get_calibration_factor(
+                frequencies, prefix='recalib_{}_'.format(interferometer.name), **point)
+        return signal
+
     def generate_posterior_sample_from_marginalized_likelihood(self):
         """
         Reconstruct the distance posterior from a run which used a likelihood
@@ -709,6 +978,9 @@ class GravitationalWaveTransient(Likelihood):
             return d_inner_h - h_inner_h / 2
 
     def time_marginalized_likelihood(self, d_inner_h_tc_array, h_inner_h):
+        """ The likelihood marginalized over time, the
+        :code:`d_inner_h_tc_array` is evaluated at the times within the support
+        of the time prior, :code:`self._times[self._time_window]` """
         if self.distance_marginalization:
             log_l_tc_array = self.distance_marginalized_likelihood(
                 d_inner_h=d_inner_h_tc_array, h_inner_h=h_inner_h)
@@ -718,16 +990,19 @@ class GravitationalWaveTransient(Likelihood):
                 h_inner_h=h_inner_h)
         else:
             log_l_tc_array = np.real(d_inner_h_tc_array) - h_inner_h / 2
-        times = self._times
+        times = self._times[self._time_window]
         if self.jitter_time:
-            times = self._times + self.parameters['time_jitter']
+            times = times + self.parameters['time_jitter']
         time_prior_array = self.priors['geocent_time'].prob(times) * self._delta_tc
         return logsumexp(log_l_tc_array, b=time_prior_array)
 
     def time_and_calibration_marginalized_likelihood(self, d_inner_h_array, h_inner_h):
-        times = self._times
+        """ The likelihood marginalized over time and calibration, the
+        :code:`d_inner_h_array` is evaluated at the times within the support of
+        the time prior, :code:`self._times[self._time_window]` """
+        times = self._times[self._time_window]
         if self.jitter_time:
-            times = self._times + self.parameters['time_jitter']
+            times = times + self.parameters['time_jitter']
 
         _time_prior = self.priors['geocent_time']
         time_mask = np.logical_and((times >= _time_prior.minimum), (times <= _time_prior.maximum))
@@ -739,7 +1014,8 @@ class GravitationalWaveTransient(Likelihood):
 
         if self.distance_marginalization:
             log_l_array = self.distance_marginalized_likelihood(
-                d_inner_h=d_inner_h_array, h_inner_h=h_inner_h)
+                d_inner_h=d_inner_h_array,
+                h_inner_h=np.outer(h_inner_h, np.ones(np.shape(d_inner_h_array)[1])))
         elif self.phase_marginalization:
             log_l_array = self.phase_marginalized_likelihood(
                 d_inner_h=d_inner_h_array,
@@ -849,24 +1125,38 @@ class GravitationalWaveTransient(Likelihood):
                 self._create_lookup_table()
         else:
             self._create_lookup_table()
-        self._interp_dist_margd_loglikelihood = UnsortedInterp2d(
+        self._interp_dist_margd_loglikelihood = BicubicInterp2d(
             self._d_inner_h_ref_array, self._optimal_snr_squared_ref_array,
-            self._dist_margd_loglikelihood_array, kind='cubic', fill_value=-np.inf)
+            self._dist_margd_loglikelihood_array, fill_value=-np.inf)
 
     @property
     def cached_lookup_table_filename(self):
         if self._lookup_table_filename is None:
-            self._lookup_table_filename = (
-                '.distance_marginalization_lookup.npz')
+            self._lookup_table_filename = os.path.join(
+                os.environ.get('BILBY_CACHE_DIR', '.'), self._hashed_lookup_table_filename)
         return self._lookup_table_filename
 
     @cached_lookup_table_filename.setter
     def cached_lookup_table_filename(self, filename):
         if isinstance(filename, str):
-            if filename[-4:] != '.npz':
+            if os.path.isdir(filename):
+                filename = os.path.join(filename, self._hashed_lookup_table_filename)
+            elif filename[-4:] != '.npz':
                 filename += '.npz'
         self._lookup_table_filename = filename
 
+    @property
+    def _hashed_lookup_table_filename(self):
+        """ File name identifying the distance marginalization lookup table by
+        a hash of the quantities used to construct it """
+        lookup_hash = hashlib.sha256()
+        for array in [self._distance_array, self.distance_prior_array]:
+            lookup_hash.update(np.ascontiguousarray(array, dtype=float).tobytes())
+        lookup_hash.update(repr((
+            float(self._ref_dist), bool(self.phase_marginalization),
+            self._lookup_table_shape)).encode())
+        return '.distance_marginalization_lookup_{}.npz'.format(lookup_hash.hexdigest()[:16])
+
     def load_lookup_table(self, filename):
         if os.path.exists(filename):
             try:
@@ -889,12 +1179,24 @@ class GravitationalWaveTransient(Likelihood):
         return None
 
     def cache_lookup_table(self):
-        np.savez(self.cached_lookup_table_filename,
-                 distance_array=self._distance_array,
-                 prior_array=self.distance_prior_array,
-                 lookup_table=self._dist_margd_loglikelihood_array,
-                 reference_distance=self._ref_dist,
-                 phase_marginalization=self.phase_marginalization)
+        """ Write the lookup table, the file is written to a temporary file
+        and then renamed so that concurrent analyses never read a partial
+        table """
+        filename = self.cached_lookup_table_filename
+        directory = os.path.dirname(os.path.abspath(filename))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=directory, suffix='.npz', delete=False) as temporary_file:
+                np.savez(temporary_file,
+                         distance_array=self._distance_array,
+                         prior_array=self.distance_prior_array,
+                         lookup_table=self._dist_margd_loglikelihood_array,
+                         reference_distance=self._ref_dist,
+                         phase_marginalization=self.phase_marginalization)
+            os.chmod(temporary_file.name, 0o644)
+            os.replace(temporary_file.name, filename)
+        except OSError as e:
+            logger.warning('Unable to cache the distance marginalisation lookup table: {}'.format(e))
 
     def _test_cached_lookup_table(self, loaded_file):
         pairs = dict(
@@ -905,31 +1207,32 @@ class GravitationalWaveTransient(Likelihood):
         for key in pairs:
             if key not in loaded_file:
                 return False, key
-            elif not np.array_equal(np.atleast_1d(loaded_file[key]),
-                                    np.atleast_1d(pairs[key])):
+            loaded = np.atleast_1d(loaded_file[key])
+            expected = np.atleast_1d(pairs[key])
+            if loaded.shape != expected.shape or not np.allclose(loaded, expected, rtol=1e-10, atol=0):
                 return False, key
         return True, None
 
+    _lookup_table_shape = (400, 800)
+
     def _create_lookup_table(self):
         """ Make the lookup table """
-        from tqdm.auto import tqdm
         logger.info('Building lookup table for distance marginalisation.')
 
-        self._dist_margd_loglikelihood_array = np.zeros((400, 800))
+        self._dist_margd_loglikelihood_array = np.zeros(self._lookup_table_shape)
         scaling = self._ref_dist / self._distance_array
-        d_inner_h_array_full = np.outer(self._d_inner_h_ref_array, scaling)
-        h_inner_h_array_full = np.outer(self._optimal_snr_squared_ref_array, scaling ** 2)
-        if self.phase_marginalization:
-            d_inner_h_array_full = ln_i0(abs(d_inner_h_array_full))
         prior_term = self.distance_prior_array * self._delta_distance
-        for ii, optimal_snr_squared_array in tqdm(
-            enumerate(h_inner_h_array_full), total=len(self._optimal_snr_squared_ref_array)
-        ):
-            for jj, d_inner_h_array in enumerate(d_inner_h_array_full):
-                self._dist_margd_loglikelihood_array[ii][jj] = logsumexp(
-                    d_inner_h_array - optimal_snr_squared_array / 2,
-                    b=prior_term
-                )
+        npool = self.distance_marginalization_npool
+        blocks = [
+            (block, self._d_inner_h_ref_array, scaling, prior_term, self.phase_marginalization)
+            for block in np.array_split(self._optimal_snr_squared_ref_array, max(npool, 1))]
+        if npool > 1:
+            logger.info('Using a pool with size {} for the lookup table'.format(npool))
+            with multiprocessing.Pool(processes=npool) as pool:
+                rows = pool.map(_distance_marginalized_lookup_rows, blocks)
+        else:
+            rows = [_distance_marginalized_lookup_rows(block) for block in blocks]
+        self._dist_margd_loglikelihood_array = np.vstack(rows)
         log_norm = logsumexp(
             0 / self._distance_array, b=self.distance_prior_array * self._delta_distance
         )
@@ -953,14 +1256,26 @@ class GravitationalWaveTransient(Likelihood):
         return ln_i0(xx) + xx
 
     def _setup_time_marginalization(self):
-        self._delta_tc = 2 / self.waveform_generator.sampling_frequency
+        number_of_times = int(self.interferometers.duration / 2 * self.waveform_generator.sampling_frequency)
+        if self.time_marginalization_zero_padding is not None:
+            in_band = np.flatnonzero(np.any(
+                [interferometer.frequency_mask[:-1] for interferometer in self.interferometers], axis=0))
+            number_of_times = min(number_of_times, scipy.fft.next_fast_len(
+                int(np.ceil(self.time_marginalization_zero_padding * (in_band[-1] - in_band[0] + 1)))))
+        self._time_marginalization_fft_length = number_of_times
+        self._delta_tc = self.interferometers.duration / number_of_times
         self._times =\
             self.interferometers.start_time + np.linspace(
-                0, self.interferometers.duration,
-                int(self.interferometers.duration / 2 *
-                    self.waveform_generator.sampling_frequency + 1))[1:]
+                0, self.interferometers.duration, number_of_times + 1)[1:]
         self.time_prior_array = \
             self.priors['geocent_time'].prob(self._times) * self._delta_tc
+        # times within one grid spacing of the prior support, allowing for the time jitter
+        time_support = self.time_prior_array > 0
+        time_support[1:] |= time_support[:-1]
+        time_support[:-1] |= time_support[1:]
+        self._time_window = np.flatnonzero(time_support)
+
+    _calibration_block_elements = 2 ** 22
 
     def _setup_calibration_marginalization(self, calibration_lookup_table):
         if calibration_lookup_table is None:
@@ -968,6 +1283,9 @@ class GravitationalWaveTransient(Likelihood):
         self.calibration_draws = {}
         self.calibration_abs_draws = {}
         self.calibration_parameter_draws = {}
+        self.calibration_reconstruction_errors = {}
+        self._calibration_draws_factors = {}
+        self._calibration_abs_draws_factors = {}
         for interferometer in self.interferometers:
 
             # Force the priors
@@ -982,41 +1300,114 @@ class GravitationalWaveTransient(Likelihood):
                 calibration_lookup_table[interferometer.name] =\
                     f'{interferometer.name}_calibration_file.h5'
 
+            _mask = interferometer.frequency_mask
+
             # If the interferometer lookup table file exists, generate the curves from it
             if os.path.exists(calibration_lookup_table[interferometer.name]):
                 self.calibration_draws[interferometer.name] =\
                     calibration.read_calibration_file(
                         calibration_lookup_table[interferometer.name], self.interferometers.frequency_array,
-                        self.number_of_response_curves, self.starting_index)
+                        self.number_of_response_curves, self.starting_index)[:, _mask]
 
             else:  # generate the fake curves
-                from tqdm.auto import tqdm
                 self.calibration_parameter_draws[interferometer.name] =\
                     pd.DataFrame(calibration_priors.sample(self.number_of_response_curves))
 
                 self.calibration_draws[interferometer.name] = \
-                    np.zeros((self.number_of_response_curves, len(interferometer.frequency_array)), dtype=complex)
+                    np.zeros((self.number_of_response_curves, np.count_nonzero(_mask)), dtype=complex)
 
-                for i in tqdm(range(self.number_of_response_curves)):
-                    self.calibration_draws[interferometer.name][i, :] =\
-                        interferometer.calibration_model.get_calibration_factor(
-                            interferometer.frequency_array,
-                            prefix='recalib_{}_'.format(interferometer.name),
-                            **self.calibration_parameter_draws[interferometer.name].iloc[i])
-
-                calibration.write_calibration_file(
-                    calibration_lookup_table[interferometer.name],
-                    self.interferometers.frequency_array,
-                    self.calibration_draws[interferometer.name],
-                    self.calibration_parameter_draws[interferometer.name])
+                with calibration.CalibrationFileWriter(
+                        calibration_lookup_table[interferometer.name],
+                        self.interferometers.frequency_array,
+                        self.calibration_parameter_draws[interferometer.name]) as calibration_file:
+                    self._generate_calibration_draws(interferometer, calibration_file)
 
             interferometer.calibration_model = calibration.Recalibrate()
 
-            _mask = interferometer.frequency_mask
-            self.calibration_draws[interferometer.name] = self.calibration_draws[interferometer.name][:, _mask]
             self.calibration_abs_draws[interferometer.name] =\
                 np.abs(self.calibration_draws[interferometer.name])**2
 
+            if self.calibration_svd_tolerance is None:
+                self._calibration_draws_factors[interferometer.name] = (
+                    None, self.calibration_draws[interferometer.name])
+                self._calibration_abs_draws_factors[interferometer.name] = (
+                    None, self.calibration_abs_draws[interferometer.name])
+            else:
+                errors = dict()
+                for key, draws, factors in [
+                    ('draws', self.calibration_draws, self._calibration_draws_factors),
+                    ('abs_draws', self.calibration_abs_draws, self._calibration_abs_draws_factors)
+                ]:
+                    factors[interferometer.name], errors[key] = self._compress_calibration_draws(
+                        draws[interferometer.name], self.calibration_svd_tolerance)
+                    logger.info(
+                        "Compressed {} calibration {} for {} to {} singular vectors with "
+                        "relative reconstruction error {:.3g}".format(
+                            self.number_of_response_curves, key.replace('_', ' '), interferometer.name,
+                            len(factors[interferometer.name][1]), errors[key]))
+                self.calibration_reconstruction_errors[interferometer.name] = errors
+
+    def _generate_calibration_draws(self, interferometer, calibration_file):
+        """ Generate the calibration curves for an interferometer in blocks
+
+        Each block is evaluated with a single call to the calibration model.
+        The in-band part of each block is stored in
+        :code:`calibration_draws` and the full block is appended to the
+        calibration file, so that every curve is never held in memory.
+
+        Parameters
+        ==========
+        interferometer: bilby.gw.detector.Interferometer
+            The interferometer to generate the curves for
+        calibration_file: bilby.gw.detector.calibration.CalibrationFileWriter
+            The file to write the curves to
+        """
+        frequency_array = interferometer.frequency_array
+        parameter_draws = self.calibration_parameter_draws[interferometer.name]
+        draws = self.calibration_draws[interferometer.name]
+        block_size = max(1, self._calibration_block_elements // len(frequency_array))
+        for start in range(0, self.number_of_response_curves, block_size):
+            block = interferometer.calibration_model.get_calibration_factors(
+                frequency_array, parameter_draws.iloc[start:start + block_size])
+            draws[start:start + block_size] = block[:, interferometer.frequency_mask]
+            calibration_file.append(block)
+            logger.debug("Generated {} of {} calibration curves for {}".format(
+                min(start + block_size, self.number_of_response_curves),
+                self.number_of_response_curves, interferometer.name))
+
+    @staticmethod
+    def _compress_calibration_draws(draws, tolerance):
+        """ Compress calibration draws with a truncated singular value
+        decomposition
+
+        Parameters
+        ==========
+        draws: array_like
+            The calibration draws with shape (number of curves, number of
+            frequencies)
+        tolerance: float
+            The maximum relative Frobenius norm of the reconstruction error
+
+        Returns
+        =======
+        factors: tuple
+            The weights, with shape (number of curves, rank), and basis, with
+            shape (rank, number of frequencies), such that
+            :code:`weights @ basis` approximates the draws. If the
+            decomposition does not reduce the number of rows the weights are
+            None and the basis is the draws.
+        error: float
+            The relative reconstruction error
+        """
+        left, singular_values, right = scipy.linalg.svd(draws, full_matrices=False)
+        power = singular_values ** 2
+        residual = np.append(np.cumsum(power[::-1])[::-1], 0)
+        errors = np.sqrt(residual / max(residual[0], np.finfo(float).tiny))
+        rank = max(int(np.argmax(errors <= tolerance)), 1)
+        if rank >= len(draws):
+            return (None, draws), 0.
+        return (left[:, :rank] * singular_values[:rank], right[:rank]), float(errors[rank])
+
     @property
     def interferometers(self):
         return self._interferometers
@@ -1117,6 +1508,106 @@ class GravitationalWaveTransient(Likelihood):
             lalsimulation_version=self.lalsimulation_version)
 
 
+def _distance_marginalized_lookup_rows(args):
+    """ Compute rows of the distance marginalization lookup table
+
+    This is a module-level function so that blocks of rows can be computed
+    with a multiprocessing pool.
+
+    Parameters
+    ==========
+    args: tuple
+        The optimal SNRs squared for the rows, the matched filter SNRs for the
+        columns, both at the reference distance, the ratio of the reference
+        distance to the distance grid, the prior weights of the distance grid
+        and whether the likelihood is marginalized over phase.
+
+    Returns
+    =======
+    rows: array_like
+        The log of the distance-marginalized likelihood for each pair of
+        optimal and matched filter SNRs.
+    """
+    optimal_snr_squared_ref_array, d_inner_h_ref_array, scaling, prior_term, phase_marginalization = args
+    d_inner_h_array_full = np.outer(d_inner_h_ref_array, scaling)
+    if phase_marginalization:
+        d_inner_h_array_full = ln_i0(abs(d_inner_h_array_full))
+    rows = np.zeros((len(optimal_snr_squared_ref_array), len(d_inner_h_ref_array)))
+    exponent = np.empty_like(d_inner_h_array_full)
+    for ii, optimal_snr_squared in enumerate(optimal_snr_squared_ref_array):
+        np.subtract(d_inner_h_array_full, optimal_snr_squared * scaling ** 2 / 2, out=exponent)
+        maximum = np.max(exponent, axis=1)
+        exponent -= maximum[:, np.newaxis]
+        np.exp(exponent, out=exponent)
+        with np.errstate(divide='ignore'):
+            rows[ii] = np.log(np.dot(exponent, prior_term)) + maximum
+    return rows
+
+
+class _MemoryMappedWeights(object):
+    """ Stands in for a memory mapped weight array when pickling """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+
+def _is_whole_file_memory_map(array):
+    """ Whether an array is a read-only memory map of an entire .npy file """
+    if not isinstance(array, np.memmap) or array.filename is None or array.flags.writeable:
+        return False
+    try:
+        with open(array.filename, 'rb') as npy_file:
+            version = np.lib.format.read_magic(npy_file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(npy_file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(npy_file)
+            offset = npy_file.tell()
+    except (OSError, ValueError):
+        return False
+    if fortran_order:
+        contiguous = array.flags.f_contiguous
+    else:
+        contiguous = array.flags.c_contiguous
+    return array.offset == offset and array.shape == shape and array.dtype == dtype and contiguous
+
+
+def _roq_linear_weights(args):
+    """ Compute the time-dependent linear ROQ weights for an interferometer
+
+    Blocks of basis elements are transformed together with a
+    two-dimensional inverse FFT, only the requested time samples are kept.
+    This is a module-level function so that the weights for different
+    interferometers can be computed with a multiprocessing pool.
+
+    Parameters
+    ==========
+    args: tuple
+        The data divided by the power spectral density at the basis
+        frequencies, the linear basis with shape (number of frequencies,
+        number of basis elements), the indices of the basis frequencies in
+        the FFT input, the length of the FFT, the first and last time
+        samples to keep and the number of basis elements transformed
+        together.
+
+    Returns
+    =======
+    weights: array_like
+        The unnormalised weights with shape (number of time samples, number
+        of basis elements).
+    """
+    data_over_psd, basis, nonzero_idxs, number_of_time_samples, start_idx, end_idx, block_size = args
+    number_of_basis_elements = basis.shape[1]
+    weights = np.zeros((end_idx + 1 - start_idx, number_of_basis_elements), dtype=complex)
+    for start in range(0, number_of_basis_elements, block_size):
+        block = basis[:, start:start + block_size]
+        ifft_input = np.zeros((block.shape[1], number_of_time_samples), dtype=complex)
+        ifft_input[:, nonzero_idxs] = (data_over_psd[:, np.newaxis] * np.conj(block)).T
+        weights[:, start:start + block.shape[1]] = scipy.fft.ifft(
+            ifft_input, axis=1, overwrite_x=True)[:, start_idx:end_idx + 1].T
+    return weights
+
+
 class BasicGravitationalWaveTransient(Likelihood):
 
     def __init__(self, interferometers, waveform_generator):
@@ -1222,6 +1713,12 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
     waveform_generator: `bilby.waveform_generator.WaveformGenerator`
         An object which computes the frequency-domain strain of the signal,
         given some set of parameters
+    weights: str, dict, optional
+        Precomputed ROQ weights, either the dictionary or the file to load
+        them from, see :code:`save_weights`. Weights stored in the
+        uncompressed 'npy' format are memory mapped read-only and are
+        reopened rather than copied when the likelihood is pickled, so that
+        sampler processes share the same physical memory.
     linear_matrix: str, array_like
         Either a string point to the file from which to load the linear_matrix
         array, or the array itself.
@@ -1243,10 +1740,14 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
         If a dict, dictionary containing the lookup_table, distance_array,
         (distance) prior_array, and reference_distance used to construct
         the table.
-        If a string the name of a file containing these quantities.
+        If a string the name of a file containing these quantities, or of a
+        directory in which the table is stored with a file name derived from
+        a hash of the distance grid, distance prior, reference distance and
+        phase marginalization, so that analyses can share a table.
         The lookup table is stored after construction in either the
-        provided string or a default location:
-        '.distance_marginalization_lookup_dmin{}_dmax{}_n{}.npz'
+        provided location or the directory given by the
+        :code:`BILBY_CACHE_DIR` environment variable, defaulting to the
+        current directory.
     reference_frame: (str, bilby.gw.detector.InterferometerList, list), optional
         Definition of the reference frame for the sky location.
         - "sky": sample in RA/dec, this is the default
@@ -1259,6 +1760,21 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
         - "geocent"/"geocenter": sample in the time at the Earth's center,
           this is the default
         - e.g., "H1": sample in the time of arrival at H1
+    weights_block_size: int, optional
+        The number of linear basis elements transformed together when
+        building the linear weights. Larger blocks are faster but need
+        memory for this many complex time series of the length of the ROQ
+        time grid. By default the block size is chosen so that each block
+        holds 2 ** 24 complex samples.
+    weights_npool: int, optional
+        The number of processes used to build the linear weights for
+        different interferometers in parallel, default=1.
+    weights_cache_directory: str, optional
+        A directory in which to cache the linear weights for each
+        interferometer. The file names are derived from a hash of the data,
+        power spectral density, basis and time grid, so that analyses of the
+        same data with the same basis share the weights. Cached weights are
+        memory mapped read-only. By default the weights are not cached.
 
     """
     def __init__(
@@ -1267,7 +1783,8 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
         roq_params=None, roq_params_check=True, roq_scale_factor=1,
         distance_marginalization=False, phase_marginalization=False,
         distance_marginalization_lookup_table=None,
-        reference_frame="sky", time_reference="geocenter"
+        reference_frame="sky", time_reference="geocenter",
+        weights_block_size=None, weights_npool=1, weights_cache_directory=None
 
     ):
         super(ROQGravitationalWaveTransient, self).__init__(
@@ -1284,6 +1801,9 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
 
         self.roq_params_check = roq_params_check
         self.roq_scale_factor = roq_scale_factor
+        self.weights_block_size = weights_block_size
+        self.weights_npool = weights_npool
+        self.weights_cache_directory = weights_cache_directory
         if isinstance(roq_params, np.ndarray) or roq_params is None:
             self.roq_params = roq_params
         elif isinstance(roq_params, str):
@@ -1323,12 +1843,11 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
 
         """
 
-        f_plus = interferometer.antenna_response(
+        responses = interferometer.antenna_responses(
             self.parameters['ra'], self.parameters['dec'],
-            self.parameters['geocent_time'], self.parameters['psi'], 'plus')
-        f_cross = interferometer.antenna_response(
-            self.parameters['ra'], self.parameters['dec'],
-            self.parameters['geocent_time'], self.parameters['psi'], 'cross')
+            self.parameters['geocent_time'], self.parameters['psi'], ['plus', 'cross'])
+        f_plus = responses['plus']
+        f_cross = responses['cross']
 
         dt = interferometer.time_delay_from_geocenter(
             self.parameters['ra'], self.parameters['dec'],
@@ -1456,24 +1975,11 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
             logger.info(msg)
 
         roq_params = self.roq_params
-        roq_minimum_frequency = roq_params['flow'] * self.roq_scale_factor
-        roq_maximum_frequency = roq_params['fhigh'] * self.roq_scale_factor
-        roq_segment_length = roq_params['seglen'] / self.roq_scale_factor
         roq_minimum_chirp_mass = roq_params['chirpmassmin'] / self.roq_scale_factor
         roq_maximum_chirp_mass = roq_params['chirpmassmax'] / self.roq_scale_factor
         roq_minimum_component_mass = roq_params['compmin'] / self.roq_scale_factor
 
-        if ifo.maximum_frequency > roq_maximum_frequency:
-            raise BilbyROQParamsRangeError(
-                "Requested maximum frequency {} larger than ROQ basis fhigh {}"
-                .format(ifo.maximum_frequency, roq_maximum_frequency))
-        if ifo.minimum_frequency < roq_minimum_frequency:
-            raise BilbyROQParamsRangeError(
-                "Requested minimum frequency {} lower than ROQ basis flow {}"
-                .format(ifo.minimum_frequency, roq_minimum_frequency))
-        if ifo.strain_data.duration != roq_segment_length:
-            raise BilbyROQParamsRangeError(
-                "Requested duration differs from ROQ basis seglen")
+        self._check_roq_frequencies_and_duration(ifo, roq_params)
 
         priors = self.priors
         if isinstance(priors, CBCPriorDict) is False:
@@ -1504,6 +2010,37 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                 .format(priors.minimum_component_mass,
                         roq_minimum_component_mass))
 
+    def _check_roq_frequencies_and_duration(self, ifo, roq_params):
+        """ Check that the frequency range and duration of the data are
+        valid for the ROQ
+
+        Parameters
+        ==========
+        ifo: bilby.gw.detector.Interferometer
+            The interferometer
+        roq_params: array_like
+            Parameters describing the domain of validity of the ROQ basis.
+
+        Raises
+        ======
+        BilbyROQParamsRangeError: If the data are not covered by the basis
+        """
+        roq_minimum_frequency = roq_params['flow'] * self.roq_scale_factor
+        roq_maximum_frequency = roq_params['fhigh'] * self.roq_scale_factor
+        roq_segment_length = roq_params['seglen'] / self.roq_scale_factor
+
+        if ifo.maximum_frequency > roq_maximum_frequency:
+            raise BilbyROQParamsRangeError(
+                "Requested maximum frequency {} larger than ROQ basis fhigh {}"
+                .format(ifo.maximum_frequency, roq_maximum_frequency))
+        if ifo.minimum_frequency < roq_minimum_frequency:
+            raise BilbyROQParamsRangeError(
+                "Requested minimum frequency {} lower than ROQ basis flow {}"
+                .format(ifo.minimum_frequency, roq_minimum_frequency))
+        if ifo.strain_data.duration != roq_segment_length:
+            raise BilbyROQParamsRangeError(
+                "Requested duration differs from ROQ basis seglen")
+
     def _set_weights(self, linear_matrix, quadratic_matrix):
         """
         Setup the time-dependent ROQ weights.
@@ -1518,16 +2055,6 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
 
         time_space = self._get_time_resolution()
         number_of_time_samples = int(self.interferometers.duration / time_space)
-        try:
-            import pyfftw
-            ifft_input = pyfftw.empty_aligned(number_of_time_samples, dtype=complex)
-            ifft_output = pyfftw.empty_aligned(number_of_time_samples, dtype=complex)
-            ifft = pyfftw.FFTW(ifft_input, ifft_output, direction='FFTW_BACKWARD')
-        except ImportError:
-            pyfftw = None
-            logger.warning("You do not have pyfftw installed, falling back to numpy.fft.")
-            ifft_input = np.zeros(number_of_time_samples, dtype=complex)
-            ifft = np.fft.ifft
         earth_light_crossing_time = 2 * radius_of_earth / speed_of_light + 5 * time_space
         start_idx = max(0, int(np.floor((self.priors['{}_time'.format(self.time_reference)].minimum -
                         earth_light_crossing_time - self.interferometers.start_time) / time_space)))
@@ -1537,6 +2064,12 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
         self.weights['time_samples'] = np.arange(start_idx, end_idx + 1) * time_space
         logger.info("Using {} ROQ time samples".format(len(self.weights['time_samples'])))
 
+        if self.weights_block_size is None:
+            block_size = max(1, 2 ** 24 // number_of_time_samples)
+        else:
+            block_size = self.weights_block_size
+
+        linear_weights_arguments = dict()
         for ifo in self.interferometers:
             if self.roq_params is not None:
                 self.perform_roq_params_check(ifo)
@@ -1567,16 +2100,18 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                     ifo.name, len(overlap_frequencies),
                     min(overlap_frequencies), max(overlap_frequencies)))
 
-            ifft_input[:] *= 0.
-            self.weights[ifo.name + '_linear'] = \
-                np.zeros((len(self.weights['time_samples']), linear_matrix.shape[1]), dtype=complex)
             data_over_psd = ifo.frequency_domain_strain[ifo.frequency_mask][ifo_idxs] / \
                 ifo.power_spectral_density_array[ifo.frequency_mask][ifo_idxs]
             nonzero_idxs = ifo_idxs + int(ifo.frequency_array[ifo.frequency_mask][0] * self.interferometers.duration)
-            for i, basis_element in enumerate(linear_matrix[roq_idxs].T):
-                ifft_input[nonzero_idxs] = data_over_psd * np.conj(basis_element)
-                self.weights[ifo.name + '_linear'][:, i] = ifft(ifft_input)[start_idx:end_idx + 1]
-            self.weights[ifo.name + '_linear'] *= 4. * number_of_time_samples / self.interferometers.duration
+            arguments = (
+                data_over_psd, linear_matrix[roq_idxs], nonzero_idxs,
+                number_of_time_samples, start_idx, end_idx, block_size)
+            filename = self._linear_weights_cache_filename(arguments)
+            if filename is not None and os.path.exists(filename):
+                logger.info("Loading linear ROQ weights for {} from {}".format(ifo.name, filename))
+                self.weights[ifo.name + '_linear'] = np.load(filename, mmap_mode='r')
+            else:
+                linear_weights_arguments[ifo.name] = (arguments, filename)
 
             self.weights[ifo.name + '_quadratic'] = build_roq_weights(
                 1 /
@@ -1584,12 +2119,75 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                 quadratic_matrix[roq_idxs].real,
                 1 / ifo.strain_data.duration)
 
-            logger.info("Finished building weights for {}".format(ifo.name))
+        names = list(linear_weights_arguments.keys())
+        arguments = [linear_weights_arguments[name][0] for name in names]
+        npool = min(self.weights_npool, len(names))
+        if npool > 1:
+            logger.info("Using a pool with size {} for the linear ROQ weights".format(npool))
+            with multiprocessing.Pool(processes=npool) as pool:
+                linear_weights = pool.map(_roq_linear_weights, arguments)
+        else:
+            linear_weights = [_roq_linear_weights(argument) for argument in arguments]
+        for name, weights in zip(names, linear_weights):
+            self.weights[name + '_linear'] = weights * 4. * number_of_time_samples / self.interferometers.duration
+            filename = linear_weights_arguments[name][1]
+            if filename is not None:
+                self._cache_linear_weights(filename, self.weights[name + '_linear'])
+            logger.info("Finished building weights for {}".format(name))
+
+    def _linear_weights_cache_filename(self, arguments):
+        """ File name identifying the linear weights by a hash of the
+        quantities used to construct them, None if they are not cached """
+        if self.weights_cache_directory is None:
+            return None
+        data_over_psd, basis, nonzero_idxs, number_of_time_samples, start_idx, end_idx, _ = arguments
+        weights_hash = hashlib.sha256()
+        weights_hash.update(np.ascontiguousarray(data_over_psd, dtype=complex).tobytes())
+        weights_hash.update(np.ascontiguousarray(basis, dtype=complex).tobytes())
+        weights_hash.update(np.ascontiguousarray(nonzero_idxs, dtype=int).tobytes())
+        weights_hash.update(repr((
+            basis.shape, int(number_of_time_samples), int(start_idx), int(end_idx),
+            float(self.interferometers.duration))).encode())
+        return os.path.join(
+            self.weights_cache_directory,
+            '.roq_linear_weights_{}.npy'.format(weights_hash.hexdigest()[:16]))
+
+    @staticmethod
+    def _cache_linear_weights(filename, weights):
+        """ Write the linear weights, the file is written to a temporary file
+        and then renamed so that concurrent analyses never read partial
+        weights """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+            ROQGravitationalWaveTransient._save_array(filename, weights)
+        except OSError as e:
+            logger.warning('Unable to cache the linear ROQ weights: {}'.format(e))
 
-        if pyfftw is not None:
-            pyfftw.forget_wisdom()
+    @staticmethod
+    def _save_array(filename, array):
+        """ Save an array to a .npy file, the array is written to a temporary
+        file which then replaces the file, so that processes memory mapping
+        the previous file are unaffected """
+        directory = os.path.dirname(os.path.abspath(filename))
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.npy', delete=False) as temporary_file:
+            np.save(temporary_file, array)
+        os.chmod(temporary_file.name, 0o644)
+        os.replace(temporary_file.name, filename)
 
     def save_weights(self, filename, format='npz'):
+        """ Save the ROQ weights
+
+        Parameters
+        ==========
+        filename: str
+            The name of the file to write, the format is appended if not
+            already present
+        format: str
+            The format, one of 'npz', 'json' or 'npy'. For 'npy', filename is
+            a directory containing one uncompressed :code:`.npy` file per
+            weight array and a :code:`keys.json` file listing them, these are
+            memory mapped by :code:`load_weights`.
+        """
         if format not in filename:
             filename += "." + format
         logger.info("Saving ROQ weights to {}".format(filename))
@@ -1598,12 +2196,40 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                 json.dump(self.weights, file, indent=2, cls=BilbyJsonEncoder)
         elif format == 'npz':
             np.savez(filename, **self.weights)
+        elif format == 'npy':
+            os.makedirs(filename, exist_ok=True)
+            for key, value in self.weights.items():
+                self._save_array(os.path.join(filename, key + '.npy'), value)
+            keys_filename = os.path.join(filename, 'keys.json')
+            with open(keys_filename + '.tmp', 'w') as file:
+                json.dump(sorted(self.weights.keys()), file)
+            os.replace(keys_filename + '.tmp', keys_filename)
 
     @staticmethod
     def load_weights(filename, format=None):
+        """ Load ROQ weights
+
+        Parameters
+        ==========
+        filename: str
+            The file to read
+        format: str, optional
+            The format, one of 'npz', 'json' or 'npy', by default this is
+            inferred from the file name. Directories are read as 'npy'.
+
+        Returns
+        =======
+        weights: dict
+            The weights, for the 'npy' format these are read-only memory
+            maps so that the physical memory is shared between processes
+            reading the same files.
+        """
         if format is None:
-            format = filename.split(".")[-1]
-        if format not in ["json", "npz"]:
+            if os.path.isdir(filename):
+                format = "npy"
+            else:
+                format = filename.split(".")[-1]
+        if format not in ["json", "npz", "npy"]:
             raise IOError("Format {} not recognized.".format(format))
         logger.info("Loading ROQ weights from {}".format(filename))
         if format == "json":
@@ -1612,8 +2238,38 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
         elif format == "npz":
             # Wrap in dict to load data into memory
             weights = dict(np.load(filename))
+        elif format == "npy":
+            with open(os.path.join(filename, 'keys.json'), 'r') as file:
+                keys = json.load(file)
+            weights = {
+                key: np.load(os.path.join(filename, key + '.npy'), mmap_mode='r')
+                for key in keys}
         return weights
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Memory mapped weights are reopened when unpickled rather than copied
+        state['weights'] = self._memory_map_references(self.weights)
+        return state
+
+    def __setstate__(self, state):
+        state['weights'] = self._open_memory_map_references(state['weights'])
+        self.__dict__.update(state)
+
+    @staticmethod
+    def _memory_map_references(weights):
+        """ Replace whole-file memory mapped weights with references to the files """
+        return {
+            key: _MemoryMappedWeights(value.filename) if _is_whole_file_memory_map(value) else value
+            for key, value in weights.items()}
+
+    @staticmethod
+    def _open_memory_map_references(weights):
+        """ Reopen the files referenced by :code:`_memory_map_references` """
+        return {
+            key: np.load(value.filename, mmap_mode='r') if isinstance(value, _MemoryMappedWeights) else value
+            for key, value in weights.items()}
+
     def _get_time_resolution(self):
         """
         This method estimates the time resolution given the optimal SNR of the
@@ -1688,6 +2344,269 @@ class ROQGravitationalWaveTransient(GravitationalWaveTransient):
                 signal[kind][mode] *= self._ref_dist / new_distance
 
 
+class MultiBasisROQGravitationalWaveTransient(ROQGravitationalWaveTransient):
+    """A reduced order quadrature likelihood using several ROQ bases
+
+    Each basis is valid in a range of chirp mass and above a minimum
+    component mass. For each likelihood evaluation the basis with the fewest
+    elements whose chirp-mass range contains the chirp mass and whose
+    minimum component mass is not larger than mass_2 is used, so a broad
+    prior can be analysed with narrow bases. The weights of each basis are built when the basis is
+    first used and are kept for later evaluations.
+
+    Parameters
+    ==========
+    interferometers: list, bilby.gw.detector.InterferometerList
+        A list of `bilby.detector.Interferometer` instances - contains the
+        detector data and power spectral densities
+    waveform_generator: `bilby.waveform_generator.WaveformGenerator`
+        An object which computes the frequency-domain strain of the signal,
+        given some set of parameters. The frequency nodes in the waveform
+        arguments are set to those of the selected basis.
+    priors: dict, bilby.prior.PriorDict
+        A dictionary of priors containing at least the geocent_time prior
+    bases: list
+        The ROQ bases, each either a directory containing the
+        :code:`B_linear.npy`, :code:`B_quadratic.npy`,
+        :code:`fnodes_linear.npy`, :code:`fnodes_quadratic.npy` and
+        :code:`params.dat` files of a basis from
+        https://git.ligo.org/lscsoft/ROQ_data, or a dictionary with keys
+        :code:`linear_matrix`, :code:`quadratic_matrix`,
+        :code:`frequency_nodes_linear`, :code:`frequency_nodes_quadratic`
+        and :code:`roq_params`. Matrices and parameters given as strings are
+        loaded as for `ROQGravitationalWaveTransient`, frequency nodes in a
+        dictionary are used as given, i.e., they should already be scaled
+        by the roq_scale_factor.
+    roq_params_check: bool
+        If true, discard bases whose frequency range or duration do not
+        match the data and check that for each chirp mass in the prior a
+        basis is valid down to the minimum mass_2 of the prior
+    roq_scale_factor: float
+        The ROQ scale factor used.
+    distance_marginalization, phase_marginalization: bool, optional
+        If true, marginalize over distance and phase respectively
+    distance_marginalization_lookup_table, reference_frame, time_reference:
+        See `ROQGravitationalWaveTransient`
+    weights_block_size, weights_npool, weights_cache_directory:
+        See `ROQGravitationalWaveTransient`, these apply to the weights of
+        each basis
+
+    """
+    def __init__(
+        self, interferometers, waveform_generator, priors, bases,
+        roq_params_check=True, roq_scale_factor=1,
+        distance_marginalization=False, phase_marginalization=False,
+        distance_marginalization_lookup_table=None,
+        reference_frame="sky", time_reference="geocenter",
+        weights_block_size=None, weights_npool=1, weights_cache_directory=None
+    ):
+        bases = [self._read_basis(basis, roq_scale_factor) for basis in bases]
+        if len(bases) == 0:
+            raise ValueError("At least one ROQ basis is required")
+        waveform_generator.waveform_arguments['frequency_nodes_linear'] = bases[0]['frequency_nodes_linear']
+        waveform_generator.waveform_arguments['frequency_nodes_quadratic'] = bases[0]['frequency_nodes_quadratic']
+        super(MultiBasisROQGravitationalWaveTransient, self).__init__(
+            interferometers=interferometers,
+            waveform_generator=waveform_generator, priors=priors,
+            weights=dict(), roq_params=bases[0]['roq_params'],
+            roq_params_check=roq_params_check, roq_scale_factor=roq_scale_factor,
+            distance_marginalization=distance_marginalization,
+            phase_marginalization=phase_marginalization,
+            distance_marginalization_lookup_table=distance_marginalization_lookup_table,
+            reference_frame=reference_frame, time_reference=time_reference,
+            weights_block_size=weights_block_size, weights_npool=weights_npool,
+            weights_cache_directory=weights_cache_directory
+        )
+        self._set_bases(bases)
+
+    @staticmethod
+    def _read_basis(basis, roq_scale_factor):
+        """ Convert a basis directory or dictionary to a dictionary with the
+        roq_params read """
+        if isinstance(basis, str):
+            logger.info("Reading ROQ basis from {}".format(basis))
+            basis = dict(
+                linear_matrix=os.path.join(basis, "B_linear.npy"),
+                quadratic_matrix=os.path.join(basis, "B_quadratic.npy"),
+                frequency_nodes_linear=np.load(
+                    os.path.join(basis, "fnodes_linear.npy")) * roq_scale_factor,
+                frequency_nodes_quadratic=np.load(
+                    os.path.join(basis, "fnodes_quadratic.npy")) * roq_scale_factor,
+                roq_params=os.path.join(basis, "params.dat"))
+        else:
+            basis = dict(basis)
+        if isinstance(basis['roq_params'], str):
+            basis['roq_params'] = np.genfromtxt(basis['roq_params'], names=True)
+        elif not isinstance(basis['roq_params'], np.ndarray):
+            raise TypeError("roq_params should be array or str")
+        return basis
+
+    def _set_bases(self, bases):
+        """ Discard bases which are not valid for the data, sort the
+        remaining bases by size and check they cover the prior """
+        if self.roq_params_check:
+            valid_bases = list()
+            for basis in bases:
+                try:
+                    for ifo in self.interferometers:
+                        self._check_roq_frequencies_and_duration(ifo, basis['roq_params'])
+                except BilbyROQParamsRangeError as e:
+                    logger.info("Discarding ROQ basis: {}".format(e))
+                    continue
+                valid_bases.append(basis)
+            if len(valid_bases) == 0:
+                raise BilbyROQParamsRangeError("No ROQ basis is valid for the data")
+            bases = valid_bases
+        self.bases = sorted(bases, key=lambda basis: (
+            len(basis['frequency_nodes_linear']) + len(basis['frequency_nodes_quadratic'])))
+        self._chirp_mass_bounds = np.array([
+            [float(basis['roq_params']['chirpmassmin']), float(basis['roq_params']['chirpmassmax'])]
+            for basis in self.bases]) / self.roq_scale_factor
+        self._minimum_component_masses = np.array([
+            float(basis['roq_params']['compmin']) for basis in self.bases]) / self.roq_scale_factor
+        self._basis_weights = [None] * len(self.bases)
+        self._basis_index = None
+        if self.roq_params_check:
+            self._check_prior_coverage()
+        self._set_basis(0)
+
+    def _check_prior_coverage(self):
+        """ Check the bases cover the prior, i.e., that for each chirp mass
+        in the prior there is a basis whose chirp-mass range contains it and
+        whose minimum component mass is below that allowed by the prior at
+        this chirp mass """
+        priors = self.priors
+        if isinstance(priors, CBCPriorDict) is False:
+            logger.warning("Unable to check ROQ parameter bounds: priors not understood")
+            return
+
+        if priors.minimum_chirp_mass is None or priors.maximum_chirp_mass is None:
+            logger.warning("Unable to check chirp mass ROQ bounds")
+            return
+
+        # The smallest mass_2 in the prior does not decrease with chirp mass,
+        # so each basis covers an interval of chirp mass
+        bounds = self._chirp_mass_bounds.copy()
+        if "mass_2" in priors:
+            bounds[self._minimum_component_masses > priors["mass_2"].minimum] = np.nan
+        elif "chirp_mass" in priors and "mass_ratio" in priors:
+            total_mass = chirp_mass_and_mass_ratio_to_total_mass(1., priors["mass_ratio"].minimum)
+            _, mass_2_per_chirp_mass = total_mass_and_mass_ratio_to_component_masses(
+                priors["mass_ratio"].minimum, total_mass)
+            bounds[:, 0] = np.maximum(bounds[:, 0], self._minimum_component_masses / mass_2_per_chirp_mass)
+        else:
+            logger.warning("Unable to check minimum component mass ROQ bounds")
+
+        covered = priors.minimum_chirp_mass
+        for minimum, maximum in sorted(bounds[bounds[:, 0] <= bounds[:, 1]].tolist()):
+            if minimum > covered:
+                break
+            covered = max(covered, maximum)
+        if covered < priors.maximum_chirp_mass:
+            raise BilbyROQParamsRangeError(
+                "Prior chirp mass range [{}, {}] not covered by the ROQ "
+                "bases given their minimum component masses, the bases cover "
+                "up to {}".format(priors.minimum_chirp_mass, priors.maximum_chirp_mass, covered))
+
+    def perform_roq_params_check(self, ifo=None):
+        """ Check that the data are valid for the selected basis, the prior is
+        checked against all bases when they are set up
+
+        Parameters
+        ==========
+        ifo: bilby.gw.detector.Interferometer
+            The interferometer
+        """
+        if self.roq_params_check:
+            self._check_roq_frequencies_and_duration(ifo, self.roq_params)
+
+    def _chirp_mass_and_mass_2(self):
+        """ The chirp mass and secondary mass of the current parameters """
+        parameters = self.parameters
+        if 'chirp_mass' in parameters and 'mass_ratio' in parameters:
+            total_mass = chirp_mass_and_mass_ratio_to_total_mass(
+                parameters['chirp_mass'], parameters['mass_ratio'])
+            _, mass_2 = total_mass_and_mass_ratio_to_component_masses(parameters['mass_ratio'], total_mass)
+            return parameters['chirp_mass'], mass_2
+        if 'mass_1' not in parameters or 'mass_2' not in parameters:
+            parameters, _ = self.waveform_generator.parameter_conversion(parameters.copy())
+        return component_masses_to_chirp_mass(parameters['mass_1'], parameters['mass_2']), parameters['mass_2']
+
+    def _select_basis(self):
+        """ Select the smallest basis valid for the current parameters, i.e.,
+        whose chirp-mass range contains the chirp mass and whose minimum
+        component mass is not larger than mass_2
+
+        Returns
+        =======
+        bool: Whether any basis is valid
+        """
+        chirp_mass, mass_2 = self._chirp_mass_and_mass_2()
+        valid = (
+            (self._chirp_mass_bounds[:, 0] <= chirp_mass) & (chirp_mass <= self._chirp_mass_bounds[:, 1]) &
+            (self._minimum_component_masses <= mass_2))
+        if not np.any(valid):
+            return False
+        self._set_basis(int(np.argmax(valid)))
+        return True
+
+    def _set_basis(self, index):
+        """ Use a basis, building its weights if it has not been used before """
+        if index == self._basis_index:
+            return
+        basis = self.bases[index]
+        self.roq_params = basis['roq_params']
+        self.frequency_nodes_linear = basis['frequency_nodes_linear']
+        self.frequency_nodes_quadratic = basis['frequency_nodes_quadratic']
+        self.waveform_generator.waveform_arguments['frequency_nodes_linear'] = self.frequency_nodes_linear
+        self.waveform_generator.waveform_arguments['frequency_nodes_quadratic'] = self.frequency_nodes_quadratic
+        if self._basis_weights[index] is None:
+            logger.info("Building ROQ weights for the basis with chirp mass range [{}, {}]".format(
+                *self._chirp_mass_bounds[index]))
+            linear_matrix = basis['linear_matrix']
+            if isinstance(linear_matrix, str):
+                logger.info(
+                    "Loading linear matrix from {}".format(linear_matrix))
+                linear_matrix = np.load(linear_matrix).T
+            quadratic_matrix = basis['quadratic_matrix']
+            if isinstance(quadratic_matrix, str):
+                logger.info(
+                    "Loading quadratic_matrix from {}".format(quadratic_matrix))
+                quadratic_matrix = np.load(quadratic_matrix).T
+            self.weights = dict()
+            self._set_weights(linear_matrix=linear_matrix, quadratic_matrix=quadratic_matrix)
+            self._basis_weights[index] = self.weights
+        self.weights = self._basis_weights[index]
+        self._basis_index = index
+
+    def log_likelihood_ratio(self):
+        if not self._select_basis():
+            logger.debug("No ROQ basis is valid for chirp mass {} and mass_2 {}".format(
+                *self._chirp_mass_and_mass_2()))
+            return np.nan_to_num(-np.inf)
+        return super(MultiBasisROQGravitationalWaveTransient, self).log_likelihood_ratio()
+
+    def generate_posterior_sample_from_marginalized_likelihood(self):
+        self._select_basis()
+        return super(MultiBasisROQGravitationalWaveTransient, self).\
+            generate_posterior_sample_from_marginalized_likelihood()
+
+    def __getstate__(self):
+        state = super(MultiBasisROQGravitationalWaveTransient, self).__getstate__()
+        state['_basis_weights'] = [
+            weights if weights is None else self._memory_map_references(weights)
+            for weights in self._basis_weights]
+        return state
+
+    def __setstate__(self, state):
+        state['_basis_weights'] = [
+            weights if weights is None else self._open_memory_map_references(weights)
+            for weights in state['_basis_weights']]
+        super(MultiBasisROQGravitationalWaveTransient, self).__setstate__(state)
+        if self._basis_index is not None:
+            self.weights = self._basis_weights[self._basis_index]
+
+
 def get_binary_black_hole_likelihood(interferometers):
     """ A wrapper to quickly set up a likelihood for BBH parameter estimation
 
@@ -1770,6 +2689,10 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
         Name of the reference for the sampled time parameter.
         - "geocent"/"geocenter": sample in the time at the Earth's center, this is the default
         - e.g., "H1": sample in the time of arrival at H1
+    setup_cache_directory: str, optional
+        A directory in which to cache the frequency bands and coefficients. The file name is derived from a hash of
+        the data, power spectral densities and banding parameters, so that restarts and repeated analyses with the
+        same configuration skip the setup. By default the setup is not cached.
 
     Returns
     -------
@@ -1781,7 +2704,8 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
         self, interferometers, waveform_generator, reference_chirp_mass, highest_mode=2, linear_interpolation=True,
         accuracy_factor=5, time_offset=None, delta_f_end=None, maximum_banding_frequency=None,
         minimum_banding_duration=0., distance_marginalization=False, phase_marginalization=False, priors=None,
-        distance_marginalization_lookup_table=None, reference_frame="sky", time_reference="geocenter"
+        distance_marginalization_lookup_table=None, reference_frame="sky", time_reference="geocenter",
+        setup_cache_directory=None
     ):
         super(MBGravitationalWaveTransient, self).__init__(
             interferometers=interferometers, waveform_generator=waveform_generator, priors=priors,
@@ -1799,6 +2723,7 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
         self.maximum_frequency = np.max([i.maximum_frequency for i in self.interferometers])
         self.maximum_banding_frequency = maximum_banding_frequency
         self.minimum_banding_duration = minimum_banding_duration
+        self.setup_cache_directory = setup_cache_directory
         self.setup_multibanding()
 
     @property
@@ -1956,7 +2881,16 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
             raise TypeError("minimum_banding_duration must be a number")
 
     def setup_multibanding(self):
-        """Set up frequency bands and coefficients needed for likelihood evaluations"""
+        """Set up frequency bands and coefficients needed for likelihood evaluations. If setup_cache_directory is
+        given, they are read from the cache if it contains them and are cached otherwise."""
+        filename = self._setup_cache_filename()
+        if filename is not None and os.path.exists(filename):
+            try:
+                self._load_setup(filename)
+                logger.info("Loaded multi-banding setup from {}".format(filename))
+                return
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Unable to load the multi-banding setup from {}: {}".format(filename, e))
         self._setup_frequency_bands()
         self._setup_integers()
         self._setup_waveform_frequency_points()
@@ -1965,6 +2899,81 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
             self._setup_quadratic_coefficients_linear_interp()
         else:
             self._setup_quadratic_coefficients_ifft_fft()
+        if filename is not None:
+            self._cache_setup(filename)
+
+    def _setup_cache_filename(self):
+        """File name identifying the multi-banding setup by a hash of the quantities used to construct it, None if
+        the setup is not cached"""
+        if self.setup_cache_directory is None:
+            return None
+        setup_hash = hashlib.sha256()
+        for ifo in self.interferometers:
+            setup_hash.update(ifo.name.encode())
+            setup_hash.update(np.ascontiguousarray(ifo.frequency_domain_strain, dtype=complex).tobytes())
+            setup_hash.update(np.ascontiguousarray(ifo.power_spectral_density_array, dtype=float).tobytes())
+            setup_hash.update(np.ascontiguousarray(ifo.frequency_mask, dtype=bool).tobytes())
+        setup_hash.update(repr((
+            float(self.interferometers.duration), float(self.reference_chirp_mass), int(self.highest_mode),
+            bool(self.linear_interpolation), float(self.accuracy_factor), float(self.time_offset),
+            float(self.delta_f_end), float(self.minimum_frequency), float(self.maximum_frequency),
+            float(self.maximum_banding_frequency), float(self.minimum_banding_duration))).encode())
+        return os.path.join(
+            self.setup_cache_directory, '.multibanding_setup_{}.npz'.format(setup_hash.hexdigest()[:16]))
+
+    def _cache_setup(self, filename):
+        """Write the frequency bands and coefficients, the file is written to a temporary file and then renamed so
+        that concurrent analyses never read a partial setup"""
+        setup = dict(
+            durations=self.durations, fb_dfb=self.fb_dfb, Nbs=self.Nbs, Mbs=self.Mbs, Ks_Ke=self.Ks_Ke,
+            banded_frequency_points=self.banded_frequency_points, start_end_idxs=self.start_end_idxs,
+            unique_to_original_frequencies=self.unique_to_original_frequencies,
+            frequencies=self.waveform_generator.waveform_arguments['frequencies'])
+        for ifo in self.interferometers:
+            setup['linear_coeffs_{}'.format(ifo.name)] = self.linear_coeffs[ifo.name]
+            if self.linear_interpolation:
+                setup['quadratic_coeffs_{}'.format(ifo.name)] = self.quadratic_coeffs[ifo.name]
+            else:
+                for b, Ibc in enumerate(self.Ibcs[ifo.name]):
+                    setup['Ibcs_{}_{}'.format(ifo.name, b)] = Ibc
+        if not self.linear_interpolation:
+            setup.update(Tbhats=self.Tbhats, windows=self.windows, square_root_windows=self.square_root_windows)
+        directory = os.path.dirname(os.path.abspath(filename))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=directory, suffix='.npz', delete=False) as temporary_file:
+                np.savez(temporary_file, **setup)
+            os.chmod(temporary_file.name, 0o644)
+            os.replace(temporary_file.name, filename)
+        except OSError as e:
+            logger.warning('Unable to cache the multi-banding setup: {}'.format(e))
+
+    def _load_setup(self, filename):
+        """Read the frequency bands and coefficients written by _cache_setup"""
+        with np.load(filename) as setup:
+            setup = dict(setup)
+        self.durations = setup['durations'].tolist()
+        self.fb_dfb = [tuple(fb_dfb) for fb_dfb in setup['fb_dfb'].tolist()]
+        self.Nbs = setup['Nbs'].tolist()
+        self.Mbs = setup['Mbs'].tolist()
+        self.Ks_Ke = [tuple(Ks_Ke) for Ks_Ke in setup['Ks_Ke'].tolist()]
+        self.banded_frequency_points = setup['banded_frequency_points']
+        self.start_end_idxs = [tuple(idxs) for idxs in setup['start_end_idxs'].tolist()]
+        self.unique_to_original_frequencies = setup['unique_to_original_frequencies']
+        self.waveform_generator.waveform_arguments['frequencies'] = setup['frequencies']
+        self.linear_coeffs = dict(
+            (ifo.name, setup['linear_coeffs_{}'.format(ifo.name)]) for ifo in self.interferometers)
+        if self.linear_interpolation:
+            self.quadratic_coeffs = dict(
+                (ifo.name, setup['quadratic_coeffs_{}'.format(ifo.name)]) for ifo in self.interferometers)
+        else:
+            self.Tbhats = setup['Tbhats'].tolist()
+            self.Ibcs = dict(
+                (ifo.name, [setup['Ibcs_{}_{}'.format(ifo.name, b)] for b in range(len(self.durations))])
+                for ifo in self.interferometers)
+            self.windows = setup['windows']
+            self.square_root_windows = setup['square_root_windows']
+            self._setup_ifft_fft_arrays()
 
     def _tau(self, f):
         """Compute time-to-merger from the input frequency. This uses the 0PN formula.
@@ -2208,8 +3217,6 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
         Nhatbs = [min(2 * Mb, Nb) for Mb, Nb in zip(self.Mbs, self.Nbs)]
         self.Tbhats = [self.interferometers.duration * Nbhat / Nb for Nb, Nbhat in zip(self.Nbs, Nhatbs)]
         self.Ibcs = dict((ifo.name, []) for ifo in self.interferometers)
-        self.hbcs = dict((ifo.name, []) for ifo in self.interferometers)
-        self.wths = dict((ifo.name, []) for ifo in self.interferometers)
         for ifo in self.interferometers:
             logger.info("Pre-computing quadratic coefficients for {}".format(ifo.name))
             full_inv_psds = np.zeros(N // 2 + 1)
@@ -2220,9 +3227,6 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
                 half_length = Nhatbs[b] // 2
                 Imbc = np.append(Imb[:half_length + 1], Imb[-(Nhatbs[b] - half_length - 1):])
                 self.Ibcs[ifo.name].append(np.fft.rfft(Imbc))
-                # Allocate arrays for IFFT-FFT operations
-                self.hbcs[ifo.name].append(np.zeros(Nhatbs[b]))
-                self.wths[ifo.name].append(np.zeros(self.Mbs[b] // 2 + 1, dtype=complex))
         # precompute windows and their squares
         self.windows = np.array([])
         self.square_root_windows = np.array([])
@@ -2231,6 +3235,50 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
             ws = self._window(self.banded_frequency_points[start:end + 1], b)
             self.windows = np.append(self.windows, ws)
             self.square_root_windows = np.append(self.square_root_windows, np.sqrt(ws))
+        self._setup_ifft_fft_arrays()
+
+    def _setup_ifft_fft_arrays(self):
+        """Set up the arrays used at each likelihood evaluation by the IFFT-FFT algorithm. This sets the following
+        instance variables.
+
+        Nhatbs: the numbers of samples of the zero-padded data
+        first_band_quadratic_coeffs: coefficients by which the squares of waveforms in the first band are multiplied
+        wths: buffers for the waveforms multiplied by the square roots of the windows, which are zero outside of the
+        bands
+
+        """
+        self.Nhatbs = [min(2 * Mb, Nb) for Mb, Nb in zip(self.Mbs, self.Nbs)]
+        Ks, Ke = self.Ks_Ke[0]
+        start_idx, end_idx = self.start_end_idxs[0]
+        self.first_band_quadratic_coeffs = dict()
+        for ifo in self.interferometers:
+            self.first_band_quadratic_coeffs[ifo.name] = (4. / self.interferometers.duration) * \
+                ifo.frequency_mask[Ks:Ke + 1] * self.windows[start_idx:end_idx + 1] \
+                / ifo.power_spectral_density_array[Ks:Ke + 1]
+        self.wths = dict(
+            (ifo.name, [np.zeros(Mb // 2 + 1, dtype=complex) for Mb in self.Mbs]) for ifo in self.interferometers)
+
+    def _banded_time_shift_phasor(self, time_shift):
+        """Compute exp(-2 pi i f time_shift) on the banded frequency points. The points are regularly spaced within
+        each band, so the phasor of each band is computed with `bilby.gw.utils.time_shift_phasor`.
+
+        Parameters
+        ----------
+        time_shift: float
+            The time shift in seconds
+
+        Returns
+        -------
+        phasor: ndarray
+            The phasor at banded_frequency_points
+        """
+        phasor = np.empty(len(self.banded_frequency_points), dtype=complex)
+        for b in range(len(self.fb_dfb) - 1):
+            Ks, Ke = self.Ks_Ke[b]
+            start_idx, end_idx = self.start_end_idxs[b]
+            phasor[start_idx:end_idx + 1] = time_shift_phasor(
+                time_shift, Ks / self.durations[b], 1. / self.durations[b], Ke - Ks + 1)
+        return phasor
 
     def calculate_snrs(self, waveform_polarizations, interferometer):
         """
@@ -2246,14 +3294,15 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
         snrs: named tuple of snrs
 
         """
-        strain = np.zeros(len(self.banded_frequency_points), dtype=complex)
+        responses = interferometer.antenna_responses(
+            self.parameters['ra'], self.parameters['dec'],
+            self.parameters['geocent_time'], self.parameters['psi'],
+            waveform_polarizations.keys()
+        )
+        strain = 0.
         for mode in waveform_polarizations:
-            response = interferometer.antenna_response(
-                self.parameters['ra'], self.parameters['dec'],
-                self.parameters['geocent_time'], self.parameters['psi'],
-                mode
-            )
-            strain += waveform_polarizations[mode][self.unique_to_original_frequencies] * response
+            strain = strain + waveform_polarizations[mode] * responses[mode]
+        strain = strain[self.unique_to_original_frequencies]
 
         dt = interferometer.time_delay_from_geocenter(
             self.parameters['ra'], self.parameters['dec'],
@@ -2264,34 +3313,32 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
         calib_factor = interferometer.calibration_model.get_calibration_factor(
             self.banded_frequency_points, prefix='recalib_{}_'.format(interferometer.name), **self.parameters)
 
-        strain *= np.exp(-1j * 2. * np.pi * self.banded_frequency_points * ifo_time)
+        strain *= self._banded_time_shift_phasor(ifo_time)
         strain *= np.conjugate(calib_factor)
 
         d_inner_h = np.dot(strain, self.linear_coeffs[interferometer.name])
 
         if self.linear_interpolation:
             optimal_snr_squared = np.vdot(
-                np.real(strain * np.conjugate(strain)),
+                strain.real**2 + strain.imag**2,
                 self.quadratic_coeffs[interferometer.name]
             )
         else:
-            optimal_snr_squared = 0.
-            for b in range(len(self.fb_dfb) - 1):
+            start_idx, end_idx = self.start_end_idxs[0]
+            strain_in_first_band = strain[start_idx:end_idx + 1]
+            optimal_snr_squared = np.vdot(
+                strain_in_first_band.real**2 + strain_in_first_band.imag**2,
+                self.first_band_quadratic_coeffs[interferometer.name])
+            for b in range(1, len(self.fb_dfb) - 1):
                 Ks, Ke = self.Ks_Ke[b]
                 start_idx, end_idx = self.start_end_idxs[b]
-                Mb = self.Mbs[b]
-                if b == 0:
-                    optimal_snr_squared += (4. / self.interferometers.duration) * np.vdot(
-                        np.real(strain[start_idx:end_idx + 1] * np.conjugate(strain[start_idx:end_idx + 1])),
-                        interferometer.frequency_mask[Ks:Ke + 1] * self.windows[start_idx:end_idx + 1]
-                        / interferometer.power_spectral_density_array[Ks:Ke + 1])
-                else:
-                    self.wths[interferometer.name][b][Ks:Ke + 1] = self.square_root_windows[start_idx:end_idx + 1] \
-                        * strain[start_idx:end_idx + 1]
-                    self.hbcs[interferometer.name][b][-Mb:] = np.fft.irfft(self.wths[interferometer.name][b])
-                    thbc = np.fft.rfft(self.hbcs[interferometer.name][b])
-                    optimal_snr_squared += (4. / self.Tbhats[b]) * np.vdot(
-                        np.real(thbc * np.conjugate(thbc)), self.Ibcs[interferometer.name][b])
+                wth = self.wths[interferometer.name][b]
+                wth[Ks:Ke + 1] = self.square_root_windows[start_idx:end_idx + 1] * strain[start_idx:end_idx + 1]
+                # h^(b)_{c, m} is zero-padded to \hat{N}^(b) samples. Its position within the padded array only
+                # changes the phase of thbc, so the padding is appended by rfft.
+                thbc = np.fft.rfft(np.fft.irfft(wth, self.Mbs[b]), self.Nhatbs[b])
+                optimal_snr_squared += (4. / self.Tbhats[b]) * np.vdot(
+                    thbc.real**2 + thbc.imag**2, self.Ibcs[interferometer.name][b])
 
         complex_matched_filter_snr = d_inner_h / (optimal_snr_squared**0.5)
 
@@ -2305,3 +3352,362 @@ class MBGravitationalWaveTransient(GravitationalWaveTransient):
     def _rescale_signal(self, signal, new_distance):
         for mode in signal:
             signal[mode] *= self._ref_dist / new_distance
+
+
+class RelativeBinningGravitationalWaveTransient(GravitationalWaveTransient):
+    """A relative binning (heterodyned) likelihood object
+
+    This uses the method described in B. Zackay, L. Dai and T. Venumadhav,
+    2018, arXiv: 1806.08792. The ratio between the waveform and a fiducial
+    waveform close to the peak of the likelihood is approximated as linear in
+    frequency within a few hundred frequency bins, so that the likelihood is
+    computed from summary data and waveforms evaluated at the bin edges only.
+
+    The waveform model must evaluate waveforms on the frequencies passed as
+    the `frequencies` waveform argument, e.g.,
+    `bilby.gw.source.binary_black_hole_frequency_sequence` or
+    `bilby.gw.taylorf2.binary_neutron_star_heated_taylor_f2`.
+
+    Parameters
+    ==========
+    interferometers: list, bilby.gw.detector.InterferometerList
+        A list of `bilby.detector.Interferometer` instances - contains the
+        detector data and power spectral densities
+    waveform_generator: `bilby.waveform_generator.WaveformGenerator`
+        An object which computes the frequency-domain strain of the signal,
+        given some set of parameters
+    fiducial_parameters: dict
+        The parameters of the fiducial waveform, including the extrinsic
+        parameters `ra`, `dec`, `psi` and `geocent_time`
+    epsilon: float, optional
+        The maximum dephasing allowed across a single bin. Default is 0.5.
+    chi: float, optional
+        The scale of the bound on the dephasing. Default is 1.
+    frequency_powers: array_like, optional
+        The powers of frequency in the post-Newtonian phase used to bound the
+        dephasing. The default includes the f^(-1/3) and f^(2/3) terms of the
+        tidal-heating phase, see `bilby.gw.source.phase_TH`.
+    time_marginalization: bool, optional
+        If true, marginalize over time in the likelihood. The summary data is
+        computed for all the times allowed by the geocent_time prior.
+    distance_marginalization: bool, optional
+        If true, marginalize over distance in the likelihood.
+        This uses a look up table calculated at run time.
+    phase_marginalization: bool, optional
+        If true, marginalize over phase in the likelihood.
+        This is done analytically using a Bessel function.
+    priors: dict, optional
+        If given, used in the distance, phase and time marginalization.
+    distance_marginalization_lookup_table: (dict, str), optional
+        If a dict, dictionary containing the lookup_table, distance_array,
+        (distance) prior_array, and reference_distance used to construct
+        the table.
+        If a string the name of a file containing these quantities.
+    jitter_time: bool, optional
+        Whether to introduce a `time_jitter` parameter when marginalizing over
+        time.
+    reference_frame: (str, bilby.gw.detector.InterferometerList, list), optional
+        Definition of the reference frame for the sky location.
+    time_reference: str, optional
+        Name of the reference for the sampled time parameter.
+
+    Returns
+    =======
+    Likelihood: `bilby.core.likelihood.Likelihood`
+        A likelihood object, able to compute the likelihood of the data given
+        some model parameters
+
+    """
+
+    _default_frequency_powers = (-5. / 3., -2. / 3., -1. / 3., 2. / 3., 1., 5. / 3., 7. / 3.)
+
+    def __init__(
+        self, interferometers, waveform_generator, fiducial_parameters,
+        epsilon=0.5, chi=1., frequency_powers=None, time_marginalization=False,
+        distance_marginalization=False, phase_marginalization=False, priors=None,
+        distance_marginalization_lookup_table=None, jitter_time=True,
+        reference_frame="sky", time_reference="geocenter"
+    ):
+        super(RelativeBinningGravitationalWaveTransient, self).__init__(
+            interferometers=interferometers, waveform_generator=waveform_generator, priors=priors,
+            distance_marginalization=distance_marginalization, phase_marginalization=phase_marginalization,
+            time_marginalization=time_marginalization,
+            distance_marginalization_lookup_table=distance_marginalization_lookup_table,
+            jitter_time=jitter_time, reference_frame=reference_frame, time_reference=time_reference
+        )
+        self.fiducial_parameters = dict(fiducial_parameters)
+        self.epsilon = epsilon
+        self.chi = chi
+        if frequency_powers is None:
+            frequency_powers = self._default_frequency_powers
+        self.frequency_powers = np.array(frequency_powers, dtype=float)
+        self.setup_bins()
+        self.set_fiducial_waveforms(self.fiducial_parameters)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(interferometers={},\n\twaveform_generator={},\n\t' \
+                                         'fiducial_parameters={}, epsilon={}, chi={},\n\t' \
+                                         'time_marginalization={}, distance_marginalization={}, ' \
+                                         'phase_marginalization={}, priors={})'\
+            .format(self.interferometers, self.waveform_generator, self.fiducial_parameters,
+                    self.epsilon, self.chi, self.time_marginalization, self.distance_marginalization,
+                    self.phase_marginalization, self.priors)
+
+    def setup_bins(self):
+        """Set up the frequency bins so that the dephasing bound is at most
+        epsilon in each bin. This adds the bin edges into the
+        waveform_arguments of waveform_generator as `frequencies` and sets
+        the following instance variables.
+
+        bin_indices: indices of the bin edges in the full frequency array
+        bin_frequencies: frequencies of the bin edges
+        number_of_bins: the number of bins
+        """
+        frequency_array = self.interferometers.frequency_array
+        minimum_frequency = np.min([ifo.minimum_frequency for ifo in self.interferometers])
+        maximum_frequency = np.max([ifo.maximum_frequency for ifo in self.interferometers])
+        self._band_indices = np.where(
+            (frequency_array >= minimum_frequency) & (frequency_array <= maximum_frequency))[0]
+        frequencies = frequency_array[self._band_indices]
+
+        reference_frequencies = np.where(self.frequency_powers < 0, frequencies[0], frequencies[-1])
+        delta_phase = 2 * np.pi * self.chi * np.sum(
+            np.sign(self.frequency_powers) *
+            (frequencies[:, None] / reference_frequencies) ** self.frequency_powers, axis=1)
+        delta_phase -= delta_phase[0]
+        number_of_bins = max(int(np.ceil(delta_phase[-1] / self.epsilon)), 1)
+        edges = np.searchsorted(delta_phase, np.linspace(0, delta_phase[-1], number_of_bins + 1))
+        edges = np.unique(np.clip(edges, 0, len(frequencies) - 1))
+        edges[0] = 0
+        edges[-1] = len(frequencies) - 1
+
+        self._local_bin_indices = edges
+        self.bin_indices = self._band_indices[edges]
+        self.bin_frequencies = frequencies[edges]
+        self.number_of_bins = len(edges) - 1
+        self._bin_widths = np.diff(self.bin_frequencies)
+        bin_centers = (self.bin_frequencies[1:] + self.bin_frequencies[:-1]) / 2
+        bin_of_frequency = np.repeat(
+            np.arange(self.number_of_bins), np.diff(np.append(edges[:-1], len(frequencies))))
+        self._offsets_from_bin_centers = frequencies - bin_centers[bin_of_frequency]
+        self.waveform_generator.waveform_arguments['frequencies'] = self.bin_frequencies
+        logger.info("The number of frequency bins for relative binning is {}.".format(self.number_of_bins))
+        logger.info("The speed-up gain of relative binning is {}.".format(
+            len(frequencies) / len(self.bin_frequencies)))
+
+    def _bin_sum(self, values):
+        """Sum an array over the in-band frequencies in each bin"""
+        return np.add.reduceat(values, self._local_bin_indices[:-1], axis=-1)
+
+    def _frequency_domain_strain_at(self, frequencies, parameters):
+        """Evaluate the waveform polarizations on the given frequencies"""
+        self.waveform_generator.waveform_arguments['frequencies'] = frequencies
+        try:
+            return self.waveform_generator.frequency_domain_strain(parameters)
+        finally:
+            self.waveform_generator.waveform_arguments['frequencies'] = self.bin_frequencies
+
+    def full_frequency_domain_strain(self, parameters):
+        """ Evaluate the waveform polarizations on the full frequency array
+
+        The waveforms are evaluated on the in-band frequencies and are zero
+        elsewhere.
+
+        Parameters
+        ==========
+        parameters: dict
+            The waveform parameters
+
+        Returns
+        =======
+        dict: The waveform polarizations, None if the waveform failed
+        """
+        polarizations = self._frequency_domain_strain_at(
+            self.interferometers.frequency_array[self._band_indices], parameters)
+        if polarizations is None:
+            return None
+        full_polarizations = dict()
+        for mode in polarizations:
+            full_polarizations[mode] = np.zeros(len(self.interferometers.frequency_array), dtype=complex)
+            full_polarizations[mode][self._band_indices] = polarizations[mode]
+        return full_polarizations
+
+    @staticmethod
+    def _compute_detector_response(waveform_polarizations, interferometer, frequencies, parameters):
+        """Compute the detector response on the given frequencies, see
+        `bilby.gw.detector.Interferometer.get_detector_response`"""
+        response = np.zeros(len(frequencies), dtype=complex)
+        antenna_responses = interferometer.antenna_responses(
+            parameters['ra'], parameters['dec'], parameters['geocent_time'], parameters['psi'],
+            waveform_polarizations.keys())
+        for mode in waveform_polarizations:
+            response += waveform_polarizations[mode] * antenna_responses[mode]
+        time_shift = interferometer.time_delay_from_geocenter(
+            parameters['ra'], parameters['dec'], parameters['geocent_time'])
+        dt = parameters['geocent_time'] - interferometer.strain_data.start_time + time_shift
+        response *= np.exp(-1j * 2 * np.pi * dt * frequencies)
+        response *= interferometer.calibration_model.get_calibration_factor(
+            frequencies, prefix='recalib_{}_'.format(interferometer.name), **parameters)
+        return response
+
+    def set_fiducial_waveforms(self, parameters):
+        """ Compute the fiducial waveforms and the summary data
+
+        This can be called again with parameters closer to the peak of the
+        likelihood to improve the accuracy.
+
+        Parameters
+        ==========
+        parameters: dict
+            The parameters of the fiducial waveform
+        """
+        self.fiducial_parameters = dict(parameters)
+        fiducial_parameters = self.fiducial_parameters.copy()
+        if self.time_marginalization:
+            # the waveforms are computed at the start time when marginalizing over time
+            fiducial_parameters['geocent_time'] = float(self.interferometers.start_time)
+
+        frequencies = self.interferometers.frequency_array[self._band_indices]
+        polarizations = self._frequency_domain_strain_at(frequencies, fiducial_parameters)
+        if polarizations is None:
+            raise ValueError("Unable to compute the fiducial waveform for {}".format(parameters))
+
+        self.fiducial_waveforms = dict()
+        self._ratio_edge_indices = dict()
+        self.summary_data = dict()
+        for interferometer in self.interferometers:
+            logger.info("Pre-computing relative binning summary data for {}".format(interferometer.name))
+            fiducial_response = self._compute_detector_response(
+                polarizations, interferometer, frequencies, fiducial_parameters)
+            # edges where the fiducial waveform vanishes, e.g., above the cutoff frequency,
+            # use the ratio at the closest edge where it does not
+            fiducial_at_edges = fiducial_response[self._local_bin_indices]
+            nonzero_edges = np.where(fiducial_at_edges != 0)[0]
+            if len(nonzero_edges) == 0:
+                raise ValueError("The fiducial waveform vanishes in {}".format(interferometer.name))
+            self._ratio_edge_indices[interferometer.name] = nonzero_edges[np.clip(
+                np.searchsorted(nonzero_edges, np.arange(len(fiducial_at_edges))), 0, len(nonzero_edges) - 1)]
+            self.fiducial_waveforms[interferometer.name] = \
+                fiducial_at_edges[self._ratio_edge_indices[interferometer.name]]
+
+            mask = interferometer.frequency_mask[self._band_indices]
+            weights = np.zeros(len(frequencies))
+            weights[mask] = 4. / self.waveform_generator.duration / \
+                interferometer.power_spectral_density_array[self._band_indices][mask]
+            linear_integrand = (
+                interferometer.frequency_domain_strain[self._band_indices] * np.conjugate(fiducial_response) * weights)
+            quadratic_integrand = np.abs(fiducial_response) ** 2 * weights
+            summary_data = dict(
+                a0=self._bin_sum(linear_integrand),
+                a1=self._bin_sum(linear_integrand * self._offsets_from_bin_centers),
+                b0=self._bin_sum(quadratic_integrand),
+                b1=self._bin_sum(quadratic_integrand * self._offsets_from_bin_centers))
+
+            if self.time_marginalization:
+                summary_data['a0_tc'], summary_data['a1_tc'] = self._time_shifted_bin_sums(
+                    linear_integrand, frequencies)
+            self.summary_data[interferometer.name] = summary_data
+
+    def _time_shifted_bin_sums(self, linear_integrand, frequencies):
+        """ The linear summary data for each time in :code:`self._times[self._time_window]`
+
+        The time-shift phasor :code:`exp(2 pi i f t)` is advanced from one
+        time to the next by multiplying with :code:`exp(2 pi i f delta_t)`,
+        so the exponential is only evaluated once per frequency rather than
+        once per frequency and time.
+        """
+        delta_t = self._delta_tc
+        integrands = np.array([linear_integrand, linear_integrand * self._offsets_from_bin_centers])
+        summary_data = np.zeros((len(self._time_window), 2, self.number_of_bins), dtype=complex)
+        step = np.exp(2j * np.pi * frequencies * delta_t)
+        shifted = None
+        for ii, index in enumerate(self._time_window):
+            if shifted is None or index != self._time_window[ii - 1] + 1:
+                shifted = integrands * np.exp(2j * np.pi * frequencies * index * delta_t)
+            else:
+                shifted *= step
+            summary_data[ii] = self._bin_sum(shifted)
+        return summary_data[:, 0], summary_data[:, 1]
+
+    def calculate_snrs(self, waveform_polarizations, interferometer):
+        """
+        Compute the snrs for relative binning
+
+        Polarizations evaluated on the full frequency array, e.g., from
+        :meth:`full_frequency_domain_strain`, use the standard likelihood.
+
+        Parameters
+        ==========
+        waveform_polarizations: dict
+            A dictionary of waveform polarizations at the bin edges
+        interferometer: bilby.gw.detector.Interferometer
+            The bilby interferometer object
+
+        Returns
+        =======
+        calculated_snrs: _CalculatedSNRs
+            As for :meth:`GravitationalWaveTransient.calculate_snrs`, the
+            :code:`d_inner_h_array` is evaluated at
+            :code:`self._times[self._time_window]`.
+
+        """
+        if len(waveform_polarizations['plus']) == len(interferometer.frequency_array):
+            return super(RelativeBinningGravitationalWaveTransient, self).calculate_snrs(
+                waveform_polarizations=waveform_polarizations, interferometer=interferometer)
+
+        strain = self._compute_detector_response(
+            waveform_polarizations, interferometer, self.bin_frequencies, self.parameters)
+        ratio = np.conjugate(
+            strain[self._ratio_edge_indices[interferometer.name]] / self.fiducial_waveforms[interferometer.name])
+        r0 = (ratio[1:] + ratio[:-1]) / 2
+        r1 = (ratio[1:] - ratio[:-1]) / self._bin_widths
+
+        summary_data = self.summary_data[interferometer.name]
+        d_inner_h = np.dot(summary_data['a0'], r0) + np.dot(summary_data['a1'], r1)
+        optimal_snr_squared = (
+            np.dot(summary_data['b0'], np.abs(r0) ** 2) +
+            2 * np.dot(summary_data['b1'], np.real(r0 * np.conjugate(r1))))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            complex_matched_filter_snr = d_inner_h / (optimal_snr_squared**0.5)
+
+        d_inner_h_array = None
+        if self.time_marginalization:
+            d_inner_h_array = np.dot(summary_data['a0_tc'], r0) + np.dot(summary_data['a1_tc'], r1)
+
+        return self._CalculatedSNRs(
+            d_inner_h=d_inner_h, optimal_snr_squared=optimal_snr_squared,
+            complex_matched_filter_snr=complex_matched_filter_snr,
+            d_inner_h_array=d_inner_h_array,
+            optimal_snr_squared_array=None,
+            d_inner_h_squared_tc_array=None)
+
+    def generate_posterior_sample_from_marginalized_likelihood(self):
+        """
+        Reconstruct the marginalized parameters using the full waveforms.
+
+        See :meth:`GravitationalWaveTransient.generate_posterior_sample_from_marginalized_likelihood`
+
+        Returns
+        =======
+        sample: dict
+            Returns the parameters with new samples.
+        """
+        if any([self.phase_marginalization, self.distance_marginalization,
+                self.time_marginalization]):
+            signal_polarizations = self.full_frequency_domain_strain(self.parameters)
+        else:
+            return self.parameters
+
+        if self.time_marginalization:
+            new_time = self.generate_time_sample_from_marginalized_likelihood(
+                signal_polarizations=signal_polarizations)
+            self.parameters['geocent_time'] = new_time
+        if self.distance_marginalization:
+            new_distance = self.generate_distance_sample_from_marginalized_likelihood(
+                signal_polarizations=signal_polarizations)
+            self.parameters['luminosity_distance'] = new_distance
+        if self.phase_marginalization:
+            new_phase = self.generate_phase_sample_from_marginalized_likelihood(
+                signal_polarizations=signal_polarizations)
+            self.parameters['phase'] = new_phase
+        return self.parameters.copy()
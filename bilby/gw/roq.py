@@ -0,0 +1,337 @@
+"""
+Construction of reduced order quadrature (ROQ) bases.
+
+The bases are built with a greedy reduced-basis algorithm followed by the
+empirical interpolation method (EIM), see Field et al., (2014) Phys. Rev. X 4,
+031006 and Smith et al., (2016) Phys. Rev. D 94, 044031. The outputs are
+written in the format read by
+:class:`bilby.gw.likelihood.ROQGravitationalWaveTransient`, i.e.,
+`B_linear.npy`, `B_quadratic.npy`, `fnodes_linear.npy`,
+`fnodes_quadratic.npy` and `params.dat`.
+"""
+import multiprocessing
+import os
+
+import numpy as np
+from scipy.linalg import solve
+
+from ..core.prior import PriorDict
+from ..core.utils import logger, check_directory_exists_and_if_not_mkdir
+from .conversion import component_masses_to_chirp_mass
+from .prior import CBCPriorDict
+from .waveform_generator import WaveformGenerator
+
+
+def greedy_reduced_basis(training_set, tolerance=1e-8, maximum_basis_size=None):
+    """ Build an orthonormal reduced basis with the greedy algorithm
+
+    At each iteration the training vector worst represented by the current
+    basis is orthonormalized against it and added to the basis, until the
+    squared projection error of every training vector is below the
+    tolerance.
+
+    Parameters
+    ==========
+    training_set: array_like
+        The training vectors with shape (number of vectors, number of
+        frequencies), these are normalized internally
+    tolerance: float
+        The maximum squared projection error of the normalized training
+        vectors
+    maximum_basis_size: int, optional
+        The maximum number of basis elements
+
+    Returns
+    =======
+    basis: array_like
+        The orthonormal basis with shape (basis size, number of frequencies)
+    errors: array_like
+        The maximum projection error after adding each basis element
+    """
+    training_set = np.array(training_set)
+    norms = np.linalg.norm(training_set, axis=1)
+    training_set = training_set[norms > 0] / norms[norms > 0, None]
+    if maximum_basis_size is None:
+        maximum_basis_size = min(training_set.shape)
+
+    basis = np.zeros((maximum_basis_size, training_set.shape[1]), dtype=training_set.dtype)
+    projection_norms = np.zeros(len(training_set))
+    errors = list()
+    index = 0
+    for ii in range(maximum_basis_size):
+        new_element = training_set[index].copy()
+        # iterated modified Gram-Schmidt for numerical stability
+        for _ in range(2):
+            new_element -= np.dot(basis[:ii].conjugate() @ new_element, basis[:ii])
+        basis[ii] = new_element / np.linalg.norm(new_element)
+        projection_norms += np.abs(training_set @ basis[ii].conjugate()) ** 2
+        projection_errors = 1 - projection_norms
+        index = np.argmax(projection_errors)
+        errors.append(projection_errors[index])
+        if projection_errors[index] < tolerance:
+            break
+    else:
+        logger.warning(
+            "Greedy algorithm reached the maximum basis size {} with "
+            "projection error {}".format(maximum_basis_size, errors[-1]))
+    return basis[:len(errors)], np.array(errors)
+
+
+def empirical_interpolation(basis):
+    """ Find the empirical interpolation nodes and interpolant of a basis
+
+    Parameters
+    ==========
+    basis: array_like
+        Reduced basis with shape (basis size, number of frequencies)
+
+    Returns
+    =======
+    nodes: array_like
+        The indices of the interpolation nodes
+    interpolant: array_like
+        The interpolant B with shape (basis size, number of frequencies)
+        such that h(f) ~ sum_j B_j(f) h(F_j) where F_j are the nodes
+    """
+    basis = np.asarray(basis)
+    nodes = [np.argmax(np.abs(basis[0]))]
+    for ii in range(1, len(basis)):
+        coefficients = solve(basis[:ii, nodes].T, basis[ii, nodes])
+        residual = basis[ii] - coefficients @ basis[:ii]
+        nodes.append(np.argmax(np.abs(residual)))
+    nodes = np.array(nodes)
+    vandermonde = basis[:, nodes].T
+    interpolant = solve(vandermonde.T, basis)
+    return nodes, interpolant
+
+
+def _evaluate_training_waveform(args):
+    """A wrapper of the waveform evaluation to enable multiprocessing"""
+    waveform_generator, parameters, mask = args
+    polarizations = waveform_generator.frequency_domain_strain(parameters)
+    if polarizations is None:
+        return None
+    return np.array([polarizations['plus'][mask], polarizations['cross'][mask]])
+
+
+class ROQBasisBuilder(object):
+    """ Build linear and quadratic ROQ bases for a frequency-domain model
+
+    Parameters
+    ==========
+    frequency_domain_source_model: func
+        The waveform model, e.g.,
+        `bilby.gw.source.lal_binary_black_hole_tidal_heating`
+    priors: dict, bilby.core.prior.PriorDict
+        The prior from which the training waveforms are drawn
+    minimum_frequency: float
+        The lower frequency bound of the basis (flow)
+    maximum_frequency: float
+        The upper frequency bound of the basis (fhigh)
+    duration: float
+        The segment length of the basis (seglen)
+    waveform_arguments: dict, optional
+        Fixed keyword arguments of the waveform model
+    parameter_conversion: func, optional
+        Parameter conversion of the waveform generator, default is
+        `bilby.gw.conversion.convert_to_lal_binary_black_hole_parameters`
+    number_of_training_waveforms: int, optional
+        The number of training waveforms drawn from the prior
+    linear_tolerance, quadratic_tolerance: float, optional
+        The maximum squared projection error of the greedy algorithm
+    maximum_basis_size: int, optional
+        The maximum size of either basis
+    npool: int, optional
+        The number of processes used to evaluate the training waveforms
+    """
+
+    def __init__(
+        self, frequency_domain_source_model, priors, minimum_frequency,
+        maximum_frequency, duration, waveform_arguments=None,
+        parameter_conversion=None, number_of_training_waveforms=1000,
+        linear_tolerance=1e-8, quadratic_tolerance=1e-8,
+        maximum_basis_size=None, npool=1
+    ):
+        if isinstance(priors, dict) and not isinstance(priors, PriorDict):
+            priors = PriorDict(priors)
+        self.priors = priors
+        self.minimum_frequency = minimum_frequency
+        self.maximum_frequency = maximum_frequency
+        self.duration = duration
+        self.waveform_generator = WaveformGenerator(
+            duration=duration, sampling_frequency=2 * maximum_frequency,
+            frequency_domain_source_model=frequency_domain_source_model,
+            parameter_conversion=parameter_conversion,
+            waveform_arguments=waveform_arguments)
+        self.frequency_mask = self.waveform_generator.frequency_array >= minimum_frequency
+        self.frequency_array = self.waveform_generator.frequency_array[self.frequency_mask]
+        self.number_of_training_waveforms = number_of_training_waveforms
+        self.linear_tolerance = linear_tolerance
+        self.quadratic_tolerance = quadratic_tolerance
+        self.maximum_basis_size = maximum_basis_size
+        self.npool = npool
+        self.training_parameters = None
+        self.linear_basis = None
+        self.quadratic_basis = None
+
+    def draw_training_parameters(self, size):
+        """ Draw parameters from the prior
+
+        Parameters
+        ==========
+        size: int
+            The number of samples
+
+        Returns
+        =======
+        list: A list of parameter dictionaries
+        """
+        samples = self.priors.sample(size)
+        return [{key: samples[key][ii] for key in samples} for ii in range(size)]
+
+    def generate_waveforms(self, parameters_list):
+        """ Evaluate the plus and cross polarizations in the basis band
+
+        Parameters
+        ==========
+        parameters_list: list
+            A list of parameter dictionaries
+
+        Returns
+        =======
+        array_like: The waveforms with shape
+            (number of parameters, 2, number of frequencies), samples for
+            which the waveform generation failed are dropped
+        """
+        args = [(self.waveform_generator, parameters, self.frequency_mask)
+                for parameters in parameters_list]
+        if self.npool > 1:
+            logger.info(
+                "Using a pool with size {} for {} waveforms".format(self.npool, len(args)))
+            with multiprocessing.Pool(processes=self.npool) as pool:
+                waveforms = pool.map(_evaluate_training_waveform, args)
+        else:
+            waveforms = [_evaluate_training_waveform(arg) for arg in args]
+        waveforms = [waveform for waveform in waveforms if waveform is not None]
+        return np.array(waveforms)
+
+    @staticmethod
+    def _quadratic_training_set(waveforms):
+        """The products of polarizations entering the optimal SNR"""
+        plus, cross = waveforms[:, 0], waveforms[:, 1]
+        plus_squared = np.abs(plus) ** 2
+        plus_cross = np.real(plus * np.conjugate(cross))
+        # the cross term vanishes up to rounding for non-precessing signals
+        keep = np.linalg.norm(plus_cross, axis=1) > 1e-10 * np.linalg.norm(plus_squared, axis=1)
+        return np.concatenate([plus_squared, np.abs(cross) ** 2, plus_cross[keep]])
+
+    def build(self):
+        """ Build the linear and quadratic bases and their interpolation nodes
+
+        This sets the linear_basis, linear_nodes, quadratic_basis and
+        quadratic_nodes attributes, where the bases are the interpolants
+        """
+        self.training_parameters = self.draw_training_parameters(self.number_of_training_waveforms)
+        logger.info("Generating {} training waveforms".format(len(self.training_parameters)))
+        waveforms = self.generate_waveforms(self.training_parameters)
+
+        logger.info("Building the linear basis")
+        basis, errors = greedy_reduced_basis(
+            waveforms.reshape(-1, waveforms.shape[-1]), tolerance=self.linear_tolerance,
+            maximum_basis_size=self.maximum_basis_size)
+        nodes, self.linear_basis = empirical_interpolation(basis)
+        self.linear_nodes = self.frequency_array[nodes]
+        logger.info("The linear basis has {} elements with projection error {}".format(
+            len(nodes), errors[-1]))
+
+        logger.info("Building the quadratic basis")
+        basis, errors = greedy_reduced_basis(
+            self._quadratic_training_set(waveforms), tolerance=self.quadratic_tolerance,
+            maximum_basis_size=self.maximum_basis_size)
+        nodes, self.quadratic_basis = empirical_interpolation(basis)
+        self.quadratic_nodes = self.frequency_array[nodes]
+        logger.info("The quadratic basis has {} elements with projection error {}".format(
+            len(nodes), errors[-1]))
+
+    def validate(self, number_of_waveforms=100):
+        """ Compute the interpolation errors of waveforms drawn from the prior
+
+        Parameters
+        ==========
+        number_of_waveforms: int
+            The number of validation waveforms
+
+        Returns
+        =======
+        linear_errors, quadratic_errors: array_like
+            The relative L2 interpolation errors
+        """
+        waveforms = self.generate_waveforms(self.draw_training_parameters(number_of_waveforms))
+        linear_errors = list()
+        for waveform in waveforms.reshape(-1, waveforms.shape[-1]):
+            interpolated = waveform[self._node_indices(self.linear_nodes)] @ self.linear_basis
+            linear_errors.append(np.linalg.norm(waveform - interpolated) / np.linalg.norm(waveform))
+        quadratic_errors = list()
+        for waveform in self._quadratic_training_set(waveforms):
+            interpolated = waveform[self._node_indices(self.quadratic_nodes)] @ self.quadratic_basis
+            quadratic_errors.append(np.linalg.norm(waveform - interpolated) / np.linalg.norm(waveform))
+        return np.array(linear_errors), np.array(quadratic_errors)
+
+    def _node_indices(self, nodes):
+        return np.searchsorted(self.frequency_array, nodes)
+
+    @property
+    def roq_params(self):
+        """ The ROQ parameters written to params.dat
+
+        The chirp-mass and component-mass bounds are taken from the prior if
+        it is a `bilby.gw.prior.CBCPriorDict`, otherwise from the training
+        waveforms.
+        """
+        minimum_chirp_mass = maximum_chirp_mass = minimum_component_mass = None
+        if isinstance(self.priors, CBCPriorDict):
+            minimum_chirp_mass = self.priors.minimum_chirp_mass
+            maximum_chirp_mass = self.priors.maximum_chirp_mass
+            minimum_component_mass = self.priors.minimum_component_mass
+        if None in [minimum_chirp_mass, maximum_chirp_mass, minimum_component_mass]:
+            converted = [self.waveform_generator.parameter_conversion(parameters.copy())[0]
+                         for parameters in self.training_parameters]
+            mass_1 = np.array([parameters['mass_1'] for parameters in converted])
+            mass_2 = np.array([parameters['mass_2'] for parameters in converted])
+            chirp_mass = component_masses_to_chirp_mass(mass_1, mass_2)
+            if minimum_chirp_mass is None:
+                minimum_chirp_mass = np.min(chirp_mass)
+            if maximum_chirp_mass is None:
+                maximum_chirp_mass = np.max(chirp_mass)
+            if minimum_component_mass is None:
+                minimum_component_mass = np.min(mass_2)
+        return dict(
+            flow=self.minimum_frequency, fhigh=self.maximum_frequency,
+            seglen=self.duration, chirpmassmin=minimum_chirp_mass,
+            chirpmassmax=maximum_chirp_mass, compmin=minimum_component_mass)
+
+    def write(self, outdir):
+        """ Write the bases, nodes and parameters
+
+        Parameters
+        ==========
+        outdir: str
+            The output directory, the files can be passed to
+            `bilby.gw.likelihood.ROQGravitationalWaveTransient` as
+            linear_matrix, quadratic_matrix and roq_params, the nodes are the
+            frequency_nodes_linear and frequency_nodes_quadratic waveform
+            arguments of the ROQ source models
+        """
+        if self.linear_basis is None:
+            raise ValueError("The bases have not been built, call build first")
+        check_directory_exists_and_if_not_mkdir(outdir)
+        np.save(os.path.join(outdir, "B_linear.npy"), self.linear_basis)
+        np.save(os.path.join(outdir, "B_quadratic.npy"), self.quadratic_basis)
+        np.save(os.path.join(outdir, "fnodes_linear.npy"), self.linear_nodes)
+        np.save(os.path.join(outdir, "fnodes_quadratic.npy"), self.quadratic_nodes)
+        roq_params = self.roq_params
+        np.savetxt(
+            os.path.join(outdir, "params.dat"),
+            np.atleast_2d([roq_params[key] for key in roq_params]),
+            header=" ".join(roq_params.keys()), comments="")
+        logger.info("Written ROQ basis to {}".format(outdir))
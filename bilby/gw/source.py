@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import numpy as np
 from ..core import utils
 from ..core.utils import logger
@@ -40,37 +42,203 @@ from .utils import (lalsim_GetApproximantFromString,
 #    return delta_phase
 
 
+class _TidalHeatingFrequencyPowers(object):
+    """ Powers of the frequency entering the tidal-heating phase correction
+
+    The correction computed by :func:`phase_TH` is a sum of terms which
+    factorise into a mass-dependent coefficient and a power (or logarithm)
+    of the frequency. The frequency-dependent factors only depend on the
+    frequency array, so they are computed once and reused. The cached arrays
+    are read-only.
+
+    Parameters
+    ==========
+    frequency_array: array_like
+        The full frequency array
+    start_index: int
+        Index of the first frequency at which the correction is applied
+    """
+
+    def __init__(self, frequency_array, start_index):
+        frequencies = np.array(frequency_array[start_index:], dtype=float)
+        self.start_index = start_index
+        self.length = len(frequency_array)
+        self.frequencies = frequencies
+        self.log_frequencies = np.log(frequencies)
+        self.frequencies_log_frequencies = frequencies * self.log_frequencies
+        self.frequencies_one_third = np.cbrt(frequencies)
+        self.frequencies_two_thirds = self.frequencies_one_third ** 2
+        self.frequencies_minus_one_third = 1 / self.frequencies_one_third
+        for power in [self.frequencies, self.log_frequencies, self.frequencies_log_frequencies,
+                      self.frequencies_one_third, self.frequencies_two_thirds,
+                      self.frequencies_minus_one_third]:
+            power.flags.writeable = False
+        self._scratch = np.zeros_like(frequencies)
+        self._delta_phase = np.zeros(self.length)
+
+    def delta_phase(self, total_mass, eta, psi_so, H_eff5, H_eff8, Q_tilde, out):
+        """ Write the tidal-heating phase correction into `out`
+
+        Parameters
+        ==========
+        total_mass: float
+            Total mass in kg
+        eta: float
+            Symmetric mass ratio
+        psi_so: float
+            Spin-orbit coefficient of the 4PN term
+        H_eff5, H_eff8, Q_tilde: float
+            Horizon and quadrupole parameters
+        out: array_like
+            Array with the same length as the full frequency array, entries
+            below `start_index` are set to zero
+
+        Returns
+        =======
+        array_like: `out`
+        """
+        import lal
+        # v = x f^(1/3)
+        x = np.cbrt(lal.PI * lal.G_SI * total_mass) / lal.C_SI
+        log_x = np.log(x)
+        prefactor = 3.0 / (128.0 * eta)
+        # 2.5 PN term, -10 / 9 H_eff5 (3 log(v) + 1)
+        coeff_v5 = - prefactor * 10 / 9. * H_eff5
+        # 3.5 PN term, -5 / 168 (952 eta + 995) H_eff5 v^2
+        coeff_v7 = - prefactor * 5 * (952 * eta + 995) / 168.0 * H_eff5 * x ** 2
+        # 4PN term, 5 / 9 (H_eff5 Psi_SO - 4 H_eff8) v^3 (3 log(v) - 1)
+        coeff_v8 = prefactor * 5 / 9.0 * (H_eff5 * psi_so - 4 * H_eff8) * x ** 3
+        # 2 PN quadrupole term
+        coeff_qm = - (25 * Q_tilde) / (32 * eta * x)
+
+        out[:self.start_index] = 0
+        delta_phase = out[self.start_index:]
+        np.multiply(self.log_frequencies, coeff_v5, out=delta_phase)
+        delta_phase += coeff_v5 * (3 * log_x + 1)
+        for coefficient, power in [
+                (coeff_v7, self.frequencies_two_thirds),
+                (coeff_v8 * (3 * log_x - 1), self.frequencies),
+                (coeff_v8, self.frequencies_log_frequencies),
+                (coeff_qm, self.frequencies_minus_one_third)]:
+            np.multiply(power, coefficient, out=self._scratch)
+            delta_phase += self._scratch
+        return out
+
+
+_TIDAL_HEATING_FREQUENCY_POWERS = OrderedDict()
+_MAXIMUM_TIDAL_HEATING_CACHE_ENTRIES = 32
+
+
+def _get_tidal_heating_frequency_powers(frequency_array, start_index, check_frequencies=False):
+    """ Return the cached frequency powers for a frequency array
+
+    The cache is keyed on the length and end points of the frequency array
+    and the start index of the correction. This identifies regularly spaced
+    arrays, for arbitrary frequency sequences `check_frequencies` should be
+    set so the cached frequencies are compared with the requested ones.
+    The most recently used entries are kept, enough for the node arrays of
+    multibanding and multi-basis ROQ.
+    """
+    key = (len(frequency_array), float(frequency_array[0]),
+           float(frequency_array[-1]), start_index)
+    powers = _TIDAL_HEATING_FREQUENCY_POWERS.get(key, None)
+    if (powers is not None and check_frequencies and
+            not np.array_equal(powers.frequencies, frequency_array[start_index:])):
+        powers = None
+    if powers is None:
+        powers = _TidalHeatingFrequencyPowers(frequency_array, start_index)
+        _TIDAL_HEATING_FREQUENCY_POWERS[key] = powers
+        while len(_TIDAL_HEATING_FREQUENCY_POWERS) > _MAXIMUM_TIDAL_HEATING_CACHE_ENTRIES:
+            _TIDAL_HEATING_FREQUENCY_POWERS.popitem(last=False)
+    _TIDAL_HEATING_FREQUENCY_POWERS.move_to_end(key)
+    return powers
+
+
 def phase_TH(
         frequency_array, mass_1, mass_2, a_1, a_2, spin_1x, spin_1y, spin_1z,
-        spin_2x, spin_2y, spin_2z, H_eff5, H_eff8, Q_tilde, start_frequency, delta_frequency):
+        spin_2x, spin_2y, spin_2z, H_eff5, H_eff8, Q_tilde, start_frequency, delta_frequency,
+        out=None):
     """ Phase correction due to tidal heating
         Added spin-orbit interaction term and corrected positive-negative sign
+
+        The frequency-dependent factors are cached per frequency array, see
+        :class:`_TidalHeatingFrequencyPowers`. If `out` is given the
+        correction is written into it, otherwise a new array is returned.
     """
-    import lal
+    minIndx = int(start_frequency / delta_frequency)
+    powers = _get_tidal_heating_frequency_powers(frequency_array, minIndx)
+    return _tidal_heating_delta_phase(
+        powers, mass_1=mass_1, mass_2=mass_2, a_1=a_1, a_2=a_2,
+        spin_1z=spin_1z, spin_2z=spin_2z, H_eff5=H_eff5, H_eff8=H_eff8,
+        Q_tilde=Q_tilde, out=out)
+
+
+def phase_TH_frequency_sequence(
+        frequencies, mass_1, mass_2, a_1, a_2, spin_1z, spin_2z, H_eff5,
+        H_eff8, Q_tilde, start_frequency, out=None):
+    """ Phase correction due to tidal heating on arbitrary frequencies
+
+    The same correction as :func:`phase_TH` evaluated on an increasing, not
+    necessarily regularly spaced, frequency array, e.g., the nodes used by
+    multibanding and ROQ.
+
+    Parameters
+    ==========
+    frequencies: array_like
+        Increasing array of frequencies
+    mass_1, mass_2: float
+        Component masses in kg
+    a_1, a_2: float
+        Dimensionless spin magnitudes
+    spin_1z, spin_2z: float
+        Spin components along the orbital angular momentum
+    H_eff5, H_eff8, Q_tilde: float
+        Horizon and quadrupole parameters
+    start_frequency: float
+        The correction vanishes below this frequency
+    out: array_like, optional
+        Array the correction is written into, by default a new array is
+        returned
+
+    Returns
+    =======
+    array_like: The phase correction
+    """
+    start_index = int(np.searchsorted(frequencies, start_frequency))
+    powers = _get_tidal_heating_frequency_powers(
+        frequencies, start_index, check_frequencies=True)
+    return _tidal_heating_delta_phase(
+        powers, mass_1=mass_1, mass_2=mass_2, a_1=a_1, a_2=a_2,
+        spin_1z=spin_1z, spin_2z=spin_2z, H_eff5=H_eff5, H_eff8=H_eff8,
+        Q_tilde=Q_tilde, out=out)
+
+
+def _tidal_heating_delta_phase(
+        powers, mass_1, mass_2, a_1, a_2, spin_1z, spin_2z, H_eff5, H_eff8,
+        Q_tilde, out=None):
     m = mass_1 + mass_2
     eta = mass_1 * mass_2 / m**2
-    minIndx = int(start_frequency / delta_frequency)
-    frequency_array_effective = frequency_array[minIndx:]
-    v = np.cbrt(lal.PI * lal.G_SI * m * frequency_array_effective) / lal.C_SI
-    phase_term1 = 3.0 / (128.0 * eta * v**5)
-    # 2 PN quadrupole term
-    term_QM = -( 25 * Q_tilde ) / ( 32 * eta * v)
-    # 3.5 PN term ** -ve sign added
-    term_v7 = - 5 * v**7 * (952 * eta + 995) / 168.0 * H_eff5
-    # 2.5 PN term ** -ve sign added ***
-    term_v5 = - 10 * v**5 * (3 * np.log(v) + 1) / 9. * H_eff5
     # spin aligned case, to be added the precession effects
     LdotS1 = spin_1z * 1
     LdotS2 = spin_2z * 1
     # spin-orbit interaction term
     Psi_SO = 1. / 6. * ((- 56 * eta - 73 * (np.sqrt(1 - 4 * eta) - 1)) * LdotS1 * a_1 +
                         (- 56 * eta - 73 * (np.sqrt(1 - 4 * eta) - 1)) * LdotS2 * a_2)
-    # 4PN term
-    term_v8 = 5 * v**8 * (3 * np.log(v) - 1) / 9.0 * (H_eff5 * Psi_SO - 4 * H_eff8)
-    # 2 PN quadrupole term abrorbs 'phase_term1'
-    delta_phase = phase_term1 * (term_v5 + term_v7 + term_v8) + term_QM
-    delta_phase = np.concatenate((np.zeros(minIndx), delta_phase))
-    return delta_phase
+    if out is None:
+        out = np.zeros(powers.length)
+    return powers.delta_phase(
+        total_mass=m, eta=eta, psi_so=Psi_SO, H_eff5=H_eff5, H_eff8=H_eff8,
+        Q_tilde=Q_tilde, out=out)
+
+
+def _tidal_heating_phasor(powers, start_index, end_index, **kwargs):
+    """ Return :code:`exp(-i delta_phase)` between the indices as a new array
+
+    The phase correction is written into a buffer owned by `powers`, which
+    is not returned.
+    """
+    delta_phase = _tidal_heating_delta_phase(powers, out=powers._delta_phase, **kwargs)
+    return np.exp(-1j * delta_phase[start_index:end_index])
 
 
 def ISCO(m1, m2):
@@ -445,6 +613,181 @@ def lal_eccentric_binary_black_hole_no_spins(
         eccentricity=eccentricity, **waveform_kwargs)
 
 
+class _LALWaveformContext(object):
+    """ LALSimulation structures shared by calls with the same configuration
+
+    Creating the LAL waveform dictionary, inserting the PN orders, the mode
+    array and other fixed waveform arguments and resolving the approximant
+    are only done once per configuration. For each waveform the dictionary is
+    copied and the tidal deformabilities are inserted.
+
+    Parameters
+    ==========
+    waveform_approximant: str
+        The lalsimulation approximant
+    pn_spin_order, pn_tidal_order, pn_phase_order, pn_amplitude_order: int
+        The PN orders
+    insertions: tuple
+        Pairs of names and values set with the corresponding
+        `SimInspiralWaveformParamsInsert` functions
+    mode_array: list, optional
+        The modes to activate
+    numerical_relativity_file: str, optional
+        Path of the numerical relativity data
+    lal_waveform_dictionary: lal.Dict, optional
+        The dictionary to insert the arguments into, by default a new
+        dictionary is created
+    """
+
+    def __init__(self, waveform_approximant, pn_spin_order, pn_tidal_order,
+                 pn_phase_order, pn_amplitude_order, insertions=(),
+                 mode_array=None, numerical_relativity_file=None,
+                 lal_waveform_dictionary=None):
+        import lal
+        import lalsimulation as lalsim
+
+        self.approximant = lalsim_GetApproximantFromString(waveform_approximant)
+        self.frequency_domain = bool(
+            lalsim.SimInspiralImplementedFDApproximants(self.approximant))
+        if lal_waveform_dictionary is None:
+            lal_waveform_dictionary = lal.CreateDict()
+        self.waveform_dictionary = lal_waveform_dictionary
+        lalsim.SimInspiralWaveformParamsInsertPNSpinOrder(
+            self.waveform_dictionary, int(pn_spin_order))
+        lalsim.SimInspiralWaveformParamsInsertPNTidalOrder(
+            self.waveform_dictionary, int(pn_tidal_order))
+        lalsim.SimInspiralWaveformParamsInsertPNPhaseOrder(
+            self.waveform_dictionary, int(pn_phase_order))
+        lalsim.SimInspiralWaveformParamsInsertPNAmplitudeOrder(
+            self.waveform_dictionary, int(pn_amplitude_order))
+        for key, value in insertions:
+            _lal_insert_function(key)(self.waveform_dictionary, value)
+        self._fixed_lambdas = {
+            key for key, _ in insertions if key in ("TidalLambda1", "TidalLambda2")}
+        if numerical_relativity_file is not None:
+            lalsim.SimInspiralWaveformParamsInsertNumRelData(
+                self.waveform_dictionary, numerical_relativity_file)
+        if mode_array is not None:
+            mode_array_lal = lalsim.SimInspiralCreateModeArray()
+            for mode in mode_array:
+                lalsim.SimInspiralModeArrayActivateMode(mode_array_lal, mode[0], mode[1])
+            lalsim.SimInspiralWaveformParamsInsertModeArray(
+                self.waveform_dictionary, mode_array_lal)
+
+    def create_waveform_dictionary(self, lambda_1, lambda_2):
+        """ Return a copy of the waveform dictionary with the tidal
+        deformabilities inserted
+
+        A copy is returned as lalsimulation may add entries to the dictionary,
+        e.g., the quadrupole-monopole parameters derived from the tidal
+        deformabilities. Each deformability is not inserted if it is fixed by
+        the waveform arguments, i.e., `TidalLambda1` or `TidalLambda2`.
+        """
+        from lal import DictDuplicate
+        waveform_dictionary = DictDuplicate(self.waveform_dictionary)
+        if "TidalLambda1" not in self._fixed_lambdas:
+            lalsim_SimInspiralWaveformParamsInsertTidalLambda1(
+                waveform_dictionary, lambda_1)
+        if "TidalLambda2" not in self._fixed_lambdas:
+            lalsim_SimInspiralWaveformParamsInsertTidalLambda2(
+                waveform_dictionary, lambda_2)
+        return waveform_dictionary
+
+
+_LAL_INSERT_FUNCTIONS = dict()
+_LAL_WAVEFORM_CONTEXTS = dict()
+_MAXIMUM_LAL_WAVEFORM_CONTEXTS = 16
+
+
+def _lal_insert_function(key):
+    """ Return the `SimInspiralWaveformParamsInsert` function for a waveform
+    argument, None if there is no such function """
+    if key not in _LAL_INSERT_FUNCTIONS:
+        import lalsimulation as lalsim
+        _LAL_INSERT_FUNCTIONS[key] = getattr(
+            lalsim, "SimInspiralWaveformParamsInsert" + key, None)
+    return _LAL_INSERT_FUNCTIONS[key]
+
+
+def _get_lal_waveform_context(waveform_approximant, waveform_kwargs):
+    """ Return the cached :class:`_LALWaveformContext` for the waveform
+    arguments
+
+    A new context is created for each call if a `lal_waveform_dictionary` is
+    passed, as this dictionary may be modified between calls, or if any of
+    the inserted waveform arguments can not be hashed.
+    """
+    insertions = tuple(
+        (key, value) for key, value in waveform_kwargs.items()
+        if _lal_insert_function(key) is not None)
+    mode_array = waveform_kwargs.get('mode_array', None)
+    if mode_array is not None:
+        mode_array = tuple(tuple(mode) for mode in mode_array)
+    kwargs = dict(
+        waveform_approximant=waveform_approximant,
+        pn_spin_order=waveform_kwargs['pn_spin_order'],
+        pn_tidal_order=waveform_kwargs['pn_tidal_order'],
+        pn_phase_order=waveform_kwargs['pn_phase_order'],
+        pn_amplitude_order=waveform_kwargs['pn_amplitude_order'],
+        insertions=insertions, mode_array=mode_array,
+        numerical_relativity_file=waveform_kwargs.get('numerical_relativity_file', None))
+    if waveform_kwargs.get('lal_waveform_dictionary', None) is not None:
+        return _LALWaveformContext(
+            lal_waveform_dictionary=waveform_kwargs['lal_waveform_dictionary'], **kwargs)
+    key = tuple(kwargs.values())
+    try:
+        context = _LAL_WAVEFORM_CONTEXTS.get(key, None)
+    except TypeError:
+        return _LALWaveformContext(**kwargs)
+    if context is None:
+        if len(_LAL_WAVEFORM_CONTEXTS) >= _MAXIMUM_LAL_WAVEFORM_CONTEXTS:
+            _LAL_WAVEFORM_CONTEXTS.clear()
+        context = _LALWaveformContext(**kwargs)
+        _LAL_WAVEFORM_CONTEXTS[key] = context
+    return context
+
+
+class _WaveformOutputBuffers(object):
+    """ Reusable output arrays for :func:`_base_lal_cbc_fd_waveform`
+
+    The arrays are only written in the band where the waveform is non-zero,
+    the previous band is tracked so that stale values outside the new band
+    are set to zero. The arrays returned by a call are overwritten by the
+    next call.
+    """
+
+    def __init__(self):
+        self.plus = None
+        self.cross = None
+        self.band = slice(0, 0)
+
+    def get(self, length, band):
+        """ Return the plus and cross arrays to write the band into
+
+        Parameters
+        ==========
+        length: int
+            Length of the frequency array
+        band: slice
+            The band the next waveform is written into, entries outside of
+            the band are zero
+
+        Returns
+        =======
+        tuple: The plus and cross arrays
+        """
+        if self.plus is None or len(self.plus) != length:
+            self.plus = np.zeros(length, dtype=complex)
+            self.cross = np.zeros(length, dtype=complex)
+        else:
+            for stale in [slice(self.band.start, min(self.band.stop, band.start)),
+                          slice(max(self.band.start, band.stop), self.band.stop)]:
+                self.plus[stale] = 0
+                self.cross[stale] = 0
+        self.band = band
+        return self.plus, self.cross
+
+
 def _base_lal_cbc_fd_waveform(
         frequency_array, mass_1, mass_2, luminosity_distance, theta_jn, phase,
         a_1=0.0, a_2=0.0, tilt_1=0.0, tilt_2=0.0, phi_12=0.0, phi_jl=0.0,
@@ -491,11 +834,8 @@ def _base_lal_cbc_fd_waveform(
     =======
     dict: A dictionary with the plus and cross polarisation strain modes
     """
-    import lal
     import lalsimulation as lalsim
 
-    #waveform_approximant = waveform_kwargs['waveform_approximant']
-    
     if waveform_kwargs['waveform_approximant'] == "HeatedTaylorF2":
         waveform_approximant = "TaylorF2"
     else:
@@ -505,15 +845,10 @@ def _base_lal_cbc_fd_waveform(
     minimum_frequency = waveform_kwargs['minimum_frequency']
     maximum_frequency = waveform_kwargs['maximum_frequency']
     catch_waveform_errors = waveform_kwargs['catch_waveform_errors']
-    pn_spin_order = waveform_kwargs['pn_spin_order']
-    pn_tidal_order = waveform_kwargs['pn_tidal_order']
-    pn_phase_order = waveform_kwargs['pn_phase_order']
     pn_amplitude_order = waveform_kwargs['pn_amplitude_order']
-    waveform_dictionary = waveform_kwargs.get(
-        'lal_waveform_dictionary', lal.CreateDict()
-    )
 
-    approximant = lalsim_GetApproximantFromString(waveform_approximant)
+    context = _get_lal_waveform_context(waveform_approximant, waveform_kwargs)
+    approximant = context.approximant
 
     if pn_amplitude_order != 0:
         start_frequency = lalsim.SimInspiralfLow2fStart(
@@ -523,8 +858,10 @@ def _base_lal_cbc_fd_waveform(
 
     delta_frequency = frequency_array[1] - frequency_array[0]
 
-    frequency_bounds = ((frequency_array >= minimum_frequency) *
-                        (frequency_array <= maximum_frequency))
+    # the waveform is non-zero between these indices of the (increasing)
+    # frequency array
+    lower_index = int(np.searchsorted(frequency_array, minimum_frequency, side='left'))
+    upper_index = int(np.searchsorted(frequency_array, maximum_frequency, side='right'))
 
     luminosity_distance = luminosity_distance * 1e6 * utils.parsec
     mass_1 = mass_1 * utils.solar_mass
@@ -538,36 +875,9 @@ def _base_lal_cbc_fd_waveform(
     longitude_ascending_nodes = 0.0
     mean_per_ano = 0.0
 
-    lalsim.SimInspiralWaveformParamsInsertPNSpinOrder(
-        waveform_dictionary, int(pn_spin_order))
-    lalsim.SimInspiralWaveformParamsInsertPNTidalOrder(
-        waveform_dictionary, int(pn_tidal_order))
-    lalsim.SimInspiralWaveformParamsInsertPNPhaseOrder(
-        waveform_dictionary, int(pn_phase_order))
-    lalsim.SimInspiralWaveformParamsInsertPNAmplitudeOrder(
-        waveform_dictionary, int(pn_amplitude_order))
-    lalsim_SimInspiralWaveformParamsInsertTidalLambda1(
-        waveform_dictionary, lambda_1)
-    lalsim_SimInspiralWaveformParamsInsertTidalLambda2(
-        waveform_dictionary, lambda_2)
+    waveform_dictionary = context.create_waveform_dictionary(lambda_1, lambda_2)
 
-    for key, value in waveform_kwargs.items():
-        func = getattr(lalsim, "SimInspiralWaveformParamsInsert" + key, None)
-        if func is not None:
-            func(waveform_dictionary, value)
-
-    if waveform_kwargs.get('numerical_relativity_file', None) is not None:
-        lalsim.SimInspiralWaveformParamsInsertNumRelData(
-            waveform_dictionary, waveform_kwargs['numerical_relativity_file'])
-
-    if ('mode_array' in waveform_kwargs) and waveform_kwargs['mode_array'] is not None:
-        mode_array = waveform_kwargs['mode_array']
-        mode_array_lal = lalsim.SimInspiralCreateModeArray()
-        for mode in mode_array:
-            lalsim.SimInspiralModeArrayActivateMode(mode_array_lal, mode[0], mode[1])
-        lalsim.SimInspiralWaveformParamsInsertModeArray(waveform_dictionary, mode_array_lal)
-
-    if lalsim.SimInspiralImplementedFDApproximants(approximant):
+    if context.frequency_domain:
         wf_func = lalsim_SimInspiralChooseFDWaveform
     else:
         wf_func = lalsim_SimInspiralFD
@@ -586,12 +896,16 @@ def _base_lal_cbc_fd_waveform(
                 longitude_ascending_nodes, eccentricity, mean_per_ano, delta_frequency,
                 start_frequency, maximum_frequency, reference_frequency,
                 waveform_dictionary, approximant)
-            heated_phase = phase_TH(
-                frequency_array, mass_1, mass_2, a_1, a_2, spin_1x, spin_1y, spin_1z,
-                spin_2x, spin_2y, spin_2z, H_eff5, H_eff8, Q_tilde, start_frequency, delta_frequency)
-            expo_heated_phase = (np.cos(heated_phase) - 1j * np.sin(heated_phase))
-            hplus.data.data[:] = hplus.data.data * expo_heated_phase[:hplus.data.length]
-            hcross.data.data[:] = hcross.data.data * expo_heated_phase[:hplus.data.length]
+            start_index = int(start_frequency / delta_frequency)
+            # the correction vanishes below the start index
+            end_index = min(hplus.data.length, upper_index)
+            expo_heated_phase = _tidal_heating_phasor(
+                _get_tidal_heating_frequency_powers(frequency_array, start_index),
+                start_index, end_index, mass_1=mass_1, mass_2=mass_2, a_1=a_1,
+                a_2=a_2, spin_1z=spin_1z, spin_2z=spin_2z, H_eff5=H_eff5,
+                H_eff8=H_eff8, Q_tilde=Q_tilde)
+            hplus.data.data[start_index:end_index] *= expo_heated_phase
+            hcross.data.data[start_index:end_index] *= expo_heated_phase
     except Exception as e:
         if not catch_waveform_errors:
             raise
@@ -613,28 +927,28 @@ def _base_lal_cbc_fd_waveform(
             else:
                 raise
 
-    h_plus = np.zeros_like(frequency_array, dtype=complex)
-    h_cross = np.zeros_like(frequency_array, dtype=complex)
-
     if len(hplus.data.data) > len(frequency_array):
         logger.debug("LALsim waveform longer than bilby's `frequency_array`" +
                      "({} vs {}), ".format(len(hplus.data.data), len(frequency_array)) +
                      "probably because padded with zeros up to the next power of two length." +
                      " Truncating lalsim array.")
-        h_plus = hplus.data.data[:len(h_plus)]
-        h_cross = hcross.data.data[:len(h_cross)]
+    band = slice(lower_index, max(lower_index, min(upper_index, hplus.data.length)))
+
+    output_buffers = waveform_kwargs.get('output_buffers', None)
+    if output_buffers is None:
+        h_plus = np.zeros(len(frequency_array), dtype=complex)
+        h_cross = np.zeros(len(frequency_array), dtype=complex)
     else:
-        h_plus[:len(hplus.data.data)] = hplus.data.data
-        h_cross[:len(hcross.data.data)] = hcross.data.data
+        h_plus, h_cross = output_buffers.get(len(frequency_array), band)
 
-    h_plus *= frequency_bounds
-    h_cross *= frequency_bounds
+    h_plus[band] = hplus.data.data[band]
+    h_cross[band] = hcross.data.data[band]
 
     if wf_func == lalsim_SimInspiralFD:
         dt = 1 / hplus.deltaF + (hplus.epoch.gpsSeconds + hplus.epoch.gpsNanoSeconds * 1e-9)
-        time_shift = np.exp(-1j * 2 * np.pi * dt * frequency_array[frequency_bounds])
-        h_plus[frequency_bounds] *= time_shift
-        h_cross[frequency_bounds] *= time_shift
+        time_shift = np.exp(-1j * 2 * np.pi * dt * frequency_array[band])
+        h_plus[band] *= time_shift
+        h_cross[band] *= time_shift
 
     return dict(plus=h_plus, cross=h_cross)
 
@@ -666,6 +980,159 @@ def binary_neutron_star_roq(
         phi_12=phi_12, lambda_1=lambda_1, lambda_2=lambda_2, **waveform_kwargs)
 
 
+def binary_black_hole_tidal_heating_roq(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, H_eff5, H_eff8, Q_tilde,
+        **waveform_arguments):
+    """ A Binary Black Hole tidal-heating waveform model evaluated at the ROQ
+    frequency nodes, see :func:`lal_binary_black_hole_tidal_heating`.
+
+    The waveform is generated with :func:`_base_roq_waveform` and the
+    tidal-heating phase is applied on the linear and quadratic nodes.
+
+    Waveform arguments
+    ===================
+    frequency_nodes_linear: np.array
+    frequency_nodes_quadratic: np.array
+    waveform_approximant: str
+        Either HeatedTaylorF2 (default) or TaylorF2
+    reference_frequency: float
+    minimum_frequency: float
+    maximum_frequency: float
+        Defaults to the ISCO frequency
+
+    Returns
+    =======
+    waveform_polarizations: dict
+        Dict containing plus and cross modes evaluated at the linear and
+        quadratic frequency nodes.
+    """
+    return _tidal_heating_roq_waveform(
+        mass_1=mass_1, mass_2=mass_2, luminosity_distance=luminosity_distance,
+        a_1=a_1, tilt_1=tilt_1, phi_12=phi_12, a_2=a_2, tilt_2=tilt_2,
+        phi_jl=phi_jl, theta_jn=theta_jn, phase=phase, lambda_1=0.0,
+        lambda_2=0.0, H_eff5=H_eff5, H_eff8=H_eff8, Q_tilde=Q_tilde,
+        frequency_array=frequency_array, **waveform_arguments)
+
+
+def binary_neutron_star_tidal_heating_roq(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, lambda_1, lambda_2, theta_jn, phase,
+        H_eff5, H_eff8, Q_tilde, **waveform_arguments):
+    """ A Binary Neutron Star tidal-heating waveform model evaluated at the
+    ROQ frequency nodes, see :func:`lal_binary_neutron_star_tidal_heating`.
+
+    The waveform is generated with :func:`_base_roq_waveform` and the
+    tidal-heating phase is applied on the linear and quadratic nodes.
+
+    Waveform arguments
+    ===================
+    frequency_nodes_linear: np.array
+    frequency_nodes_quadratic: np.array
+    waveform_approximant: str
+        Either HeatedTaylorF2 (default) or TaylorF2
+    reference_frequency: float
+    minimum_frequency: float
+    maximum_frequency: float
+        Defaults to the ISCO frequency
+
+    Returns
+    =======
+    waveform_polarizations: dict
+        Dict containing plus and cross modes evaluated at the linear and
+        quadratic frequency nodes.
+    """
+    return _tidal_heating_roq_waveform(
+        mass_1=mass_1, mass_2=mass_2, luminosity_distance=luminosity_distance,
+        a_1=a_1, tilt_1=tilt_1, phi_12=phi_12, a_2=a_2, tilt_2=tilt_2,
+        phi_jl=phi_jl, theta_jn=theta_jn, phase=phase, lambda_1=lambda_1,
+        lambda_2=lambda_2, H_eff5=H_eff5, H_eff8=H_eff8, Q_tilde=Q_tilde,
+        frequency_array=frequency_array, **waveform_arguments)
+
+
+def _tidal_heating_roq_waveform(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, lambda_1, lambda_2, phi_jl, theta_jn, phase,
+        H_eff5, H_eff8, Q_tilde, **waveform_arguments):
+    waveform_kwargs = dict(
+        waveform_approximant='HeatedTaylorF2', reference_frequency=50.0,
+        minimum_frequency=20.0, maximum_frequency=None)
+    waveform_kwargs.update(waveform_arguments)
+    heated = waveform_kwargs['waveform_approximant'] == 'HeatedTaylorF2'
+    if heated:
+        waveform_kwargs['waveform_approximant'] = 'TaylorF2'
+    waveform_polarizations = _base_roq_waveform(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, theta_jn=theta_jn, phase=phase,
+        a_1=a_1, a_2=a_2, tilt_1=tilt_1, tilt_2=tilt_2, phi_jl=phi_jl,
+        phi_12=phi_12, lambda_1=lambda_1, lambda_2=lambda_2, **waveform_kwargs)
+    for basis in ['linear', 'quadratic']:
+        _apply_tidal_heating_on_frequency_sequence(
+            waveform_polarizations[basis],
+            frequencies=waveform_kwargs['frequency_nodes_{}'.format(basis)],
+            mass_1=mass_1, mass_2=mass_2, a_1=a_1, tilt_1=tilt_1, a_2=a_2,
+            tilt_2=tilt_2, H_eff5=H_eff5, H_eff8=H_eff8, Q_tilde=Q_tilde,
+            minimum_frequency=waveform_kwargs['minimum_frequency'],
+            maximum_frequency=waveform_kwargs['maximum_frequency'],
+            heated=heated)
+    return waveform_polarizations
+
+
+def _apply_tidal_heating_on_frequency_sequence(
+        waveform_polarizations, frequencies, mass_1, mass_2, a_1, tilt_1, a_2,
+        tilt_2, H_eff5, H_eff8, Q_tilde, minimum_frequency,
+        maximum_frequency=None, heated=True):
+    """ Apply the tidal-heating phase to TaylorF2 polarizations in place
+
+    As for :func:`lal_binary_black_hole_tidal_heating` the polarizations
+    are set to zero outside of the band between `minimum_frequency` and
+    `maximum_frequency`, which defaults to the ISCO frequency.
+
+    Parameters
+    ==========
+    waveform_polarizations: dict
+        Plus and cross polarizations evaluated at `frequencies`
+    frequencies: array_like
+        Increasing array of frequencies
+    mass_1, mass_2: float
+        Component masses in solar masses
+    a_1, tilt_1, a_2, tilt_2: float
+        Spin magnitudes and tilts
+    H_eff5, H_eff8, Q_tilde: float
+        Horizon and quadrupole parameters
+    minimum_frequency: float
+        Minimum frequency of the waveform
+    maximum_frequency: float, optional
+        Maximum frequency of the waveform
+    heated: bool
+        Whether to apply the tidal-heating phase
+
+    Returns
+    =======
+    dict: `waveform_polarizations`
+    """
+    if maximum_frequency is None:
+        maximum_frequency = ISCO(mass_1, mass_2)
+    else:
+        maximum_frequency = min(maximum_frequency, ISCO(mass_1, mass_2))
+    start_index = int(np.searchsorted(frequencies, minimum_frequency, side='left'))
+    end_index = int(np.searchsorted(frequencies, maximum_frequency, side='right'))
+    if heated:
+        expo_heated_phase = _tidal_heating_phasor(
+            _get_tidal_heating_frequency_powers(frequencies, start_index, check_frequencies=True),
+            start_index, end_index, mass_1=mass_1 * utils.solar_mass,
+            mass_2=mass_2 * utils.solar_mass, a_1=a_1, a_2=a_2,
+            spin_1z=a_1 * np.cos(tilt_1), spin_2z=a_2 * np.cos(tilt_2),
+            H_eff5=H_eff5, H_eff8=H_eff8, Q_tilde=Q_tilde)
+    for mode in ['plus', 'cross']:
+        strain = waveform_polarizations[mode]
+        strain[:start_index] = 0
+        strain[end_index:] = 0
+        if heated:
+            strain[start_index:end_index] *= expo_heated_phase
+    return waveform_polarizations
+
+
 def _base_roq_waveform(
         frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
         phi_12, a_2, tilt_2, lambda_1, lambda_2, phi_jl, theta_jn, phase,
@@ -932,6 +1399,132 @@ def binary_neutron_star_frequency_sequence(
         phi_12=phi_12, lambda_1=lambda_1, lambda_2=lambda_2, **waveform_kwargs)
 
 
+def binary_black_hole_tidal_heating_frequency_sequence(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, H_eff5, H_eff8, Q_tilde,
+        **kwargs):
+    """ A Binary Black Hole tidal-heating waveform model generated only on
+    specified frequency points, see :func:`lal_binary_black_hole_tidal_heating`.
+    This is used, for example, for MBGravitationalWaveTransient.
+
+    Parameters
+    ==========
+    frequency_array: array_like
+        The input is ignored.
+    mass_1: float
+        The mass of the heavier object in solar masses
+    mass_2: float
+        The mass of the lighter object in solar masses
+    luminosity_distance: float
+        The luminosity distance in megaparsec
+    a_1: float
+        Dimensionless primary spin magnitude
+    tilt_1: float
+        Primary tilt angle
+    phi_12: float
+        Azimuthal angle between the two component spins
+    a_2: float
+        Dimensionless secondary spin magnitude
+    tilt_2: float
+        Secondary tilt angle
+    phi_jl: float
+        Azimuthal angle between the total binary angular momentum and the
+        orbital angular momentum
+    theta_jn: float
+        Angle between the total binary angular momentum and the line of sight
+    phase: float
+        The phase at coalescence
+    H_eff5: float
+        2.5 PN order horizon parameter
+    H_eff8: float
+        4 PN order horizon parameter
+    Q_tilde: float
+        Quadrupole parameter
+    kwargs: dict
+        Required keyword arguments
+        - frequencies:
+            Increasing ndarray of frequencies at which waveforms are evaluated
+
+        Optional keyword arguments
+        - waveform_approximant: HeatedTaylorF2 (default) or TaylorF2
+        - reference_frequency
+        - minimum_frequency
+        - maximum_frequency: defaults to the ISCO frequency
+        - catch_waveform_errors
+        - pn_spin_order
+        - pn_tidal_order
+        - pn_phase_order
+        - pn_amplitude_order
+
+    Returns
+    =======
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    return _tidal_heating_waveform_frequency_sequence(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, theta_jn=theta_jn, phase=phase,
+        a_1=a_1, a_2=a_2, tilt_1=tilt_1, tilt_2=tilt_2, phi_jl=phi_jl,
+        phi_12=phi_12, lambda_1=0.0, lambda_2=0.0, H_eff5=H_eff5,
+        H_eff8=H_eff8, Q_tilde=Q_tilde, **kwargs)
+
+
+def binary_neutron_star_tidal_heating_frequency_sequence(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, lambda_1, lambda_2, theta_jn, phase,
+        H_eff5, H_eff8, Q_tilde, **kwargs):
+    """ A Binary Neutron Star tidal-heating waveform model generated only on
+    specified frequency points, see :func:`lal_binary_neutron_star_tidal_heating`.
+
+    See :func:`binary_black_hole_tidal_heating_frequency_sequence` for the
+    arguments, additionally
+
+    Parameters
+    ==========
+    lambda_1: float
+        Dimensionless tidal deformability of mass_1
+    lambda_2: float
+        Dimensionless tidal deformability of mass_2
+
+    Returns
+    =======
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    return _tidal_heating_waveform_frequency_sequence(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, theta_jn=theta_jn, phase=phase,
+        a_1=a_1, a_2=a_2, tilt_1=tilt_1, tilt_2=tilt_2, phi_jl=phi_jl,
+        phi_12=phi_12, lambda_1=lambda_1, lambda_2=lambda_2, H_eff5=H_eff5,
+        H_eff8=H_eff8, Q_tilde=Q_tilde, **kwargs)
+
+
+def _tidal_heating_waveform_frequency_sequence(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, lambda_1, lambda_2, phi_jl, theta_jn, phase,
+        H_eff5, H_eff8, Q_tilde, **kwargs):
+    waveform_kwargs = dict(
+        waveform_approximant='HeatedTaylorF2', reference_frequency=50.0,
+        minimum_frequency=20.0, maximum_frequency=None,
+        catch_waveform_errors=False, pn_spin_order=-1, pn_tidal_order=-1,
+        pn_phase_order=-1, pn_amplitude_order=0)
+    waveform_kwargs.update(kwargs)
+    heated = waveform_kwargs['waveform_approximant'] == 'HeatedTaylorF2'
+    if heated:
+        waveform_kwargs['waveform_approximant'] = 'TaylorF2'
+    waveform_polarizations = _base_waveform_frequency_sequence(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, theta_jn=theta_jn, phase=phase,
+        a_1=a_1, a_2=a_2, tilt_1=tilt_1, tilt_2=tilt_2, phi_jl=phi_jl,
+        phi_12=phi_12, lambda_1=lambda_1, lambda_2=lambda_2, **waveform_kwargs)
+    if waveform_polarizations is None:
+        return None
+    return _apply_tidal_heating_on_frequency_sequence(
+        waveform_polarizations, frequencies=waveform_kwargs['frequencies'],
+        mass_1=mass_1, mass_2=mass_2, a_1=a_1, tilt_1=tilt_1, a_2=a_2,
+        tilt_2=tilt_2, H_eff5=H_eff5, H_eff8=H_eff8, Q_tilde=Q_tilde,
+        minimum_frequency=waveform_kwargs['minimum_frequency'],
+        maximum_frequency=waveform_kwargs['maximum_frequency'], heated=heated)
+
+
 def _base_waveform_frequency_sequence(
         frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
         phi_12, a_2, tilt_2, lambda_1, lambda_2, phi_jl, theta_jn, phase,
@@ -971,49 +1564,13 @@ def _base_waveform_frequency_sequence(
         Dict containing plus and cross modes evaluated at the linear and
         quadratic frequency nodes.
     """
-    from lal import CreateDict
-    import lalsimulation as lalsim
-
     frequencies = waveform_kwargs['frequencies']
     reference_frequency = waveform_kwargs['reference_frequency']
-    approximant = lalsim_GetApproximantFromString(waveform_kwargs['waveform_approximant'])
     catch_waveform_errors = waveform_kwargs['catch_waveform_errors']
-    pn_spin_order = waveform_kwargs['pn_spin_order']
-    pn_tidal_order = waveform_kwargs['pn_tidal_order']
-    pn_phase_order = waveform_kwargs['pn_phase_order']
-    pn_amplitude_order = waveform_kwargs['pn_amplitude_order']
-    waveform_dictionary = waveform_kwargs.get(
-        'lal_waveform_dictionary', CreateDict()
-    )
-
-    lalsim.SimInspiralWaveformParamsInsertPNSpinOrder(
-        waveform_dictionary, int(pn_spin_order))
-    lalsim.SimInspiralWaveformParamsInsertPNTidalOrder(
-        waveform_dictionary, int(pn_tidal_order))
-    lalsim.SimInspiralWaveformParamsInsertPNPhaseOrder(
-        waveform_dictionary, int(pn_phase_order))
-    lalsim.SimInspiralWaveformParamsInsertPNAmplitudeOrder(
-        waveform_dictionary, int(pn_amplitude_order))
-    lalsim_SimInspiralWaveformParamsInsertTidalLambda1(
-        waveform_dictionary, lambda_1)
-    lalsim_SimInspiralWaveformParamsInsertTidalLambda2(
-        waveform_dictionary, lambda_2)
-
-    for key, value in waveform_kwargs.items():
-        func = getattr(lalsim, "SimInspiralWaveformParamsInsert" + key, None)
-        if func is not None:
-            func(waveform_dictionary, value)
-
-    if waveform_kwargs.get('numerical_relativity_file', None) is not None:
-        lalsim.SimInspiralWaveformParamsInsertNumRelData(
-            waveform_dictionary, waveform_kwargs['numerical_relativity_file'])
-
-    if ('mode_array' in waveform_kwargs) and waveform_kwargs['mode_array'] is not None:
-        mode_array = waveform_kwargs['mode_array']
-        mode_array_lal = lalsim.SimInspiralCreateModeArray()
-        for mode in mode_array:
-            lalsim.SimInspiralModeArrayActivateMode(mode_array_lal, mode[0], mode[1])
-        lalsim.SimInspiralWaveformParamsInsertModeArray(waveform_dictionary, mode_array_lal)
+    context = _get_lal_waveform_context(
+        waveform_kwargs['waveform_approximant'], waveform_kwargs)
+    approximant = context.approximant
+    waveform_dictionary = context.create_waveform_dictionary(lambda_1, lambda_2)
 
     luminosity_distance = luminosity_distance * 1e6 * utils.parsec
     mass_1 = mass_1 * utils.solar_mass
@@ -0,0 +1,353 @@
+"""
+A vectorised, pure numpy implementation of the aligned-spin TaylorF2
+approximant with the tidal-heating (HeatedTaylorF2) phase corrections.
+
+The post-Newtonian coefficients follow LALSimInspiralPNCoefficients.c, so
+that for a single parameter set the waveforms agree with
+:func:`bilby.gw.source.lal_binary_black_hole_tidal_heating` and
+:func:`bilby.gw.source.lal_binary_neutron_star_tidal_heating`. All parameters
+may be passed as arrays, in which case a block of waveforms with shape
+`(number of samples, number of frequencies)` is evaluated in a single call.
+"""
+import numpy as np
+
+from ..core.utils import speed_of_light, gravitational_constant, solar_mass, parsec
+
+_PN_ORDERS = 15
+
+
+def _truncate(coefficients, order):
+    """ Zero the coefficients above a given (twice) PN order, -1 keeps all """
+    if order not in [-1, None] and order + 1 < coefficients.shape[-1]:
+        coefficients[..., int(order) + 1:] = 0
+    return coefficients
+
+
+def quadrupole_monopole_parameter_from_lambda(lambda_):
+    """ Spin-induced quadrupole moment parameter from the tidal deformability
+
+    This uses the quasi-universal relation of Yagi & Yunes (2013) as in
+    XLALSimInspiralEOSQfromLambda, the parameter is unity for
+    `lambda < 0.5`.
+
+    Parameters
+    ==========
+    lambda_: array_like
+        Dimensionless tidal deformability
+
+    Returns
+    =======
+    array_like: The quadrupole-monopole parameter
+    """
+    lambda_ = np.asarray(lambda_, dtype=float)
+    log_lambda = np.log(np.maximum(lambda_, 0.5))
+    log_q = (0.194 + 0.0936 * log_lambda + 0.0474 * log_lambda ** 2
+             - 0.00421 * log_lambda ** 3 + 0.000123 * log_lambda ** 4)
+    return np.where(lambda_ < 0.5, 1., np.exp(log_q))
+
+
+def taylor_f2_phasing_coefficients(
+        mass_1, mass_2, chi_1, chi_2, lambda_1=0.0, lambda_2=0.0,
+        pn_phase_order=-1, pn_spin_order=-1, pn_tidal_order=-1):
+    """ TaylorF2 phasing coefficients for aligned spins
+
+    This is a vectorised version of XLALSimInspiralPNPhasing_F2 for aligned
+    spins. As in LALSimulation, the spin-induced quadrupole moments are
+    computed from the tidal deformabilities, see
+    :func:`quadrupole_monopole_parameter_from_lambda`.
+
+    Parameters
+    ==========
+    mass_1, mass_2: array_like
+        Component masses, only the ratios are used
+    chi_1, chi_2: array_like
+        Dimensionless spin components along the orbital angular momentum
+    lambda_1, lambda_2: array_like
+        Dimensionless tidal deformabilities
+    pn_phase_order, pn_spin_order, pn_tidal_order: int
+        Twice the PN order at which to truncate the point-particle, spin and
+        tidal terms, -1 includes all available terms
+
+    Returns
+    =======
+    v, vlogv: array_like
+        Coefficients of v^k and v^k log(v) with shape
+        `np.shape(mass_1) + (16,)`, including the Newtonian prefactor
+    """
+    mass_1, mass_2, chi_1, chi_2, lambda_1, lambda_2 = np.broadcast_arrays(
+        *[np.asarray(arg, dtype=float) for arg in
+          [mass_1, mass_2, chi_1, chi_2, lambda_1, lambda_2]])
+    total_mass = mass_1 + mass_2
+    eta = mass_1 * mass_2 / total_mass ** 2
+    m1m = mass_1 / total_mass
+    m2m = mass_2 / total_mass
+    pi = np.pi
+
+    shape = eta.shape + (_PN_ORDERS + 1,)
+    v = np.zeros(shape)
+    vlogv = np.zeros(shape)
+    v[..., 0] = 1.
+    v[..., 2] = 5. * (743. / 84. + 11. * eta) / 9.
+    v[..., 3] = -16. * pi
+    v[..., 4] = 5. * (3058.673 / 7.056 + 5429. / 7. * eta + 617. * eta ** 2) / 72.
+    v[..., 5] = 5. / 9. * (7729. / 84. - 13. * eta) * pi
+    vlogv[..., 5] = 5. / 3. * (7729. / 84. - 13. * eta) * pi
+    v[..., 6] = (
+        11583.231236531 / 4.694215680 - 640. / 3. * pi ** 2 - 6848. / 21. * np.euler_gamma
+        + eta * (-15737.765635 / 3.048192 + 2255. / 12. * pi ** 2)
+        + eta ** 2 * 76055. / 1728. - eta ** 3 * 127825. / 1296.
+        - 6848. / 21. * np.log(4.))
+    vlogv[..., 6] = -6848. / 21.
+    v[..., 7] = pi * (77096675. / 254016. + 378515. / 1512. * eta - 74045. / 756. * eta ** 2)
+
+    spin_v = np.zeros(shape)
+    spin_vlogv = np.zeros(shape)
+    for mm, chi, lambda_ in [(m1m, chi_1, lambda_1), (m2m, chi_2, lambda_2)]:
+        quadparam = quadrupole_monopole_parameter_from_lambda(lambda_)
+        spin_v[..., 3] += mm * (25. + 38. / 3. * mm) * chi
+        spin_v[..., 4] += mm * mm * (-50. * quadparam - 0.625) * chi * chi
+        so_25 = -mm * (1391.5 / 8.4 - mm * (1. - mm) * 10. / 3. + mm * (1276. / 8.1 + mm * (1. - mm) * 170. / 9.))
+        spin_v[..., 5] += so_25 * chi
+        spin_vlogv[..., 5] += 3. * so_25 * chi
+        spin_v[..., 6] += (
+            pi * mm * (1490. / 3. + mm * 260.) * chi
+            + ((4703.5 / 8.4 + 2935. / 6. * mm - 120. * mm * mm) * quadparam
+               + (-4108.25 / 6.72 - 108.5 / 1.2 * mm + 125.5 / 3.6 * mm * mm)) * mm * mm * chi * chi)
+        spin_v[..., 7] += chi * mm * (
+            -17097.8035 / 4.8384 + eta * 28764.25 / 6.72 + eta * eta * 47.35 / 1.44
+            + mm * (-7189.233785 / 1.524096 + eta * 458.555 / 3.024 - eta * eta * 534.5 / 7.2))
+    spin_v[..., 4] += -98.75 * eta * chi_1 * chi_2
+    spin_v[..., 6] += (326.75 / 1.12 + 557.5 / 1.8 * eta) * eta * chi_1 * chi_2
+    v += _truncate(spin_v, pn_spin_order)
+    vlogv += _truncate(spin_vlogv, pn_spin_order)
+    _truncate(v, pn_phase_order)
+    _truncate(vlogv, pn_phase_order)
+
+    tidal_v = np.zeros(shape)
+    for mm, lambda_ in [(m1m, lambda_1), (m2m, lambda_2)]:
+        mm4 = mm ** 4
+        tidal_v[..., 10] += lambda_ * (-288. + 264. * mm) * mm4
+        tidal_v[..., 12] += lambda_ * (
+            -15895. / 28. + 4595. / 28. * mm + 5715. / 14. * mm ** 2 - 325. / 7. * mm ** 3) * mm4
+        tidal_v[..., 13] += lambda_ * pi * 24. * (12. - 11. * mm) * mm4
+        tidal_v[..., 14] += -lambda_ * 5. * (
+            193986935. / 571536. - 14415613. / 381024. * mm - 57859. / 378. * mm ** 2
+            - 209495. / 1512. * mm ** 3 + 965. / 54. * mm ** 4 - 4. * mm ** 5) * mm4
+    v += _truncate(tidal_v, pn_tidal_order)
+
+    prefactor = 3. / (128. * eta)
+    return prefactor[..., None] * v, prefactor[..., None] * vlogv
+
+
+def _phasing(v, log_v, coefficients, log_coefficients):
+    """ Sum the PN series divided by v^5 """
+    phasing = np.zeros(np.broadcast(v, coefficients[..., 0]).shape)
+    for order in range(_PN_ORDERS, -1, -1):
+        phasing = phasing * v + coefficients[..., order] + log_coefficients[..., order] * log_v
+    return phasing / v ** 5
+
+
+def tidal_heating_phase_correction(v, eta, chi_1, chi_2, a_1, a_2, H_eff5, H_eff8, Q_tilde):
+    """ Vectorised tidal-heating phase correction
+
+    This is the correction computed by :func:`bilby.gw.source.phase_TH`
+    written in terms of the PN expansion parameter.
+
+    Parameters
+    ==========
+    v: array_like
+        PN expansion parameter (pi M f)^(1/3)
+    eta: array_like
+        Symmetric mass ratio
+    chi_1, chi_2: array_like
+        Dimensionless spin components along the orbital angular momentum
+    a_1, a_2: array_like
+        Dimensionless spin magnitudes
+    H_eff5, H_eff8, Q_tilde: array_like
+        Horizon and quadrupole parameters
+
+    Returns
+    =======
+    array_like: The phase correction
+    """
+    log_v = np.log(v)
+    prefactor = 3.0 / (128.0 * eta)
+    psi_so = 1. / 6. * (
+        (-56 * eta - 73 * (np.sqrt(1 - 4 * eta) - 1)) * chi_1 * a_1
+        + (-56 * eta - 73 * (np.sqrt(1 - 4 * eta) - 1)) * chi_2 * a_2)
+    term_v5 = -10 * (3 * log_v + 1) / 9. * H_eff5
+    term_v7 = -5 * v ** 2 * (952 * eta + 995) / 168.0 * H_eff5
+    term_v8 = 5 * v ** 3 * (3 * log_v - 1) / 9.0 * (H_eff5 * psi_so - 4 * H_eff8)
+    term_qm = -(25 * Q_tilde) / (32 * eta * v)
+    return prefactor * (term_v5 + term_v7 + term_v8) + term_qm
+
+
+def heated_taylor_f2(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, H_eff5, H_eff8, Q_tilde,
+        lambda_1=0.0, lambda_2=0.0, **kwargs):
+    """ Vectorised aligned-spin HeatedTaylorF2 waveforms
+
+    All parameters can be arrays with a common (broadcast) shape, the output
+    polarizations then have shape `shape + frequency_array.shape`.
+    The in-plane spin angles are ignored, the spins are projected onto the
+    orbital angular momentum, `a_i * cos(tilt_i)`.
+
+    Parameters
+    ==========
+    frequency_array: array_like
+        The frequencies at which we want to calculate the strain
+    mass_1: array_like
+        The mass of the heavier object in solar masses
+    mass_2: array_like
+        The mass of the lighter object in solar masses
+    luminosity_distance: array_like
+        The luminosity distance in megaparsec
+    a_1: array_like
+        Dimensionless primary spin magnitude
+    tilt_1: array_like
+        Primary tilt angle, should be 0 or pi
+    phi_12: array_like
+        Ignored
+    a_2: array_like
+        Dimensionless secondary spin magnitude
+    tilt_2: array_like
+        Secondary tilt angle, should be 0 or pi
+    phi_jl: array_like
+        Ignored
+    theta_jn: array_like
+        Angle between the orbital angular momentum and the line of sight
+    phase: array_like
+        The phase at the reference frequency
+    H_eff5: array_like
+        2.5 PN order horizon parameter
+    H_eff8: array_like
+        4 PN order horizon parameter
+    Q_tilde: array_like
+        2 PN order quadrupole parameter
+    lambda_1: array_like
+        Dimensionless tidal deformability of mass_1
+    lambda_2: array_like
+        Dimensionless tidal deformability of mass_2
+    kwargs: dict
+        Optional keyword arguments
+        Supported arguments:
+
+        - reference_frequency
+        - minimum_frequency
+        - maximum_frequency: defaults to the Schwarzschild ISCO frequency,
+          larger values are replaced by it
+        - pn_spin_order
+        - pn_tidal_order
+        - pn_phase_order
+        - pn_amplitude_order: only 0 is supported
+        - frequencies: if given, the waveform is evaluated on these
+          frequencies instead of `frequency_array`, as for the
+          frequency-sequence models, e.g., for the relative binning and
+          multi-banded likelihoods
+
+    Returns
+    =======
+    dict: A dictionary with the plus and cross polarisation strain modes
+    """
+    waveform_kwargs = dict(
+        reference_frequency=50.0, minimum_frequency=20.0, maximum_frequency=None,
+        pn_spin_order=-1, pn_tidal_order=-1, pn_phase_order=-1, pn_amplitude_order=0,
+        frequencies=None)
+    waveform_kwargs.update(kwargs)
+    if waveform_kwargs['frequencies'] is not None:
+        frequency_array = waveform_kwargs['frequencies']
+    if int(waveform_kwargs['pn_amplitude_order']) != 0:
+        raise ValueError("heated_taylor_f2 only supports pn_amplitude_order=0")
+
+    frequency_array = np.asarray(frequency_array, dtype=float)
+    (mass_1, mass_2, luminosity_distance, a_1, tilt_1, a_2, tilt_2, theta_jn,
+     phase, H_eff5, H_eff8, Q_tilde, lambda_1, lambda_2) = np.broadcast_arrays(
+        *[np.asarray(arg, dtype=float) for arg in [
+            mass_1, mass_2, luminosity_distance, a_1, tilt_1, a_2, tilt_2,
+            theta_jn, phase, H_eff5, H_eff8, Q_tilde, lambda_1, lambda_2]])
+    shape = mass_1.shape
+    h_plus = np.zeros(shape + frequency_array.shape, dtype=complex)
+    h_cross = np.zeros(shape + frequency_array.shape, dtype=complex)
+
+    total_mass_in_seconds = (
+        (mass_1 + mass_2) * solar_mass * gravitational_constant / speed_of_light ** 3)
+    eta = mass_1 * mass_2 / (mass_1 + mass_2) ** 2
+    chi_1 = a_1 * np.cos(tilt_1)
+    chi_2 = a_2 * np.cos(tilt_2)
+
+    maximum_frequency = 1. / (6. ** 1.5 * np.pi * total_mass_in_seconds)
+    if waveform_kwargs['maximum_frequency'] is not None:
+        maximum_frequency = np.minimum(maximum_frequency, waveform_kwargs['maximum_frequency'])
+    band = ((frequency_array >= waveform_kwargs['minimum_frequency']) &
+            (frequency_array <= np.max(maximum_frequency)))
+    if not np.any(band):
+        return dict(plus=h_plus, cross=h_cross)
+    frequencies = frequency_array[band]
+
+    coefficients, log_coefficients = taylor_f2_phasing_coefficients(
+        mass_1, mass_2, chi_1, chi_2, lambda_1, lambda_2,
+        pn_phase_order=waveform_kwargs['pn_phase_order'],
+        pn_spin_order=waveform_kwargs['pn_spin_order'],
+        pn_tidal_order=waveform_kwargs['pn_tidal_order'])
+    coefficients = coefficients[..., None, :]
+    log_coefficients = log_coefficients[..., None, :]
+
+    expand = (Ellipsis, None)
+    v = np.cbrt(np.pi * total_mass_in_seconds[expand] * frequencies)
+    log_v = np.log(v)
+    phasing = _phasing(v, log_v, coefficients, log_coefficients)
+
+    reference_frequency = waveform_kwargs['reference_frequency']
+    if reference_frequency != 0:
+        v_ref = np.cbrt(np.pi * total_mass_in_seconds[expand] * reference_frequency)
+        phasing -= _phasing(v_ref, np.log(v_ref), coefficients, log_coefficients)
+    phasing -= 2 * phase[expand]
+
+    phasing += tidal_heating_phase_correction(
+        v=v, eta=eta[expand], chi_1=chi_1[expand], chi_2=chi_2[expand],
+        a_1=a_1[expand], a_2=a_2[expand], H_eff5=H_eff5[expand],
+        H_eff8=H_eff8[expand], Q_tilde=Q_tilde[expand])
+
+    distance = luminosity_distance * 1e6 * parsec
+    amplitude_0 = (
+        -4. * mass_1 * mass_2 * solar_mass ** 2 * gravitational_constant ** 2
+        / (distance * speed_of_light ** 5) * np.sqrt(np.pi / 12.) * np.sqrt(5. / (32. * eta)))
+    amplitude = amplitude_0[expand] * v ** -3.5
+    amplitude *= frequencies <= maximum_frequency[expand]
+    h_tilde = amplitude * np.exp(-1j * (phasing - np.pi / 4))
+
+    cos_iota = np.cos(theta_jn)[expand]
+    h_plus[..., band] = 0.5 * (1. + cos_iota ** 2) * h_tilde
+    h_cross[..., band] = -1j * cos_iota * h_tilde
+    return dict(plus=h_plus, cross=h_cross)
+
+
+def binary_black_hole_heated_taylor_f2(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, H_eff5, H_eff8, Q_tilde, **kwargs):
+    """ Aligned-spin HeatedTaylorF2 binary black hole model, see
+    :func:`heated_taylor_f2`. This is a numpy equivalent of
+    :func:`bilby.gw.source.lal_binary_black_hole_tidal_heating`.
+    """
+    return heated_taylor_f2(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, a_1=a_1, tilt_1=tilt_1,
+        phi_12=phi_12, a_2=a_2, tilt_2=tilt_2, phi_jl=phi_jl, theta_jn=theta_jn,
+        phase=phase, H_eff5=H_eff5, H_eff8=H_eff8, Q_tilde=Q_tilde, **kwargs)
+
+
+def binary_neutron_star_heated_taylor_f2(
+        frequency_array, mass_1, mass_2, luminosity_distance, a_1, tilt_1,
+        phi_12, a_2, tilt_2, phi_jl, theta_jn, phase, lambda_1, lambda_2,
+        H_eff5, H_eff8, Q_tilde, **kwargs):
+    """ Aligned-spin HeatedTaylorF2 model with tidal deformabilities, see
+    :func:`heated_taylor_f2`. This is a numpy equivalent of
+    :func:`bilby.gw.source.lal_binary_neutron_star_tidal_heating`.
+    """
+    return heated_taylor_f2(
+        frequency_array=frequency_array, mass_1=mass_1, mass_2=mass_2,
+        luminosity_distance=luminosity_distance, a_1=a_1, tilt_1=tilt_1,
+        phi_12=phi_12, a_2=a_2, tilt_2=tilt_2, phi_jl=phi_jl, theta_jn=theta_jn,
+        phase=phase, H_eff5=H_eff5, H_eff8=H_eff8, Q_tilde=Q_tilde,
+        lambda_1=lambda_1, lambda_2=lambda_2, **kwargs)
@@ -1,6 +1,7 @@
 import json
 import os
-from math import fmod
+from collections import OrderedDict
+from math import floor, fmod
 
 import numpy as np
 from scipy.interpolate import interp1d
@@ -52,7 +53,7 @@ def psd_from_freq_series(freq_data, df):
     return np.power(asd_from_freq_series(freq_data, df), 2)
 
 
-def time_delay_geocentric(detector1, detector2, ra, dec, time):
+def time_delay_geocentric(detector1, detector2, ra, dec, time, cached_gmst=False):
     """
     Calculate time delay between two detectors in geocentric coordinates based on XLALArrivaTimeDiff in TimeDelay.c
 
@@ -64,23 +65,27 @@ def time_delay_geocentric(detector1, detector2, ra, dec, time):
     detector2: array_like
         Cartesian coordinate vector for the second detector in the geocentric frame.
         To get time delay from Earth center, use detector2 = np.array([0,0,0])
-    ra: float
+    ra: float, array_like
         Right ascension of the source in radians
-    dec: float
+    dec: float, array_like
         Declination of the source in radians
-    time: float
+    time: float, array_like
         GPS time in the geocentric frame
+    cached_gmst: bool, optional
+        If True, the sidereal time is given by
+        :code:`cached_greenwich_mean_sidereal_time` rather than by LAL for
+        each time
 
     Returns
     =======
-    float: Time delay between the two detectors in the geocentric frame
+    float, array_like: Time delay between the two detectors in the geocentric frame
 
     """
-    gmst = fmod(greenwich_mean_sidereal_time(time), 2 * np.pi)
+    gmst = np.fmod(_greenwich_mean_sidereal_time(time, cached_gmst), 2 * np.pi)
     theta, phi = ra_dec_to_theta_phi(ra, dec, gmst)
     omega = np.array([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)])
     delta_d = detector2 - detector1
-    return np.dot(omega, delta_d) / speed_of_light
+    return np.dot(delta_d, omega) / speed_of_light
 
 
 def get_polarization_tensor(ra, dec, time, psi, mode):
@@ -136,6 +141,152 @@ def get_polarization_tensor(ra, dec, time, psi, mode):
         raise ValueError("{} not a polarization mode!".format(mode))
 
 
+def get_polarization_basis(ra, dec, time, psi, cached_gmst=False):
+    """
+    Calculate the wave-frame basis vectors for arrays of sky locations and times
+
+    This is the vectorised equivalent of the construction of the wave-frame in
+    :code:`get_polarization_tensor`, the inputs are broadcast against each other.
+
+    Parameters
+    ==========
+    ra: float, array_like
+        right ascension in radians
+    dec: float, array_like
+        declination in radians
+    time: float, array_like
+        geocentric GPS time
+    psi: float, array_like
+        binary polarisation angle counter-clockwise about the direction of propagation
+    cached_gmst: bool, optional
+        If True, the sidereal time is given by
+        :code:`cached_greenwich_mean_sidereal_time` rather than by LAL for
+        each time
+
+    Returns
+    =======
+    m, n, omega: array_like
+        The wave-frame basis vectors, each with shape (3,) plus the broadcast
+        shape of the inputs.
+
+    """
+    m, n = _wave_frame_vectors(ra, dec, time, psi, cached_gmst)
+    return m, n, np.cross(m, n, axis=0)
+
+
+def _wave_frame_vectors(ra, dec, time, psi, cached_gmst=False):
+    gmst = np.fmod(_greenwich_mean_sidereal_time(time, cached_gmst), 2 * np.pi)
+    theta, phi = ra_dec_to_theta_phi(ra, dec, gmst)
+    cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+    cos_phi, sin_phi = np.cos(phi), np.sin(phi)
+    cos_psi, sin_psi = np.cos(psi), np.sin(psi)
+    shape = (3,) + np.broadcast(theta, phi, psi).shape
+    u = np.empty(shape)
+    u[0], u[1], u[2] = cos_phi * cos_theta, cos_theta * sin_phi, -sin_theta
+    v = np.empty(shape)
+    v[0], v[1], v[2] = -sin_phi, cos_phi, 0
+    m = -u * sin_psi - v * cos_psi
+    n = -u * cos_psi + v * sin_psi
+    return m, n
+
+
+def get_antenna_responses(detector_tensor, ra, dec, time, psi, modes=('plus', 'cross'), cached_gmst=False):
+    """
+    Calculate the antenna response for many polarization modes and sky locations at once
+
+    This is equivalent to contracting the detector tensor with
+    :code:`get_polarization_tensor` for each mode and set of parameters.
+
+    Parameters
+    ==========
+    detector_tensor: array_like
+        The 3x3 detector tensor
+    ra: float, array_like
+        right ascension in radians
+    dec: float, array_like
+        declination in radians
+    time: float, array_like
+        geocentric GPS time
+    psi: float, array_like
+        binary polarisation angle counter-clockwise about the direction of propagation
+    modes: iterable
+        The polarization modes to evaluate, any of 'plus', 'cross',
+        'breathing', 'longitudinal', 'x' and 'y'
+    cached_gmst: bool, optional
+        If True, the sidereal time is given by
+        :code:`cached_greenwich_mean_sidereal_time` rather than by LAL for
+        each time
+
+    Returns
+    =======
+    dict: The antenna responses for each mode with the broadcast shape of the inputs
+
+    """
+    basis = dict(zip('mn', _wave_frame_vectors(ra, dec, time, psi, cached_gmst)))
+    projected = dict()
+    contractions = dict()
+
+    def contract(first, second):
+        if (first, second) not in contractions:
+            if first not in basis or second not in basis:
+                basis['omega'] = np.cross(basis['m'], basis['n'], axis=0)
+            if second not in projected:
+                projected[second] = np.einsum('ij,j...->i...', detector_tensor, basis[second])
+            contractions[first, second] = np.einsum('i...,i...->...', basis[first], projected[second])
+        return contractions[first, second]
+
+    responses = dict()
+    for mode in modes:
+        if mode.lower() == 'plus':
+            responses[mode] = contract('m', 'm') - contract('n', 'n')
+        elif mode.lower() == 'cross':
+            responses[mode] = contract('m', 'n') + contract('n', 'm')
+        elif mode.lower() == 'breathing':
+            responses[mode] = contract('m', 'm') + contract('n', 'n')
+        elif mode.lower() == 'longitudinal':
+            responses[mode] = contract('omega', 'omega')
+        elif mode.lower() == 'x':
+            responses[mode] = contract('m', 'omega') + contract('omega', 'm')
+        elif mode.lower() == 'y':
+            responses[mode] = contract('n', 'omega') + contract('omega', 'n')
+        else:
+            raise ValueError("{} not a polarization mode!".format(mode))
+    return responses
+
+
+def time_shift_phasor(time_shift, start_frequency, delta_frequency, length):
+    """
+    Calculate the phasor exp(-2 pi i time_shift f) on a regular frequency grid
+
+    The grid is split into blocks and the phasor is the outer product of the
+    phasor at the start of each block and the phasor within the first block.
+    This needs ~2 sqrt(length) complex exponentials rather than length, the
+    difference from the direct evaluation is limited by the rounding of the
+    phase, as for the direct evaluation.
+
+    Parameters
+    ==========
+    time_shift: float
+        The time shift in seconds
+    start_frequency: float
+        The first frequency of the grid
+    delta_frequency: float
+        The spacing of the frequency grid
+    length: int
+        The number of frequencies
+
+    Returns
+    =======
+    array_like: The phasor at start_frequency + delta_frequency * arange(length)
+    """
+    block_size = max(1, int(np.ceil(length ** 0.5)))
+    number_of_blocks = -(-length // block_size)
+    within_block = np.exp(-2j * np.pi * time_shift * delta_frequency * np.arange(block_size))
+    block_starts = np.exp(-2j * np.pi * time_shift * (
+        start_frequency + delta_frequency * block_size * np.arange(number_of_blocks)))
+    return np.multiply.outer(block_starts, within_block).ravel()[:length]
+
+
 def get_vertex_position_geocentric(latitude, longitude, elevation):
     """
     Calculate the position of the IFO vertex in geocentric coordinates in meters.
@@ -985,10 +1136,121 @@ def plot_spline_pos(log_freqs, samples, nfreqs=100, level=0.9, color='k', label=
     plt.xlim(freq_points.min() - .5, freq_points.max() + 50)
 
 
+class CachedGreenwichMeanSiderealTime(object):
+
+    # rate of change of the IAU 1982 Greenwich mean sidereal time used by
+    # XLALGreenwichMeanSiderealTime in radians per second
+    sidereal_rate = 2 * np.pi / 86400 * (1 + 8640184.812866 / (36525 * 86400))
+
+    def __init__(self, segment_length=4096, maximum_segments=16):
+        """
+        Greenwich mean sidereal time from cached reference values
+
+        Time is divided into segments, LAL is called once at the centre of
+        each segment used and the sidereal time elsewhere in the segment is
+        given by the linear sidereal rotation from that reference value.
+        This agrees with :code:`lal.GreenwichMeanSiderealTime` to the
+        numerical precision of the LAL calculation, ~1e-9 radians.
+        Segments containing a leap second, when the LAL sidereal time is
+        discontinuous, are evaluated directly with LAL.
+
+        Parameters
+        ==========
+        segment_length: float
+            The length of the segments in seconds
+        maximum_segments: int
+            The number of most recently used segment references kept
+        """
+        self.segment_length = segment_length
+        self.maximum_segments = maximum_segments
+        self._references = OrderedDict()
+
+    def __call__(self, time):
+        """
+        Parameters
+        ==========
+        time: float, array_like
+            GPS time(s)
+
+        Returns
+        =======
+        float, array_like: The Greenwich mean sidereal time in radians, this
+        is not wrapped to [0, 2 pi).
+        """
+        if not isinstance(time, (np.ndarray, list, tuple)):
+            time = float(time)
+            return self._evaluate(time, floor(time / self.segment_length))
+        time = np.asarray(time, dtype=float)
+        segments = np.floor(time / self.segment_length)
+        unique_segments, inverse = np.unique(segments, return_inverse=True)
+        if len(unique_segments) == 1:
+            return self._evaluate(time, unique_segments[0])
+        inverse = inverse.reshape(time.shape)
+        gmst = np.empty(time.shape)
+        for ii, segment in enumerate(unique_segments):
+            in_segment = inverse == ii
+            gmst[in_segment] = self._evaluate(time[in_segment], segment)
+        return gmst
+
+    def _evaluate(self, time, segment):
+        if segment in self._references:
+            self._references.move_to_end(segment)
+        else:
+            self._references[segment] = self._reference(segment)
+            while len(self._references) > self.maximum_segments:
+                self._references.popitem(last=False)
+        reference = self._references[segment]
+        if reference is None:
+            from lal import GreenwichMeanSiderealTime
+            if np.ndim(time) == 0:
+                return GreenwichMeanSiderealTime(float(time))
+            return np.array([GreenwichMeanSiderealTime(float(tt)) for tt in time])
+        reference_time, reference_gmst = reference
+        return reference_gmst + self.sidereal_rate * (time - reference_time)
+
+    def _reference(self, segment):
+        from lal import GreenwichMeanSiderealTime, GPSLeapSeconds
+        start = segment * self.segment_length
+        end = start + self.segment_length
+        try:
+            leap_second_free = GPSLeapSeconds(int(start) - 1) == GPSLeapSeconds(int(end) + 1)
+        except (TypeError, OverflowError):
+            leap_second_free = False
+        if leap_second_free:
+            reference_time = start + self.segment_length / 2
+            return reference_time, GreenwichMeanSiderealTime(reference_time)
+        else:
+            return None
+
+
+cached_greenwich_mean_sidereal_time = CachedGreenwichMeanSiderealTime()
+
+
 def greenwich_mean_sidereal_time(time):
+    """
+    Calculate the Greenwich mean sidereal time with LAL
+
+    Parameters
+    ==========
+    time: float, array_like
+        GPS time(s)
+
+    Returns
+    =======
+    float, array_like: The Greenwich mean sidereal time in radians
+    """
     from lal import GreenwichMeanSiderealTime
-    time = float(time)
-    return GreenwichMeanSiderealTime(time)
+    if np.ndim(time) == 0:
+        return GreenwichMeanSiderealTime(float(time))
+    time = np.asarray(time, dtype=float)
+    return np.array(
+        [GreenwichMeanSiderealTime(tt) for tt in time.ravel()]).reshape(time.shape)
+
+
+def _greenwich_mean_sidereal_time(time, cached=False):
+    if cached:
+        return cached_greenwich_mean_sidereal_time(time)
+    return greenwich_mean_sidereal_time(time)
 
 
 def ln_i0(value):
@@ -1,9 +1,15 @@
+import hashlib
+from collections import OrderedDict
+
 import numpy as np
 
 from ..core import utils
 from ..core.series import CoupledTimeAndFrequencySeries
 from ..core.utils import PropertyAccessor
 from .conversion import convert_to_lal_binary_black_hole_parameters
+from .source import phase_TH_frequency_sequence, _WaveformOutputBuffers
+
+_MISSING = object()
 
 
 class WaveformGenerator(object):
@@ -17,7 +23,8 @@ class WaveformGenerator(object):
     def __init__(self, duration=None, sampling_frequency=None, start_time=0, frequency_domain_source_model=None,
                  time_domain_source_model=None, parameters=None,
                  parameter_conversion=None,
-                 waveform_arguments=None):
+                 waveform_arguments=None, cache_size=1, cache_memory_limit=None,
+                 shared_cache=None, reuse_output_buffers=False):
         """ A waveform generator
 
     Parameters
@@ -49,6 +56,20 @@ class WaveformGenerator(object):
         Note: the arguments of frequency_domain_source_model (except the first,
         which is the frequencies at which to compute the strain) will be added to
         the WaveformGenerator object and initialised to `None`.
+    cache_size: int, optional
+        The number of waveforms kept in the least-recently-used cache, the
+        default only caches the most recent waveform.
+    cache_memory_limit: float, optional
+        The maximum memory in bytes of the cached waveforms.
+    shared_cache: WaveformCache, optional
+        A cache which is searched, but not updated, before the cache of this
+        waveform generator. This can be the populated `cache` of another
+        waveform generator, e.g., passed to worker processes.
+    reuse_output_buffers: bool, optional
+        If True, the lalsimulation source models write the polarizations into
+        arrays owned by this waveform generator instead of allocating new
+        arrays for each waveform. The returned arrays are overwritten by the
+        next waveform, so this requires `cache_size=1` and no `shared_cache`.
 
         """
         self._times_and_frequencies = CoupledTimeAndFrequencySeries(duration=duration,
@@ -65,9 +86,17 @@ class WaveformGenerator(object):
             self.waveform_arguments = waveform_arguments
         else:
             self.waveform_arguments = dict()
+        if reuse_output_buffers:
+            if cache_size != 1 or shared_cache is not None:
+                raise ValueError(
+                    "Output buffers can only be reused with a cache size of one "
+                    "and without a shared cache.")
+            self.waveform_arguments = dict(
+                self.waveform_arguments, output_buffers=_WaveformOutputBuffers())
         if isinstance(parameters, dict):
             self.parameters = parameters
-        self._cache = dict(parameters=None, waveform=None, model=None)
+        self.cache = WaveformCache(maximum_size=cache_size, maximum_memory=cache_memory_limit)
+        self.shared_cache = shared_cache
         utils.logger.info(
             "Waveform generator initiated with\n"
             "  frequency_domain_source_model: {}\n"
@@ -162,9 +191,14 @@ class WaveformGenerator(object):
                           transformed_model_data_points, parameters):
         if parameters is not None:
             self.parameters = parameters
-        if self.parameters == self._cache['parameters'] and self._cache['model'] == model and \
-                self._cache['transformed_model'] == transformed_model:
-            return self._cache['waveform']
+        key = self.cache.key(self.parameters, model, transformed_model)
+        if key is not None:
+            if self.shared_cache is not None and key in self.shared_cache:
+                self.cache.hits += 1
+                return self.shared_cache.get(key)
+            model_strain = self.cache.get(key, default=_MISSING)
+            if model_strain is not _MISSING:
+                return model_strain
         if model is not None:
             model_strain = self._strain_from_model(model_data_points, model)
         elif transformed_model is not None:
@@ -172,12 +206,22 @@ class WaveformGenerator(object):
                                                                transformation_function)
         else:
             raise RuntimeError("No source model given")
-        self._cache['waveform'] = model_strain
-        self._cache['parameters'] = self.parameters.copy()
-        self._cache['model'] = model
-        self._cache['transformed_model'] = transformed_model
+        if key is not None:
+            self.cache.add(key, model_strain)
         return model_strain
 
+    @property
+    def cache_statistics(self):
+        """ The hits, misses and evictions of the waveform cache
+
+        Hits in the `shared_cache` are counted as hits.
+
+        Returns
+        =======
+        dict: The counters, the number of cached waveforms and their memory
+        """
+        return self.cache.statistics
+
     def _strain_from_model(self, model_data_points, model):
         return model(model_data_points, **self.parameters)
 
@@ -247,3 +291,275 @@ class WaveformGenerator(object):
             raise AttributeError('Either time or frequency domain source '
                                  'model must be provided.')
         return set(utils.infer_parameters_from_function(model))
+
+
+class WaveformCache(object):
+
+    def __init__(self, maximum_size=1, maximum_memory=None, read_only=False):
+        """ A least-recently-used cache of waveforms
+
+        Waveforms are keyed on the source model and a hashable representation
+        of the parameters, array valued parameters, e.g., frequencies passed
+        in `waveform_arguments`, are keyed on their content. The digest of
+        an array is computed once per array object, so arrays should be
+        replaced rather than modified in place. Waveforms for parameters
+        with other unhashable values are not cached.
+
+        Parameters
+        ==========
+        maximum_size: int, optional
+            The maximum number of cached waveforms
+        maximum_memory: float, optional
+            The maximum number of bytes of cached arrays, by default the
+            memory is not limited
+        read_only: bool, optional
+            If True, waveforms can not be added to the cache. This allows a
+            populated cache to be shared between waveform generators, e.g.,
+            in different worker processes. The counters of a read-only cache
+            are not updated, the hits are counted by the cache of each
+            waveform generator.
+        """
+        if maximum_size < 1:
+            raise ValueError("The cache size must be at least one.")
+        self.maximum_size = int(maximum_size)
+        self.maximum_memory = maximum_memory
+        self.read_only = read_only
+        self._entries = OrderedDict()
+        self._array_digests = OrderedDict()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    _maximum_array_digests = 16
+
+    def key(self, parameters, *models):
+        """ Return the cache key for a set of parameters and source models
+
+        Parameters
+        ==========
+        parameters: dict
+            The parameters passed to the source model
+        models: callable
+            The source models
+
+        Returns
+        =======
+        tuple: The hashable key, None if a parameter can not be hashed
+        """
+        try:
+            return (tuple(sorted(
+                (key, self._hashable(value)) for key, value in parameters.items())),) + models
+        except TypeError:
+            return None
+
+    def _hashable(self, value):
+        """ Convert a parameter value to a hashable object
+
+        Raises
+        ======
+        TypeError: If the value can not be hashed
+        """
+        if isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                raise TypeError("Object arrays can not be hashed")
+            return self._array_digest(value)
+        elif isinstance(value, (list, tuple)):
+            return tuple(self._hashable(element) for element in value)
+        elif isinstance(value, dict):
+            return tuple(sorted((key, self._hashable(element)) for key, element in value.items()))
+        hash(value)
+        return value
+
+    def _array_digest(self, array):
+        """ Digest of the content of an array, memoised for the most
+        recently used array objects. The arrays are referenced by the memo so
+        their ids are not reused. """
+        entry = self._array_digests.get(id(array))
+        if entry is not None and entry[0] is array:
+            self._array_digests.move_to_end(id(array))
+            return entry[1]
+        digest = (array.dtype.str, array.shape,
+                  hashlib.sha1(np.ascontiguousarray(array).data).hexdigest())
+        self._array_digests[id(array)] = (array, digest)
+        while len(self._array_digests) > self._maximum_array_digests:
+            self._array_digests.popitem(last=False)
+        return digest
+
+    def get(self, key, default=None):
+        """ Return the cached waveform for a key and mark it as recently used
+
+        Returns
+        =======
+        The cached waveform, `default` if the key is not in the cache
+        """
+        if key in self._entries:
+            if not self.read_only:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return self._entries[key][0]
+        if not self.read_only:
+            self.misses += 1
+        return default
+
+    def add(self, key, waveform):
+        """ Add a waveform to the cache, evicting the least-recently-used
+        waveforms to respect the size and memory limits
+
+        Waveforms exceeding the memory limit by themselves are not cached.
+        Nothing is cached if the cache is read-only.
+        """
+        if self.read_only:
+            return
+        if key in self._entries:
+            self.memory -= self._entries.pop(key)[1]
+        nbytes = _nbytes(waveform)
+        if self.maximum_memory is not None and nbytes > self.maximum_memory:
+            return
+        while len(self._entries) >= self.maximum_size or (
+                self.maximum_memory is not None and len(self._entries) > 0 and
+                self.memory + nbytes > self.maximum_memory):
+            self.memory -= self._entries.popitem(last=False)[1][1]
+            self.evictions += 1
+        self._entries[key] = (waveform, nbytes)
+        self.memory += nbytes
+
+    def clear(self):
+        """ Remove all cached waveforms, the counters are not reset """
+        self._entries.clear()
+        self.memory = 0
+
+    @property
+    def statistics(self):
+        """ Dictionary of the cache counters, the number of cached waveforms
+        and their memory in bytes """
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                    size=len(self), memory=self.memory)
+
+
+def _nbytes(waveform):
+    """ Number of bytes in the arrays of a (nested dictionary of) waveform(s) """
+    if isinstance(waveform, dict):
+        return sum(_nbytes(value) for value in waveform.values())
+    return getattr(waveform, 'nbytes', 0)
+
+
+class TidalHeatingWaveformGenerator(WaveformGenerator):
+
+    def __init__(self, duration=None, sampling_frequency=None, start_time=0, frequency_domain_source_model=None,
+                 time_domain_source_model=None, parameters=None,
+                 parameter_conversion=None,
+                 waveform_arguments=None, cache_size=1, cache_memory_limit=None,
+                 shared_cache=None, reuse_output_buffers=False,
+                 phase_parameter_keys=('H_eff5', 'H_eff8', 'Q_tilde')):
+        """ A waveform generator for the tidal-heating source models
+
+    The tidal-heating parameters only enter the HeatedTaylorF2 waveform
+    through the phase correction :func:`bilby.gw.source.phase_TH`. This
+    generator caches the TaylorF2 waveform keyed on all other parameters and
+    reapplies the correction when only the tidal-heating parameters change,
+    so that proposals updating those parameters do not call lalsimulation.
+
+    Supports the uniform frequency grid models, e.g.,
+    :func:`bilby.gw.source.lal_binary_black_hole_tidal_heating`, the
+    frequency-sequence models and the ROQ models.
+
+    Parameters
+    ==========
+    phase_parameter_keys: tuple, optional
+        The parameters only entering through the phase correction, these are
+        set to zero when generating the cached waveform.
+
+    See :class:`WaveformGenerator` for the other parameters.
+        """
+        self.phase_parameter_keys = tuple(phase_parameter_keys)
+        super(TidalHeatingWaveformGenerator, self).__init__(
+            duration=duration, sampling_frequency=sampling_frequency,
+            start_time=start_time, frequency_domain_source_model=frequency_domain_source_model,
+            time_domain_source_model=time_domain_source_model, parameters=parameters,
+            parameter_conversion=parameter_conversion, waveform_arguments=waveform_arguments,
+            cache_size=cache_size, cache_memory_limit=cache_memory_limit,
+            shared_cache=shared_cache, reuse_output_buffers=reuse_output_buffers)
+        self._base_cache = WaveformCache(maximum_size=self.cache.maximum_size,
+                                         maximum_memory=self.cache.maximum_memory)
+
+    def _strain_from_model(self, model_data_points, model):
+        if model is not self.frequency_domain_source_model:
+            return super(TidalHeatingWaveformGenerator, self)._strain_from_model(model_data_points, model)
+        base_parameters = self.parameters.copy()
+        for key in self.phase_parameter_keys:
+            if key in base_parameters:
+                base_parameters[key] = 0.
+        key = self._base_cache.key(base_parameters, model)
+        base = self._base_cache.get(key)
+        if base is None:
+            base = dict(waveform=model(model_data_points, **base_parameters), bands=dict())
+            self._base_cache.add(key, base)
+        base_strain = base['waveform']
+        if base_strain is None:
+            return None
+        if self.parameters.get('waveform_approximant', 'HeatedTaylorF2') != 'HeatedTaylorF2':
+            return base_strain
+        if 'linear' in base_strain:
+            return {
+                basis: self._apply_phase_correction(
+                    base_strain[basis], self.parameters['frequency_nodes_{}'.format(basis)],
+                    base['bands'], basis)
+                for basis in base_strain}
+        else:
+            return self._apply_phase_correction(
+                base_strain, self.parameters.get('frequencies', model_data_points),
+                base['bands'], None)
+
+    def _apply_phase_correction(self, polarizations, frequencies, bands, basis):
+        """ Multiply the polarizations by the tidal-heating phase
+
+        The correction is only evaluated in the band where the polarizations
+        are non-zero, this band is cached with the polarizations.
+
+        Parameters
+        ==========
+        polarizations: dict
+            The cached polarizations, these are not modified
+        frequencies: array_like
+            The frequencies at which the polarizations are evaluated
+        bands: dict
+            The cached non-zero bands of the polarizations
+        basis: str, None
+            The ROQ basis (linear or quadratic) of the polarizations
+
+        Returns
+        =======
+        dict: The corrected polarizations
+        """
+        parameters = self.parameters
+        if basis not in bands:
+            non_zero = np.flatnonzero(
+                (polarizations['plus'] != 0) | (polarizations['cross'] != 0))
+            if len(non_zero) == 0:
+                bands[basis] = slice(0, 0)
+            else:
+                bands[basis] = slice(non_zero[0], non_zero[-1] + 1)
+        band = bands[basis]
+        corrected = {mode: np.zeros_like(polarizations[mode]) for mode in polarizations}
+        if band.start == band.stop:
+            return corrected
+        delta_phase = phase_TH_frequency_sequence(
+            frequencies[band], mass_1=parameters['mass_1'] * utils.solar_mass,
+            mass_2=parameters['mass_2'] * utils.solar_mass,
+            a_1=parameters['a_1'], a_2=parameters['a_2'],
+            spin_1z=parameters['a_1'] * np.cos(parameters['tilt_1']),
+            spin_2z=parameters['a_2'] * np.cos(parameters['tilt_2']),
+            H_eff5=parameters.get('H_eff5', 0.), H_eff8=parameters.get('H_eff8', 0.),
+            Q_tilde=parameters.get('Q_tilde', 0.),
+            start_frequency=parameters.get('minimum_frequency', 20.))
+        phase_factor = np.exp(-1j * delta_phase)
+        for mode in polarizations:
+            np.multiply(polarizations[mode][band], phase_factor, out=corrected[mode][band])
+        return corrected
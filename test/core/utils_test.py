@@ -350,6 +350,65 @@ class TestUnsortedInterp2d(unittest.TestCase):
         self.assertTrue(np.isnan(self.interpolant(x_data, y_data)[3]))
 
 
+class TestBicubicInterp2d(unittest.TestCase):
+    def setUp(self):
+        self.xx = np.linspace(0, 1, 10)
+        self.yy = np.logspace(-1, 0, 15)
+        self.zz = np.random.random((15, 10))
+        self.interpolant = bilby.core.utils.BicubicInterp2d(self.xx, self.yy, self.zz)
+
+    def tearDown(self):
+        pass
+
+    def test_matches_interp2d(self):
+        reference = bilby.core.utils.UnsortedInterp2d(
+            self.xx, self.yy, self.zz, kind="cubic"
+        )
+        x_data = np.random.uniform(0, 1, 100)
+        y_data = np.random.uniform(0.1, 1, 100)
+        self.assertTrue(np.allclose(
+            self.interpolant(x_data, y_data), reference(x_data, y_data), rtol=1e-10
+        ))
+        for x_value, y_value in zip(x_data[:10], y_data[:10]):
+            self.assertAlmostEqual(
+                self.interpolant(x_value, y_value), reference(x_value, y_value)
+            )
+
+    def test_reproduces_grid_values(self):
+        x_data, y_data = np.meshgrid(self.xx, self.yy)
+        self.assertTrue(np.allclose(self.interpolant(x_data, y_data), self.zz))
+
+    def test_returns_float_for_floats(self):
+        self.assertIsInstance(self.interpolant(0.5, 0.5), float)
+
+    def test_returns_none_for_floats_outside_range(self):
+        self.assertIsNone(self.interpolant(0.5, -0.5))
+        self.assertIsNone(self.interpolant(-0.5, 0.5))
+
+    def test_returns_array_with_input_shape(self):
+        self.assertEqual(self.interpolant(0.5, np.random.random((3, 4))).shape, (3, 4))
+        self.assertEqual(self.interpolant(np.random.random(10), 0.5).shape, (10,))
+
+    def test_raises_for_mismatched_arrays(self):
+        with self.assertRaises(ValueError):
+            self.interpolant(np.random.random(10), np.random.random(20))
+
+    def test_raises_for_unsorted_grid(self):
+        with self.assertRaises(ValueError):
+            bilby.core.utils.BicubicInterp2d(self.xx[::-1], self.yy, self.zz)
+
+    def test_returns_fill_in_correct_place(self):
+        interpolant = bilby.core.utils.BicubicInterp2d(
+            self.xx, self.yy, self.zz, fill_value=-np.inf
+        )
+        x_data = np.random.random(10)
+        y_data = np.random.uniform(0.1, 1, 10)
+        x_data[3] = -1
+        output = interpolant(x_data, y_data)
+        self.assertEqual(output[3], -np.inf)
+        self.assertTrue(np.all(np.isfinite(np.delete(output, 3))))
+
+
 class TestTrapeziumRuleIntegration(unittest.TestCase):
     def setUp(self):
         self.x = np.linspace(0, 1, 100)
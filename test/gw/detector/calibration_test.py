@@ -1,6 +1,10 @@
 from bilby.gw import calibration
+import os
+import shutil
 import unittest
 import numpy as np
+import pandas as pd
+from scipy.interpolate import interp1d
 
 
 class TestBaseClass(unittest.TestCase):
@@ -54,6 +58,68 @@ class TestCubicSpline(unittest.TestCase):
         )
         assert np.alltrue(cal_factor.real == np.ones_like(frequency_array))
 
+    def test_calibration_factor_matches_interp1d(self):
+        frequency_array = np.linspace(0, 1200, 1000)
+        parameters = {key: np.random.normal(0, 0.1) for key in self.parameters}
+        amplitude = interp1d(
+            self.model.log_spline_points,
+            [parameters["recalib_amplitude_{}".format(ii)] for ii in range(self.n_points)],
+            kind="cubic", bounds_error=False, fill_value=0,
+        )(np.log10(frequency_array[1:]))
+        phase = interp1d(
+            self.model.log_spline_points,
+            [parameters["recalib_phase_{}".format(ii)] for ii in range(self.n_points)],
+            kind="cubic", bounds_error=False, fill_value=0,
+        )(np.log10(frequency_array[1:]))
+        expected = (1 + amplitude) * (2 + 1j * phase) / (2 - 1j * phase)
+        for _ in range(2):
+            cal_factor = self.model.get_calibration_factor(frequency_array, **parameters)
+            self.assertEqual(cal_factor[0], 1)
+            self.assertLess(max(abs(cal_factor[1:] - expected)), 1e-12)
+
+    def test_spline_basis_matrix_is_cached(self):
+        frequency_array = np.linspace(20, 1024, 1000)
+        basis = self.model.spline_basis_matrix(frequency_array)
+        self.assertEqual(basis.shape, (len(frequency_array), self.n_points))
+        self.assertIs(basis, self.model.spline_basis_matrix(frequency_array.copy()))
+        frequency_array[500] += 1
+        self.assertIsNot(basis, self.model.spline_basis_matrix(frequency_array))
+
+    def test_spline_basis_cache_is_bounded(self):
+        maximum = self.model._maximum_spline_basis_cache_entries
+        frequency_arrays = [np.linspace(20, 1024 + ii, 100) for ii in range(maximum + 2)]
+        first = self.model.spline_basis_matrix(frequency_arrays[0])
+        for frequency_array in frequency_arrays[1:]:
+            self.model.spline_basis_matrix(frequency_array)
+            self.assertLessEqual(len(self.model._spline_basis_cache), maximum)
+        last = self.model.spline_basis_matrix(frequency_arrays[-1])
+        self.assertIs(last, self.model.spline_basis_matrix(frequency_arrays[-1]))
+        self.assertIsNot(first, self.model.spline_basis_matrix(frequency_arrays[0]))
+
+    def test_calibration_factors_match_calibration_factor(self):
+        frequency_array = np.linspace(0, 1024, 1000)
+        parameters = pd.DataFrame({
+            key: np.random.normal(0, 0.1, 10) for key in self.parameters
+        })
+        cal_factors = self.model.get_calibration_factors(frequency_array, parameters)
+        self.assertEqual(cal_factors.shape, (10, len(frequency_array)))
+        for ii in range(len(parameters)):
+            cal_factor = self.model.get_calibration_factor(
+                frequency_array, **parameters.iloc[ii]
+            )
+            self.assertLess(max(abs(cal_factors[ii] - cal_factor)), 1e-12)
+
+    def test_base_class_calibration_factors_match_calibration_factor(self):
+        frequency_array = np.linspace(0, 1024, 1000)
+        parameters = pd.DataFrame({
+            key: np.random.normal(0, 0.1, 3) for key in self.parameters
+        })
+        cal_factors = calibration.Recalibrate.get_calibration_factors(
+            self.model, frequency_array, parameters
+        )
+        expected = self.model.get_calibration_factors(frequency_array, parameters)
+        self.assertLess(np.max(abs(cal_factors - expected)), 1e-12)
+
     def test_repr(self):
         expected = "CubicSpline(prefix='{}', minimum_frequency={}, maximum_frequency={}, n_points={})".format(
             self.prefix, self.minimum_frequency, self.maximum_frequency, self.n_points
@@ -62,6 +128,56 @@ class TestCubicSpline(unittest.TestCase):
         self.assertEqual(expected, actual)
 
 
+class TestCalibrationFile(unittest.TestCase):
+    def setUp(self):
+        self.outdir = "outdir_calibration_file"
+        os.mkdir(self.outdir)
+        self.filename = os.path.join(self.outdir, "calibration.h5")
+        self.frequency_array = np.linspace(0, 512, 257)
+        self.draws = 1 + 0.1 * (
+            np.random.normal(size=(10, 257)) + 1j * np.random.normal(size=(10, 257))
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def test_write_and_read_array(self):
+        calibration.write_calibration_file(
+            self.filename, self.frequency_array, self.draws
+        )
+        draws = calibration.read_calibration_file(
+            self.filename, self.frequency_array, 10
+        )
+        self.assertLess(np.max(abs(draws - self.draws)), 1e-12)
+
+    def test_write_blocks_matches_array(self):
+        calibration.write_calibration_file(
+            self.filename,
+            self.frequency_array,
+            (self.draws[ii:ii + 3] for ii in range(0, 10, 3)),
+        )
+        draws = calibration.read_calibration_file(
+            self.filename, self.frequency_array, 4, starting_index=3
+        )
+        self.assertLess(np.max(abs(draws - self.draws[3:7])), 1e-12)
+
+    def test_write_list_of_curves(self):
+        calibration.write_calibration_file(
+            self.filename, self.frequency_array, list(self.draws)
+        )
+        draws = calibration.read_calibration_file(
+            self.filename, self.frequency_array, 10
+        )
+        self.assertLess(np.max(abs(draws - self.draws)), 1e-12)
+
+    def test_writer_removes_file_on_error(self):
+        with self.assertRaises(ValueError):
+            with calibration.CalibrationFileWriter(self.filename, self.frequency_array) as calibration_file:
+                calibration_file.append(self.draws[:3])
+                raise ValueError
+        self.assertFalse(os.path.exists(self.filename))
+
+
 class TestCubicSplineRequiresFourNodes(unittest.TestCase):
     def test_cannot_instantiate_with_too_few_nodes(self):
         for ii in range(6):
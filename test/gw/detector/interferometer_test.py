@@ -118,8 +118,39 @@ class TestInterferometer(unittest.TestCase):
                 self.ifo.detector_tensor.sum(),
             )
 
+    def test_antenna_responses_matches_antenna_response(self):
+        modes = ["plus", "cross", "breathing", "longitudinal", "x", "y"]
+        ra = np.random.uniform(0, 2 * np.pi, 10)
+        dec = np.random.uniform(-np.pi / 2, np.pi / 2, 10)
+        time = 1126259642 + np.random.uniform(0, 86400, 10)
+        psi = np.random.uniform(0, np.pi, 10)
+        responses = self.ifo.antenna_responses(ra, dec, time, psi, modes)
+        for mode in modes:
+            self.assertEqual(responses[mode].shape, (10,))
+            for ii in range(10):
+                self.assertAlmostEqual(
+                    responses[mode][ii],
+                    self.ifo.antenna_response(ra[ii], dec[ii], time[ii], psi[ii], mode),
+                    places=12,
+                )
+
+    def test_antenna_responses_scalar(self):
+        responses = self.ifo.antenna_responses(1.3, -0.2, 1126259642, 0.4)
+        self.assertEqual(sorted(responses.keys()), ["cross", "plus"])
+        for mode in responses:
+            self.assertEqual(np.shape(responses[mode]), ())
+            self.assertAlmostEqual(
+                responses[mode],
+                self.ifo.antenna_response(1.3, -0.2, 1126259642, 0.4, mode),
+                places=12,
+            )
+
+    def test_antenna_responses_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            self.ifo.antenna_responses(1.3, -0.2, 1126259642, 0.4, ["not-a-mode"])
+
     def test_get_detector_response_default_behaviour(self):
-        self.ifo.antenna_response = MagicMock(return_value=1)
+        self.ifo.antenna_responses = MagicMock(return_value=dict(plus=1, cross=1))
         self.ifo.time_delay_from_geocenter = MagicMock(return_value=0)
         self.ifo.epoch = 0
         self.minimum_frequency = 10
@@ -135,7 +166,7 @@ class TestInterferometer(unittest.TestCase):
         )
 
     def test_get_detector_response_with_dt(self):
-        self.ifo.antenna_response = MagicMock(return_value=1)
+        self.ifo.antenna_responses = MagicMock(return_value=dict(plus=1, cross=1))
         self.ifo.time_delay_from_geocenter = MagicMock(return_value=0)
         self.ifo.epoch = 1
         self.minimum_frequency = 10
@@ -152,8 +183,29 @@ class TestInterferometer(unittest.TestCase):
         )
         self.assertTrue(np.allclose(abs(expected_response), abs(response)))
 
+    def test_get_detector_response_matches_direct_calculation(self):
+        parameters = dict(ra=1.2, dec=-0.3, geocent_time=0.37, psi=0.4)
+        responses = self.ifo.antenna_responses(
+            parameters["ra"], parameters["dec"], parameters["geocent_time"], parameters["psi"]
+        )
+        dt = parameters["geocent_time"] - self.ifo.strain_data.start_time + self.ifo.time_delay_from_geocenter(
+            parameters["ra"], parameters["dec"], parameters["geocent_time"]
+        )
+        for notch_list in [None, [(14, 15)]]:
+            self.ifo.strain_data.notch_list = notch_list
+            mask = self.ifo.frequency_mask
+            expected = np.zeros(len(mask), dtype=complex)
+            expected[mask] = (
+                self.injection_polarizations["plus"][mask] * responses["plus"]
+                + self.injection_polarizations["cross"][mask] * responses["cross"]
+            ) * np.exp(-2j * np.pi * dt * self.ifo.frequency_array[mask])
+            response = self.ifo.get_detector_response(
+                waveform_polarizations=self.injection_polarizations, parameters=parameters
+            )
+            self.assertLess(max(abs(response - expected)), 1e-12)
+
     def test_get_detector_response_multiple_modes(self):
-        self.ifo.antenna_response = MagicMock(return_value=1)
+        self.ifo.antenna_responses = MagicMock(return_value=dict(plus=1, cross=1))
         self.ifo.time_delay_from_geocenter = MagicMock(return_value=0)
         self.ifo.epoch = 0
         self.minimum_frequency = 10
@@ -78,6 +78,26 @@ class TestInterferometerStrainData(unittest.TestCase):
         idxs = (freqs > 100) * (freqs < 101)
         self.assertTrue(len(freqs[idxs]) == 0)
 
+    def test_frequency_band(self):
+        strain_data = bilby.gw.detector.InterferometerStrainData(
+            minimum_frequency=20, maximum_frequency=512)
+        strain_data.set_from_time_domain_strain(
+            time_domain_strain=np.random.normal(0, 1, 4096),
+            time_array=np.arange(0, 4, 4 / 4096)
+        )
+        band = strain_data.frequency_band
+        self.assertTrue(np.array_equal(
+            strain_data.frequency_array[band],
+            strain_data.frequency_array[strain_data.frequency_mask]
+        ))
+        strain_data.maximum_frequency = 256
+        self.assertEqual(
+            strain_data.frequency_band.stop - strain_data.frequency_band.start,
+            np.count_nonzero(strain_data.frequency_mask)
+        )
+        strain_data.notch_list = [(100, 101)]
+        self.assertIsNone(strain_data.frequency_band)
+
     def test_set_data_fails(self):
         with mock.patch("bilby.core.utils.create_frequency_series") as m:
             m.return_value = [1, 2, 3]
@@ -1,8 +1,14 @@
 import unittest
 from copy import deepcopy
 import os
+import pickle
+import shutil
+import tempfile
 
+import mock
 import numpy as np
+import pandas as pd
+from scipy.special import logsumexp
 import bilby
 from bilby.gw.likelihood import BilbyROQParamsRangeError
 
@@ -274,6 +280,50 @@ class TestGWTransient(unittest.TestCase):
             self.likelihood.log_likelihood_ratio()
         )
 
+    def test_whitened_data_is_reused(self):
+        self.likelihood.log_likelihood_ratio()
+        interferometer = self.interferometers[0]
+        self.assertIs(
+            self.likelihood._get_whitened_data(interferometer),
+            self.likelihood._get_whitened_data(interferometer),
+        )
+
+    def _assert_agrees_with_new_likelihood(self):
+        new_likelihood = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.prior.copy(),
+        )
+        new_likelihood.parameters = self.parameters.copy()
+        self.assertAlmostEqual(
+            new_likelihood.log_likelihood_ratio(),
+            self.likelihood.log_likelihood_ratio(),
+        )
+
+    def test_whitened_data_updated_when_strain_data_changes(self):
+        original = self.likelihood.log_likelihood_ratio()
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator
+        )
+        self.assertNotEqual(original, self.likelihood.log_likelihood_ratio())
+        self._assert_agrees_with_new_likelihood()
+
+    def test_whitened_data_updated_when_psd_changes(self):
+        original = self.likelihood.log_likelihood_ratio()
+        psd = self.interferometers[0].power_spectral_density
+        new_psd = bilby.gw.detector.PowerSpectralDensity.from_power_spectral_density_array(
+            frequency_array=psd.frequency_array, psd_array=psd.psd_array * 2
+        )
+        self.interferometers[0].power_spectral_density = new_psd
+        self.assertNotEqual(original, self.likelihood.log_likelihood_ratio())
+        self._assert_agrees_with_new_likelihood()
+
+    def test_whitened_data_updated_when_frequency_band_changes(self):
+        original = self.likelihood.log_likelihood_ratio()
+        self.interferometers[0].minimum_frequency = 40
+        self.assertNotEqual(original, self.likelihood.log_likelihood_ratio())
+        self._assert_agrees_with_new_likelihood()
+
 
 class TestMarginalizedLikelihood(unittest.TestCase):
     def setUp(self):
@@ -420,6 +470,227 @@ class TestMarginalizedLikelihood(unittest.TestCase):
             bilby.run_sampler(like, new_prior)
 
 
+class TestDistanceMarginalizationLookupTable(unittest.TestCase):
+    def setUp(self):
+        self.duration = 4
+        self.sampling_frequency = 256
+        self.interferometers = bilby.gw.detector.InterferometerList(["H1"])
+        self.interferometers.set_strain_data_from_zero_noise(
+            sampling_frequency=self.sampling_frequency, duration=self.duration
+        )
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration,
+            sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole,
+        )
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors["luminosity_distance"] = bilby.core.prior.PowerLaw(
+            alpha=2, minimum=50, maximum=1000
+        )
+        self.directory = "outdir_lookup_table"
+        os.mkdir(self.directory)
+        self.shape = mock.patch.object(
+            bilby.gw.likelihood.GravitationalWaveTransient, "_lookup_table_shape", (20, 40)
+        )
+        self.shape.start()
+
+    def tearDown(self):
+        self.shape.stop()
+        shutil.rmtree(self.directory)
+        del self.interferometers
+        del self.waveform_generator
+        del self.priors
+
+    def get_likelihood(self, lookup_table=None, **kwargs):
+        return bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.priors.copy(),
+            distance_marginalization=True,
+            distance_marginalization_lookup_table=lookup_table,
+            **kwargs
+        )
+
+    def test_lookup_table_matches_logsumexp(self):
+        for phase_marginalization in [False, True]:
+            like = self.get_likelihood(
+                lookup_table=self.directory, phase_marginalization=phase_marginalization
+            )
+            scaling = like._ref_dist / like._distance_array
+            prior_term = like.distance_prior_array * like._delta_distance
+            log_norm = logsumexp(np.zeros(len(scaling)), b=prior_term)
+            for ii, optimal_snr_squared in enumerate(like._optimal_snr_squared_ref_array[::5]):
+                for jj, d_inner_h in enumerate(like._d_inner_h_ref_array[::5]):
+                    d_inner_h = d_inner_h * scaling
+                    if phase_marginalization:
+                        d_inner_h = bilby.gw.utils.ln_i0(abs(d_inner_h))
+                    expected = logsumexp(
+                        d_inner_h - optimal_snr_squared * scaling ** 2 / 2, b=prior_term
+                    ) - log_norm
+                    self.assertAlmostEqual(
+                        like._dist_margd_loglikelihood_array[5 * ii, 5 * jj] / expected, 1
+                    )
+
+    def test_lookup_table_with_pool_matches_serial(self):
+        like = self.get_likelihood(lookup_table=self.directory)
+        with mock.patch.object(like, "distance_marginalization_npool", 2):
+            like._create_lookup_table()
+        pooled = like._dist_margd_loglikelihood_array
+        like._create_lookup_table()
+        self.assertTrue(np.array_equal(pooled, like._dist_margd_loglikelihood_array))
+
+    def test_lookup_table_shared_through_directory(self):
+        like = self.get_likelihood(lookup_table=self.directory)
+        filename = os.path.join(self.directory, like._hashed_lookup_table_filename)
+        self.assertEqual(like.cached_lookup_table_filename, filename)
+        self.assertTrue(os.path.isfile(filename))
+        with mock.patch.object(
+            bilby.gw.likelihood.GravitationalWaveTransient, "_create_lookup_table"
+        ) as create:
+            new_like = self.get_likelihood(lookup_table=self.directory)
+            create.assert_not_called()
+        self.assertTrue(np.array_equal(
+            like._dist_margd_loglikelihood_array, new_like._dist_margd_loglikelihood_array
+        ))
+
+    def test_lookup_table_filename_depends_on_configuration(self):
+        like = self.get_likelihood(lookup_table=self.directory)
+        phase_like = self.get_likelihood(
+            lookup_table=self.directory, phase_marginalization=True
+        )
+        self.priors["luminosity_distance"] = bilby.core.prior.PowerLaw(
+            alpha=2, minimum=50, maximum=2000
+        )
+        prior_like = self.get_likelihood(lookup_table=self.directory)
+        filenames = {
+            like.cached_lookup_table_filename,
+            phase_like.cached_lookup_table_filename,
+            prior_like.cached_lookup_table_filename,
+        }
+        self.assertEqual(len(filenames), 3)
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+
+    def test_default_lookup_table_directory(self):
+        with mock.patch.dict(os.environ, {"BILBY_CACHE_DIR": self.directory}):
+            like = self.get_likelihood()
+        self.assertEqual(
+            like.cached_lookup_table_filename,
+            os.path.join(self.directory, like._hashed_lookup_table_filename),
+        )
+        self.assertTrue(os.path.isfile(like.cached_lookup_table_filename))
+
+
+class TestCalibrationMarginalizationCompression(unittest.TestCase):
+    def setUp(self):
+        self.duration = 4
+        self.sampling_frequency = 256
+        self.parameters = dict(
+            mass_1=31.0, mass_2=29.0, a_1=0.0, a_2=0.0, tilt_1=0.0, tilt_2=0.0,
+            phi_12=0.0, phi_jl=0.0, luminosity_distance=400.0, theta_jn=0.4,
+            psi=0.7, phase=1.3, geocent_time=1126259642.413, ra=1.3, dec=-1.2,
+            time_jitter=0.0,
+        )
+        self.interferometers = bilby.gw.detector.InterferometerList(["H1"])
+        self.interferometers.set_strain_data_from_zero_noise(
+            sampling_frequency=self.sampling_frequency,
+            duration=self.duration,
+            start_time=self.parameters["geocent_time"] - self.duration + 2,
+        )
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration,
+            sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole,
+        )
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator
+        )
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors["geocent_time"] = bilby.core.prior.Uniform(
+            self.parameters["geocent_time"] - 0.1, self.parameters["geocent_time"] + 0.1
+        )
+        for ifo in self.interferometers:
+            ifo.calibration_model = bilby.gw.calibration.CubicSpline(
+                prefix="recalib_{}_".format(ifo.name),
+                minimum_frequency=20, maximum_frequency=128, n_points=5,
+            )
+            for kind in ["amplitude", "phase"]:
+                for ii in range(5):
+                    self.priors["recalib_{}_{}_{}".format(ifo.name, kind, ii)] = \
+                        bilby.core.prior.Gaussian(0, 0.1)
+        self.directory = "outdir_calibration_compression"
+        os.mkdir(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        del self.interferometers
+        del self.waveform_generator
+        del self.priors
+
+    def get_likelihood(self, **kwargs):
+        np.random.seed(3)
+        like = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.priors.copy(),
+            calibration_marginalization=True,
+            number_of_response_curves=50,
+            calibration_lookup_table={
+                ifo.name: os.path.join(self.directory, "{}.h5".format(ifo.name))
+                for ifo in self.interferometers
+            },
+            **kwargs
+        )
+        parameters = self.parameters.copy()
+        if like.time_marginalization:
+            parameters["geocent_time"] = float(self.interferometers.start_time)
+        like.parameters.update(parameters)
+        return like
+
+    def test_compress_calibration_draws_respects_tolerance(self):
+        draws = np.random.normal(size=(40, 3)) @ np.random.normal(size=(3, 100))
+        draws = draws + 1e-4 * np.random.normal(size=draws.shape)
+        (weights, basis), error = bilby.gw.likelihood.GravitationalWaveTransient.\
+            _compress_calibration_draws(draws, 1e-2)
+        self.assertEqual(weights.shape, (40, 3))
+        self.assertEqual(basis.shape, (3, 100))
+        self.assertLessEqual(error, 1e-2)
+        self.assertAlmostEqual(
+            np.linalg.norm(weights @ basis - draws) / np.linalg.norm(draws), error
+        )
+
+    def test_full_rank_draws_are_not_compressed(self):
+        draws = np.random.normal(size=(10, 100))
+        (weights, basis), error = bilby.gw.likelihood.GravitationalWaveTransient.\
+            _compress_calibration_draws(draws, 1e-8)
+        self.assertIsNone(weights)
+        self.assertIs(basis, draws)
+        self.assertEqual(error, 0)
+
+    def test_compressed_likelihood_matches_uncompressed(self):
+        for time_marginalization in [False, True]:
+            exact = self.get_likelihood(time_marginalization=time_marginalization)
+            compressed = self.get_likelihood(
+                time_marginalization=time_marginalization, calibration_svd_tolerance=1e-8
+            )
+            errors = compressed.calibration_reconstruction_errors["H1"]
+            self.assertLessEqual(errors["draws"], 1e-8)
+            self.assertLessEqual(errors["abs_draws"], 1e-8)
+            self.assertAlmostEqual(
+                exact.log_likelihood_ratio(), compressed.log_likelihood_ratio(), 5
+            )
+
+    @mock.patch.object(
+        bilby.gw.likelihood.GravitationalWaveTransient, "_lookup_table_shape", (20, 40)
+    )
+    def test_time_distance_and_calibration_marginalization(self):
+        like = self.get_likelihood(
+            time_marginalization=True, distance_marginalization=True,
+            distance_marginalization_lookup_table=os.path.join(self.directory, "lookup.npz"),
+        )
+        like.parameters["luminosity_distance"] = like._ref_dist
+        self.assertTrue(np.isfinite(like.log_likelihood_ratio()))
+
+
 class TestMarginalizations(unittest.TestCase):
     """
     Test all marginalised likelihoods matches brute force version.
@@ -428,6 +699,14 @@ class TestMarginalizations(unittest.TestCase):
     The `time_jitter` parameter makes this a weaker dependence during sampling.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        cls.lookup_directory = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lookup_directory.cleanup()
+
     def setUp(self):
         np.random.seed(500)
         self.duration = 4
@@ -487,14 +766,15 @@ class TestMarginalizations(unittest.TestCase):
         time_marginalization=False,
         phase_marginalization=False,
         distance_marginalization=False,
-        priors=None
+        priors=None,
+        time_marginalization_zero_padding=None,
     ):
         if priors is None:
             priors = self.priors.copy()
         if distance_marginalization and phase_marginalization:
-            lookup = "distance_lookup_phase.npz"
+            lookup = os.path.join(self.lookup_directory.name, "distance_lookup_phase.npz")
         elif distance_marginalization:
-            lookup = "distance_lookup_no_phase.npz"
+            lookup = os.path.join(self.lookup_directory.name, "distance_lookup_no_phase.npz")
         else:
             lookup = None
         like = bilby.gw.likelihood.GravitationalWaveTransient(
@@ -505,6 +785,7 @@ class TestMarginalizations(unittest.TestCase):
             time_marginalization=time_marginalization,
             distance_marginalization_lookup_table=lookup,
             priors=priors,
+            time_marginalization_zero_padding=time_marginalization_zero_padding,
         )
         like.parameters = self.parameters.copy()
         if time_marginalization:
@@ -643,6 +924,174 @@ class TestMarginalizations(unittest.TestCase):
             prior=prior,
         )
 
+    def test_time_marginalised_snrs_are_restricted_to_time_window(self):
+        priors = self.priors.copy()
+        priors["geocent_time"] = bilby.prior.Uniform(
+            minimum=self.parameters["geocent_time"] - 0.1,
+            maximum=self.parameters["geocent_time"] + 0.1,
+        )
+        like = self.get_likelihood(time_marginalization=True, priors=priors)
+        self.assertLess(len(like._time_window), len(like._times))
+        snrs = like.calculate_snrs(
+            like.waveform_generator.frequency_domain_strain(like.parameters),
+            self.interferometers[0],
+        )
+        self.assertEqual(snrs.d_inner_h_array.shape, like._time_window.shape)
+
+    def test_time_marginalisation_zero_padding(self):
+        for interferometer in self.interferometers:
+            interferometer.maximum_frequency = 256
+        marginalized = self.get_likelihood(
+            time_marginalization=True, time_marginalization_zero_padding=4
+        )
+        self.assertLess(
+            len(marginalized._times), len(self.waveform_generator.time_array) / 2
+        )
+        self._template(
+            marginalized,
+            self.get_likelihood(),
+            key="geocent_time",
+            values=marginalized._times,
+        )
+
+    def test_time_marginalisation_zero_padding_limited_to_full_grid(self):
+        self.assertEqual(
+            self.get_likelihood(
+                time_marginalization=True, time_marginalization_zero_padding=100
+            ).log_likelihood_ratio(),
+            self.get_likelihood(time_marginalization=True).log_likelihood_ratio(),
+        )
+
+
+class TestLogLikelihoodRatioBatch(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(200)
+        self.duration = 4
+        self.sampling_frequency = 1024
+        self.parameters = dict(
+            mass_1=31.0, mass_2=29.0, a_1=0.4, a_2=0.3, tilt_1=0.0, tilt_2=0.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000.0, theta_jn=0.4,
+            psi=2.659, phase=1.3, geocent_time=1126259642.413, ra=1.375,
+            dec=-1.2108, time_jitter=0,
+        )
+        self.interferometers = bilby.gw.detector.InterferometerList(["H1", "L1"])
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency,
+            duration=self.duration,
+            start_time=1126259640,
+        )
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration,
+            sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole,
+            start_time=1126259640,
+        )
+        self.interferometers.inject_signal(
+            parameters=self.parameters, waveform_generator=self.waveform_generator
+        )
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors["geocent_time"] = bilby.prior.Uniform(
+            minimum=self.parameters["geocent_time"] - 0.1,
+            maximum=self.parameters["geocent_time"] + 0.1,
+        )
+        number_of_points = 10
+        self.points = {
+            key: np.full(number_of_points, value) for key, value in self.parameters.items()
+        }
+        self.points["mass_1"] += np.random.normal(0, 0.1, number_of_points)
+        self.points["ra"] += np.random.normal(0, 0.05, number_of_points)
+        self.points["luminosity_distance"] = np.random.uniform(500, 1500, number_of_points)
+        self.points["geocent_time"] += np.random.normal(0, 0.001, number_of_points)
+        self.points["time_jitter"] = np.random.uniform(
+            -1 / self.sampling_frequency, 1 / self.sampling_frequency, number_of_points
+        )
+
+    def tearDown(self):
+        del self.duration
+        del self.sampling_frequency
+        del self.parameters
+        del self.interferometers
+        del self.waveform_generator
+        del self.priors
+        del self.points
+
+    def _template(self, **kwargs):
+        like = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.priors.copy(),
+            **kwargs
+        )
+        points = {key: value.copy() for key, value in self.points.items()}
+        if kwargs.get("time_marginalization", False):
+            points["geocent_time"][:] = self.interferometers.start_time
+        if kwargs.get("phase_marginalization", False):
+            points["phase"][:] = 0
+        expected = list()
+        for ii in range(len(points["mass_1"])):
+            like.parameters.update({key: value[ii] for key, value in points.items()})
+            expected.append(like.log_likelihood_ratio())
+        batch = like.log_likelihood_ratio_batch(points, block_size=3)
+        self.assertEqual(batch.shape, (len(expected),))
+        self.assertTrue(np.allclose(batch, expected, rtol=0, atol=1e-6))
+
+    def test_no_marginalization(self):
+        self._template()
+
+    def test_phase_marginalization(self):
+        self._template(phase_marginalization=True)
+
+    def test_time_marginalization(self):
+        self._template(time_marginalization=True)
+
+    def test_time_phase_marginalization(self):
+        self._template(time_marginalization=True, phase_marginalization=True)
+
+    @mock.patch.object(
+        bilby.gw.likelihood.GravitationalWaveTransient, "_lookup_table_shape", (100, 200)
+    )
+    def test_distance_phase_marginalization(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self._template(
+                distance_marginalization=True,
+                phase_marginalization=True,
+                distance_marginalization_lookup_table=os.path.join(
+                    directory, "distance_lookup_phase.npz"
+                ),
+            )
+
+    def test_cached_gmst(self):
+        like = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+        )
+        self.assertTrue(np.allclose(
+            like.log_likelihood_ratio_batch(self.points, cached_gmst=True),
+            like.log_likelihood_ratio_batch(self.points),
+            rtol=0, atol=1e-4,
+        ))
+
+    def test_pandas_input(self):
+        like = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+        )
+        self.assertTrue(np.array_equal(
+            like.log_likelihood_ratio_batch(self.points),
+            like.log_likelihood_ratio_batch(pd.DataFrame(self.points)),
+        ))
+
+    def test_base_likelihood_loops_over_points(self):
+        like = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+        )
+        self.assertTrue(np.allclose(
+            like.log_likelihood_ratio_batch(self.points),
+            bilby.core.likelihood.Likelihood.log_likelihood_ratio_batch(like, self.points),
+            rtol=0, atol=1e-6,
+        ))
+
 
 class TestROQLikelihood(unittest.TestCase):
     def setUp(self):
@@ -922,6 +1371,296 @@ class TestROQLikelihood(unittest.TestCase):
             )
 
 
+class TestROQWeights(unittest.TestCase):
+    def setUp(self):
+        self.duration = 4
+        self.sampling_frequency = 256
+        self.interferometers = bilby.gw.detector.InterferometerList(["H1", "L1"])
+        for ifo in self.interferometers:
+            ifo.minimum_frequency = 20
+            ifo.maximum_frequency = 128
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency,
+            duration=self.duration,
+            start_time=1126259642 - self.duration + 2,
+        )
+        number_of_frequencies = sum(self.interferometers[0].frequency_mask)
+        self.linear_matrix = (
+            np.random.normal(size=(number_of_frequencies, 10))
+            + 1j * np.random.normal(size=(number_of_frequencies, 10))
+        )
+        self.quadratic_matrix = np.random.normal(size=(number_of_frequencies, 4))
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration,
+            sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.binary_black_hole_roq,
+            waveform_arguments=dict(
+                frequency_nodes_linear=np.linspace(20, 128, 10),
+                frequency_nodes_quadratic=np.linspace(20, 128, 4),
+            ),
+        )
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors["geocent_time"] = bilby.core.prior.Uniform(1126259641.9, 1126259642.1)
+        self.directory = "outdir_roq_weights"
+
+    def tearDown(self):
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        del self.interferometers
+        del self.waveform_generator
+        del self.priors
+
+    def get_likelihood(self, **kwargs):
+        return bilby.gw.likelihood.ROQGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.priors,
+            linear_matrix=self.linear_matrix,
+            quadratic_matrix=self.quadratic_matrix,
+            **kwargs
+        )
+
+    def test_linear_weights_match_single_ifft(self):
+        like = self.get_likelihood(weights_block_size=3)
+        time_samples = like.weights["time_samples"]
+        number_of_time_samples = int(round(self.duration / (time_samples[1] - time_samples[0])))
+        start_idx = int(round(time_samples[0] / (time_samples[1] - time_samples[0])))
+        for ifo in self.interferometers:
+            mask = ifo.frequency_mask
+            ifft_input = np.zeros(number_of_time_samples, dtype=complex)
+            nonzero_idxs = np.flatnonzero(mask)
+            data_over_psd = ifo.frequency_domain_strain[mask] / ifo.power_spectral_density_array[mask]
+            for ii, basis_element in enumerate(self.linear_matrix.T):
+                ifft_input[nonzero_idxs] = data_over_psd * np.conj(basis_element)
+                expected = np.fft.ifft(ifft_input)[start_idx:start_idx + len(time_samples)]
+                expected *= 4 * number_of_time_samples / self.duration
+                self.assertLess(
+                    max(abs(like.weights[ifo.name + "_linear"][:, ii] - expected)),
+                    1e-10 * max(abs(expected))
+                )
+
+    def test_linear_weights_independent_of_block_size(self):
+        weights = self.get_likelihood(weights_block_size=1).weights
+        other_weights = self.get_likelihood().weights
+        for key in weights:
+            self.assertTrue(np.allclose(weights[key], other_weights[key], rtol=1e-12, atol=0))
+
+    def test_linear_weights_cache(self):
+        weights = self.get_likelihood(weights_cache_directory=self.directory).weights
+        self.assertEqual(len(os.listdir(self.directory)), len(self.interferometers))
+        with mock.patch("bilby.gw.likelihood._roq_linear_weights") as builder:
+            cached_weights = self.get_likelihood(weights_cache_directory=self.directory).weights
+            builder.assert_not_called()
+        for key in weights:
+            self.assertTrue(np.array_equal(weights[key], cached_weights[key]))
+
+    def test_save_and_load_memory_mapped_weights(self):
+        like = self.get_likelihood()
+        filename = os.path.join(self.directory, "weights")
+        like.save_weights(filename, format="npy")
+        self.assertTrue(os.path.isdir(filename + ".npy"))
+        weights = like.load_weights(filename + ".npy")
+        self.assertEqual(set(weights.keys()), set(like.weights.keys()))
+        for key in like.weights:
+            self.assertIsInstance(weights[key], np.memmap)
+            self.assertFalse(weights[key].flags.writeable)
+            self.assertTrue(np.array_equal(weights[key], like.weights[key]))
+
+    def test_resaving_memory_mapped_weights_drops_old_keys(self):
+        like = self.get_likelihood()
+        filename = os.path.join(self.directory, "weights")
+        like.save_weights(filename, format="npy")
+        like.weights = {key: value for key, value in like.weights.items() if not key.startswith("L1")}
+        like.save_weights(filename, format="npy")
+        weights = like.load_weights(filename + ".npy")
+        self.assertEqual(set(weights.keys()), set(like.weights.keys()))
+
+    def test_pickle_reopens_memory_mapped_weights(self):
+        like = self.get_likelihood()
+        filename = os.path.join(self.directory, "weights")
+        like.save_weights(filename, format="npy")
+        like = self.get_likelihood(weights=filename + ".npy")
+        state = like.__getstate__()
+        for key in like.weights:
+            self.assertNotIsInstance(state["weights"][key], np.ndarray)
+        new_like = pickle.loads(pickle.dumps(like))
+        for key in like.weights:
+            self.assertIsInstance(new_like.weights[key], np.memmap)
+            self.assertEqual(new_like.weights[key].filename, like.weights[key].filename)
+            self.assertTrue(np.array_equal(new_like.weights[key], like.weights[key]))
+
+    def test_pickle_copies_in_memory_weights(self):
+        like = self.get_likelihood()
+        new_like = pickle.loads(pickle.dumps(like))
+        for key in like.weights:
+            self.assertNotIsInstance(new_like.weights[key], np.memmap)
+            self.assertTrue(np.array_equal(new_like.weights[key], like.weights[key]))
+
+
+class TestMultiBasisROQ(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(200)
+        self.duration = 4
+        self.sampling_frequency = 256
+        self.interferometers = bilby.gw.detector.InterferometerList(["H1", "L1"])
+        for ifo in self.interferometers:
+            ifo.minimum_frequency = 20
+            ifo.maximum_frequency = 128
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=self.sampling_frequency,
+            duration=self.duration,
+            start_time=1126259642 - self.duration + 2,
+        )
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration,
+            sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.binary_black_hole_roq,
+            parameter_conversion=bilby.gw.conversion.convert_to_lal_binary_black_hole_parameters,
+            waveform_arguments=dict(waveform_approximant="IMRPhenomPv2", reference_frequency=20),
+        )
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors.pop("mass_1")
+        self.priors.pop("mass_2")
+        self.priors["chirp_mass"] = bilby.core.prior.Uniform(10, 40)
+        self.priors["geocent_time"] = bilby.core.prior.Uniform(1126259641.9, 1126259642.1)
+        self.parameters = dict(
+            chirp_mass=15.0, mass_ratio=0.8, a_1=0.4, a_2=0.3, tilt_1=1.0, tilt_2=2.0,
+            phi_12=1.7, phi_jl=0.3, luminosity_distance=1000.0, theta_jn=0.4, psi=0.659,
+            phase=1.3, geocent_time=1126259642.01, ra=1.375, dec=-1.2108)
+        self.wide = self.basis(10, 40, 12, 6)
+        self.low = self.basis(10, 20, 6, 3)
+        self.high = self.basis(20, 40, 8, 4)
+
+    def tearDown(self):
+        del self.interferometers
+        del self.waveform_generator
+        del self.priors
+
+    def basis(self, minimum_chirp_mass, maximum_chirp_mass, number_linear, number_quadratic, duration=4,
+              minimum_component_mass=1.):
+        number_of_frequencies = int(108 * duration) + 1
+        return dict(
+            linear_matrix=(
+                np.random.normal(size=(number_of_frequencies, number_linear))
+                + 1j * np.random.normal(size=(number_of_frequencies, number_linear))),
+            quadratic_matrix=np.random.normal(size=(number_of_frequencies, number_quadratic)),
+            frequency_nodes_linear=np.linspace(20, 128, number_linear),
+            frequency_nodes_quadratic=np.linspace(20, 128, number_quadratic),
+            roq_params=np.array(
+                (20., 128., duration, minimum_chirp_mass, maximum_chirp_mass, minimum_component_mass),
+                dtype=[(name, float) for name in ["flow", "fhigh", "seglen", "chirpmassmin", "chirpmassmax", "compmin"]]
+            ),
+        )
+
+    def get_likelihood(self, bases, **kwargs):
+        return bilby.gw.likelihood.MultiBasisROQGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=self.waveform_generator,
+            priors=self.priors,
+            bases=bases,
+            **kwargs
+        )
+
+    def single_basis_log_likelihood_ratio(self, basis):
+        waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=self.duration,
+            sampling_frequency=self.sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.binary_black_hole_roq,
+            parameter_conversion=bilby.gw.conversion.convert_to_lal_binary_black_hole_parameters,
+            waveform_arguments=dict(
+                waveform_approximant="IMRPhenomPv2", reference_frequency=20,
+                frequency_nodes_linear=basis["frequency_nodes_linear"],
+                frequency_nodes_quadratic=basis["frequency_nodes_quadratic"]),
+        )
+        like = bilby.gw.likelihood.ROQGravitationalWaveTransient(
+            interferometers=self.interferometers,
+            waveform_generator=waveform_generator,
+            priors=self.priors,
+            linear_matrix=basis["linear_matrix"],
+            quadratic_matrix=basis["quadratic_matrix"],
+            roq_params=basis["roq_params"],
+            roq_params_check=False,
+        )
+        like.parameters.update(self.parameters)
+        return like.log_likelihood_ratio()
+
+    def test_bases_sorted_by_size(self):
+        like = self.get_likelihood([self.wide, self.high, self.low])
+        self.assertEqual(
+            [len(basis["frequency_nodes_linear"]) for basis in like.bases], [6, 8, 12])
+
+    def test_smallest_valid_basis_matches_single_basis_likelihood(self):
+        like = self.get_likelihood([self.wide, self.low, self.high])
+        for chirp_mass, basis in [(15.0, self.low), (30.0, self.high)]:
+            self.parameters["chirp_mass"] = chirp_mass
+            like.parameters.update(self.parameters)
+            self.assertAlmostEqual(
+                like.log_likelihood_ratio(), self.single_basis_log_likelihood_ratio(basis), 10)
+            self.assertIs(like.frequency_nodes_linear, basis["frequency_nodes_linear"])
+
+    def test_weights_built_lazily(self):
+        like = self.get_likelihood([self.wide, self.low, self.high])
+        self.assertEqual(sum(weights is not None for weights in like._basis_weights), 1)
+        self.parameters["chirp_mass"] = 30.0
+        like.parameters.update(self.parameters)
+        like.log_likelihood_ratio()
+        self.assertEqual(sum(weights is not None for weights in like._basis_weights), 2)
+        self.assertIsNone(like._basis_weights[2])
+        weights = like.weights
+        like.log_likelihood_ratio()
+        self.assertIs(like.weights, weights)
+
+    def test_component_masses(self):
+        like = self.get_likelihood([self.low, self.high])
+        like.parameters.update(self.parameters)
+        expected = like.log_likelihood_ratio()
+        parameters, _ = bilby.gw.conversion.convert_to_lal_binary_black_hole_parameters(self.parameters.copy())
+        for key in ["chirp_mass", "mass_ratio"]:
+            like.parameters.pop(key)
+        like.parameters.update(mass_1=parameters["mass_1"], mass_2=parameters["mass_2"])
+        self.assertAlmostEqual(like.log_likelihood_ratio(), expected, 10)
+
+    def test_basis_with_wrong_duration_discarded(self):
+        like = self.get_likelihood([self.wide, self.basis(10, 40, 4, 2, duration=8)])
+        self.assertEqual(len(like.bases), 1)
+        self.assertEqual(len(like.bases[0]["frequency_nodes_linear"]), 12)
+
+    def test_no_valid_basis_raises(self):
+        with self.assertRaises(BilbyROQParamsRangeError):
+            self.get_likelihood([self.basis(10, 40, 4, 2, duration=8)])
+
+    def test_prior_not_covered_raises(self):
+        with self.assertRaises(BilbyROQParamsRangeError):
+            self.get_likelihood([self.low, self.basis(25, 40, 4, 2)])
+
+    def test_basis_selected_by_minimum_component_mass(self):
+        heavy = self.basis(10, 40, 6, 3, minimum_component_mass=5.)
+        light = self.basis(10, 40, 12, 6, minimum_component_mass=1.)
+        like = self.get_likelihood([heavy, light])
+        for chirp_mass, mass_ratio, basis in [(15.0, 0.8, heavy), (10.0, 0.125, light)]:
+            self.parameters.update(chirp_mass=chirp_mass, mass_ratio=mass_ratio)
+            like.parameters.update(self.parameters)
+            self.assertAlmostEqual(
+                like.log_likelihood_ratio(), self.single_basis_log_likelihood_ratio(basis), 10)
+            self.assertIs(like.frequency_nodes_linear, basis["frequency_nodes_linear"])
+
+    def test_prior_component_mass_not_covered_raises(self):
+        # mass_2 >= 5 requires chirp_mass >= 11.2 for mass_ratio >= 0.125
+        heavy = self.basis(10, 40, 6, 3, minimum_component_mass=5.)
+        with self.assertRaises(BilbyROQParamsRangeError):
+            self.get_likelihood([heavy])
+        with self.assertRaises(BilbyROQParamsRangeError):
+            self.get_likelihood([heavy, self.basis(10, 11, 12, 6, minimum_component_mass=1.)])
+        like = self.get_likelihood([heavy, self.basis(10, 12, 12, 6, minimum_component_mass=1.)])
+        self.assertEqual(len(like.bases), 2)
+
+    def test_chirp_mass_outside_bases(self):
+        like = self.get_likelihood([self.low], roq_params_check=False)
+        self.parameters["chirp_mass"] = 30.0
+        like.parameters.update(self.parameters)
+        self.assertEqual(like.log_likelihood_ratio(), np.nan_to_num(-np.inf))
+
+
 class TestRescaledROQLikelihood(unittest.TestCase):
     def test_rescaling(self):
 
@@ -1142,6 +1881,14 @@ class TestMBLikelihood(unittest.TestCase):
             5e-3
         )
 
+    def test_banded_time_shift_phasor(self):
+        """
+        Check the time-shift phasor computed band by band matches the direct evaluation.
+        """
+        time_shift = 14.0123
+        expected = np.exp(-2j * np.pi * self.mb_22.banded_frequency_points * time_shift)
+        self.assertLess(max(abs(self.mb_22._banded_time_shift_phasor(time_shift) - expected)), 1e-10)
+
     def test_homs(self):
         """
         Check if multi-banding likelihood matches the original likelihood for higher-order moments.
@@ -1166,5 +1913,250 @@ class TestMBLikelihood(unittest.TestCase):
         )
 
 
+class TestMBLikelihoodSetupCache(unittest.TestCase):
+    def setUp(self):
+        duration = 16
+        fmin = 20.
+        sampling_frequency = 2048.
+        self.test_parameters = dict(
+            chirp_mass=6.0, mass_ratio=0.5, a_1=0.0, a_2=0.0, tilt_1=0.0, tilt_2=0.0, phi_12=0.0, phi_jl=0.0,
+            luminosity_distance=200.0, theta_jn=0.4, psi=0.659, phase=1.3, geocent_time=1187008882, ra=1.3, dec=-1.2
+        )
+        self.interferometers = bilby.gw.detector.InterferometerList(["H1", "L1"])
+        np.random.seed(170817)
+        self.interferometers.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=sampling_frequency, duration=duration,
+            start_time=self.test_parameters['geocent_time'] - duration + 2.
+        )
+        for ifo in self.interferometers:
+            ifo.minimum_frequency = fmin
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors.pop("mass_1")
+        self.priors.pop("mass_2")
+        self.priors["chirp_mass"] = bilby.core.prior.Uniform(5.5, 6.5)
+        self.priors["mass_ratio"] = bilby.core.prior.Uniform(0.125, 1)
+        self.priors["geocent_time"] = bilby.core.prior.Uniform(
+            self.test_parameters['geocent_time'] - 0.1,
+            self.test_parameters['geocent_time'] + 0.1)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=duration, sampling_frequency=sampling_frequency,
+            frequency_domain_source_model=bilby.gw.source.binary_black_hole_frequency_sequence,
+            waveform_arguments=dict(reference_frequency=fmin, approximant="IMRPhenomD")
+        )
+        self.directory = "outdir_mb_setup"
+
+    def tearDown(self):
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        del self.interferometers
+        del self.priors
+        del self.waveform_generator
+
+    def get_likelihood(self, **kwargs):
+        likelihood = bilby.gw.likelihood.MBGravitationalWaveTransient(
+            interferometers=self.interferometers, waveform_generator=deepcopy(self.waveform_generator),
+            reference_chirp_mass=self.test_parameters['chirp_mass'], priors=self.priors.copy(), **kwargs
+        )
+        likelihood.parameters.update(self.test_parameters)
+        return likelihood
+
+    def test_cached_setup_matches(self):
+        for linear_interpolation in [True, False]:
+            likelihood = self.get_likelihood(
+                linear_interpolation=linear_interpolation, setup_cache_directory=self.directory)
+            with mock.patch.object(
+                bilby.gw.likelihood.MBGravitationalWaveTransient, "_setup_linear_coefficients"
+            ) as setup:
+                cached_likelihood = self.get_likelihood(
+                    linear_interpolation=linear_interpolation, setup_cache_directory=self.directory)
+                setup.assert_not_called()
+            self.assertEqual(cached_likelihood.durations, likelihood.durations)
+            self.assertEqual(cached_likelihood.Ks_Ke, likelihood.Ks_Ke)
+            self.assertTrue(np.array_equal(
+                cached_likelihood.waveform_generator.waveform_arguments['frequencies'],
+                likelihood.waveform_generator.waveform_arguments['frequencies']))
+            self.assertEqual(cached_likelihood.log_likelihood_ratio(), likelihood.log_likelihood_ratio())
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_changed_data_not_read_from_cache(self):
+        self.get_likelihood(setup_cache_directory=self.directory)
+        self.interferometers[0].minimum_frequency = 30.
+        with mock.patch.object(bilby.gw.likelihood.MBGravitationalWaveTransient, "_load_setup") as load:
+            self.get_likelihood(setup_cache_directory=self.directory)
+            load.assert_not_called()
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_no_cache_by_default(self):
+        with mock.patch.object(bilby.gw.likelihood.MBGravitationalWaveTransient, "_cache_setup") as cache:
+            self.get_likelihood()
+            cache.assert_not_called()
+
+
+class TestRelativeBinningLikelihood(unittest.TestCase):
+    def setUp(self):
+        duration = 8
+        fmin = 20.
+        sampling_frequency = 2048.
+        self.test_parameters = dict(
+            mass_1=12.0,
+            mass_2=8.0,
+            a_1=0.2,
+            a_2=0.1,
+            tilt_1=0.0,
+            tilt_2=0.0,
+            phi_12=0.0,
+            phi_jl=0.0,
+            luminosity_distance=300.0,
+            theta_jn=0.4,
+            psi=0.659,
+            phase=1.3,
+            H_eff5=0.5,
+            H_eff8=0.2,
+            Q_tilde=0.5,
+            geocent_time=1187008882,
+            ra=1.3,
+            dec=-1.2
+        )
+
+        ifos = bilby.gw.detector.InterferometerList(["H1", "L1"])
+        np.random.seed(170817)
+        ifos.set_strain_data_from_power_spectral_densities(
+            sampling_frequency=sampling_frequency, duration=duration,
+            start_time=self.test_parameters['geocent_time'] - duration + 2.
+        )
+        for ifo in ifos:
+            ifo.minimum_frequency = fmin
+
+        self.priors = bilby.gw.prior.BBHPriorDict()
+        self.priors["geocent_time"] = bilby.core.prior.Uniform(
+            self.test_parameters['geocent_time'] - 0.1,
+            self.test_parameters['geocent_time'] + 0.1)
+
+        waveform_arguments = dict(reference_frequency=fmin, minimum_frequency=fmin)
+        wfg = bilby.gw.WaveformGenerator(
+            duration=duration, sampling_frequency=sampling_frequency,
+            frequency_domain_source_model=bilby.gw.taylorf2.binary_black_hole_heated_taylor_f2,
+            waveform_arguments=waveform_arguments
+        )
+        ifos.inject_signal(parameters=self.test_parameters, waveform_generator=wfg)
+        self.ifos = ifos
+        self.wfg = wfg
+
+        self.non_rb = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=ifos, waveform_generator=wfg
+        )
+        self.rb = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=ifos, waveform_generator=deepcopy(wfg),
+            fiducial_parameters=self.test_parameters
+        )
+        self.shifted_parameters = self.test_parameters.copy()
+        self.shifted_parameters.update(H_eff5=0.8, H_eff8=0.1, mass_1=12.001)
+
+    def tearDown(self):
+        del (
+            self.non_rb,
+            self.rb,
+            self.ifos,
+            self.wfg,
+            self.priors
+        )
+
+    def test_matches_non_rb_at_fiducial(self):
+        self.non_rb.parameters.update(self.test_parameters)
+        self.rb.parameters.update(self.test_parameters)
+        self.assertAlmostEqual(
+            self.non_rb.log_likelihood_ratio(), self.rb.log_likelihood_ratio(), 8
+        )
+
+    def test_matches_non_rb(self):
+        self.non_rb.parameters.update(self.shifted_parameters)
+        self.rb.parameters.update(self.shifted_parameters)
+        self.assertLess(
+            abs(self.non_rb.log_likelihood_ratio() - self.rb.log_likelihood_ratio()),
+            1e-2
+        )
+
+    def test_smaller_epsilon_increases_accuracy(self):
+        rb_more_accurate = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.ifos, waveform_generator=deepcopy(self.wfg),
+            fiducial_parameters=self.test_parameters, epsilon=0.05
+        )
+        self.assertGreater(rb_more_accurate.number_of_bins, self.rb.number_of_bins)
+        for likelihood in [self.non_rb, self.rb, rb_more_accurate]:
+            likelihood.parameters.update(self.shifted_parameters)
+        self.assertLess(
+            abs(self.non_rb.log_likelihood_ratio() - rb_more_accurate.log_likelihood_ratio()),
+            abs(self.non_rb.log_likelihood_ratio() - self.rb.log_likelihood_ratio())
+        )
+
+    def test_time_phase_marginalisation(self):
+        non_rb = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.ifos, waveform_generator=self.wfg,
+            priors=self.priors.copy(), time_marginalization=True,
+            phase_marginalization=True, jitter_time=False
+        )
+        rb = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.ifos, waveform_generator=deepcopy(self.wfg),
+            fiducial_parameters=self.test_parameters, priors=self.priors.copy(),
+            time_marginalization=True, phase_marginalization=True, jitter_time=False
+        )
+        parameters = self.shifted_parameters.copy()
+        parameters["geocent_time"] = float(self.ifos.start_time)
+        non_rb.parameters.update(parameters)
+        rb.parameters.update(parameters)
+        self.assertLess(
+            abs(non_rb.log_likelihood_ratio() - rb.log_likelihood_ratio()),
+            1e-2
+        )
+        new_time = rb.generate_posterior_sample_from_marginalized_likelihood()["geocent_time"]
+        self.assertLess(abs(new_time - self.test_parameters["geocent_time"]), 1e-3)
+
+    def test_time_shifted_summary_data_matches_direct_evaluation(self):
+        rb = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.ifos, waveform_generator=deepcopy(self.wfg),
+            fiducial_parameters=self.test_parameters, priors=self.priors.copy(),
+            time_marginalization=True, jitter_time=False
+        )
+        frequencies = self.ifos.frequency_array[rb._band_indices]
+        integrand = np.random.normal(size=len(frequencies)) + 1j * np.random.normal(size=len(frequencies))
+        rb._time_window = np.append(rb._time_window, rb._time_window[-1] + 10)
+        a0_tc, a1_tc = rb._time_shifted_bin_sums(integrand, frequencies)
+        for ii, index in enumerate(rb._time_window):
+            shifted = integrand * np.exp(2j * np.pi * frequencies * index * rb._delta_tc)
+            self.assertLess(max(abs(a0_tc[ii] - rb._bin_sum(shifted))), 1e-10 * max(abs(a0_tc[ii])))
+            self.assertLess(
+                max(abs(a1_tc[ii] - rb._bin_sum(shifted * rb._offsets_from_bin_centers))),
+                1e-10 * max(abs(a1_tc[ii])))
+
+    @mock.patch.object(
+        bilby.gw.likelihood.GravitationalWaveTransient, "_lookup_table_shape", (100, 200)
+    )
+    def test_distance_marginalisation(self):
+        directory = "outdir_relative_binning_distance"
+        os.mkdir(directory)
+        self.addCleanup(shutil.rmtree, directory)
+        lookup_table = os.path.join(directory, "lookup.npz")
+        non_rb = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=self.ifos, waveform_generator=self.wfg,
+            priors=self.priors.copy(), distance_marginalization=True,
+            distance_marginalization_lookup_table=lookup_table
+        )
+        rb = bilby.gw.likelihood.RelativeBinningGravitationalWaveTransient(
+            interferometers=self.ifos, waveform_generator=deepcopy(self.wfg),
+            fiducial_parameters=self.test_parameters, priors=self.priors.copy(),
+            distance_marginalization=True,
+            distance_marginalization_lookup_table=lookup_table
+        )
+        np.testing.assert_array_equal(
+            non_rb._dist_margd_loglikelihood_array, rb._dist_margd_loglikelihood_array
+        )
+        non_rb.parameters.update(self.shifted_parameters)
+        rb.parameters.update(self.shifted_parameters)
+        self.assertLess(
+            abs(non_rb.log_likelihood_ratio() - rb.log_likelihood_ratio()),
+            1e-2
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
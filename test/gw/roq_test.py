@@ -0,0 +1,127 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+import bilby
+from bilby.gw import roq
+
+
+class TestGreedyAlgorithms(unittest.TestCase):
+    def setUp(self):
+        frequencies = np.linspace(20, 100, 400)
+        self.training_set = np.array([
+            np.exp(-2j * np.pi * frequencies ** (-5 / 3) * chirp) for chirp in np.linspace(100, 110, 50)])
+
+    def tearDown(self):
+        del self.training_set
+
+    def test_reduced_basis_is_orthonormal(self):
+        basis, errors = roq.greedy_reduced_basis(self.training_set, tolerance=1e-10)
+        np.testing.assert_allclose(basis @ basis.conjugate().T, np.eye(len(basis)), atol=1e-12)
+        self.assertLess(errors[-1], 1e-10)
+
+    def test_maximum_basis_size(self):
+        basis, errors = roq.greedy_reduced_basis(self.training_set, tolerance=0, maximum_basis_size=3)
+        self.assertEqual(len(basis), 3)
+
+    def test_interpolant_is_identity_at_nodes(self):
+        basis, _ = roq.greedy_reduced_basis(self.training_set, tolerance=1e-10)
+        nodes, interpolant = roq.empirical_interpolation(basis)
+        self.assertEqual(len(np.unique(nodes)), len(basis))
+        np.testing.assert_allclose(interpolant[:, nodes], np.eye(len(basis)), atol=1e-10)
+        for vector in self.training_set:
+            self.assertLess(
+                np.linalg.norm(vector[nodes] @ interpolant - vector) / np.linalg.norm(vector), 1e-3)
+
+
+class TestROQBasisBuilder(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(170817)
+        self.outdir = "outdir_roq_test"
+        self.priors = bilby.gw.prior.BBHPriorDict(aligned_spin=True)
+        self.priors.pop("mass_1")
+        self.priors.pop("mass_2")
+        self.priors["chirp_mass"] = bilby.core.prior.Uniform(20, 25)
+        self.priors["mass_ratio"] = bilby.core.prior.Uniform(0.5, 1)
+        self.priors["chi_1"] = bilby.core.prior.Uniform(-0.3, 0.3)
+        self.priors["chi_2"] = bilby.core.prior.Uniform(-0.3, 0.3)
+        self.priors["luminosity_distance"] = 500.0
+        self.priors["geocent_time"] = bilby.core.prior.Uniform(1.19, 1.21)
+        self.waveform_arguments = dict(
+            waveform_approximant="IMRPhenomD", reference_frequency=20.0, minimum_frequency=20.0)
+        self.builder = roq.ROQBasisBuilder(
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole,
+            priors=self.priors, minimum_frequency=20.0, maximum_frequency=256.0,
+            duration=4, waveform_arguments=self.waveform_arguments,
+            number_of_training_waveforms=200, linear_tolerance=1e-10,
+            quadratic_tolerance=1e-10)
+
+    def tearDown(self):
+        del self.builder
+        del self.priors
+        if os.path.isdir(self.outdir):
+            shutil.rmtree(self.outdir)
+
+    def test_write_before_build_raises(self):
+        with self.assertRaises(ValueError):
+            self.builder.write(self.outdir)
+
+    def test_roq_likelihood_matches_non_roq(self):
+        self.builder.build()
+        self.builder.write(self.outdir)
+        test_parameters = dict(
+            chirp_mass=22.0, mass_ratio=0.8, chi_1=0.1, chi_2=-0.1,
+            luminosity_distance=400.0, theta_jn=0.4, psi=0.659, phase=1.3,
+            geocent_time=1.2, ra=1.3, dec=-1.2)
+
+        ifos = bilby.gw.detector.InterferometerList(["H1"])
+        ifos.set_strain_data_from_power_spectral_densities(sampling_frequency=512, duration=4)
+        for ifo in ifos:
+            ifo.minimum_frequency = 20.0
+        non_roq_wfg = bilby.gw.WaveformGenerator(
+            duration=4, sampling_frequency=512,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole,
+            waveform_arguments=self.waveform_arguments)
+        ifos.inject_signal(parameters=test_parameters, waveform_generator=non_roq_wfg)
+        roq_wfg = bilby.gw.WaveformGenerator(
+            duration=4, sampling_frequency=512,
+            frequency_domain_source_model=bilby.gw.source.binary_black_hole_roq,
+            waveform_arguments=dict(
+                frequency_nodes_linear=np.load(os.path.join(self.outdir, "fnodes_linear.npy")),
+                frequency_nodes_quadratic=np.load(os.path.join(self.outdir, "fnodes_quadratic.npy")),
+                **self.waveform_arguments))
+        non_roq = bilby.gw.likelihood.GravitationalWaveTransient(
+            interferometers=ifos, waveform_generator=non_roq_wfg)
+        roq_likelihood = bilby.gw.likelihood.ROQGravitationalWaveTransient(
+            interferometers=ifos, waveform_generator=roq_wfg, priors=self.priors,
+            linear_matrix=os.path.join(self.outdir, "B_linear.npy"),
+            quadratic_matrix=os.path.join(self.outdir, "B_quadratic.npy"),
+            roq_params=os.path.join(self.outdir, "params.dat"))
+        non_roq.parameters.update(test_parameters)
+        roq_likelihood.parameters.update(test_parameters)
+        self.assertLess(
+            abs(non_roq.log_likelihood_ratio() - roq_likelihood.log_likelihood_ratio())
+            / non_roq.log_likelihood_ratio(),
+            1e-3)
+
+    def test_tidal_heating_basis(self):
+        priors = self.priors.copy()
+        priors["H_eff5"] = bilby.core.prior.Uniform(-1, 1)
+        priors["H_eff8"] = bilby.core.prior.Uniform(-1, 1)
+        priors["Q_tilde"] = bilby.core.prior.Uniform(-0.1, 0.1)
+        builder = roq.ROQBasisBuilder(
+            frequency_domain_source_model=bilby.gw.taylorf2.binary_black_hole_heated_taylor_f2,
+            priors=priors, minimum_frequency=20.0, maximum_frequency=128.0,
+            duration=4, waveform_arguments=dict(reference_frequency=20.0, minimum_frequency=20.0),
+            number_of_training_waveforms=400, linear_tolerance=1e-10,
+            quadratic_tolerance=1e-10)
+        builder.build()
+        linear_errors, quadratic_errors = builder.validate(20)
+        self.assertLess(np.max(linear_errors), 1e-3)
+        self.assertLess(np.max(quadratic_errors), 1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -95,6 +95,109 @@ class TestLalBBH(unittest.TestCase):
         self.assertFalse(np.all(out_v223["plus"] == out_v102["plus"]))
 
 
+class TestLalBBHTidalHeating(unittest.TestCase):
+    def setUp(self):
+        self.parameters = dict(
+            mass_1=30.0,
+            mass_2=25.0,
+            luminosity_distance=400.0,
+            a_1=0.4,
+            tilt_1=0.0,
+            phi_12=0.0,
+            a_2=0.3,
+            tilt_2=np.pi,
+            phi_jl=0.0,
+            theta_jn=0.3,
+            phase=0.0,
+            H_eff5=0.5,
+            H_eff8=0.3,
+            Q_tilde=1.0,
+        )
+        self.frequency_array = bilby.core.utils.create_frequency_series(2048, 4)
+
+    def tearDown(self):
+        del self.parameters
+        del self.frequency_array
+
+    @staticmethod
+    def _direct_phase_TH(
+            frequency_array, mass_1, mass_2, a_1, a_2, spin_1z, spin_2z,
+            H_eff5, H_eff8, Q_tilde, start_frequency, delta_frequency):
+        m = mass_1 + mass_2
+        eta = mass_1 * mass_2 / m**2
+        min_index = int(start_frequency / delta_frequency)
+        v = np.cbrt(lal.PI * lal.G_SI * m * frequency_array[min_index:]) / lal.C_SI
+        phase_term1 = 3.0 / (128.0 * eta * v**5)
+        term_QM = -(25 * Q_tilde) / (32 * eta * v)
+        term_v7 = -5 * v**7 * (952 * eta + 995) / 168.0 * H_eff5
+        term_v5 = -10 * v**5 * (3 * np.log(v) + 1) / 9. * H_eff5
+        Psi_SO = 1. / 6. * ((-56 * eta - 73 * (np.sqrt(1 - 4 * eta) - 1)) * spin_1z * a_1 +
+                            (-56 * eta - 73 * (np.sqrt(1 - 4 * eta) - 1)) * spin_2z * a_2)
+        term_v8 = 5 * v**8 * (3 * np.log(v) - 1) / 9.0 * (H_eff5 * Psi_SO - 4 * H_eff8)
+        delta_phase = phase_term1 * (term_v5 + term_v7 + term_v8) + term_QM
+        return np.concatenate((np.zeros(min_index), delta_phase))
+
+    def test_phase_TH_matches_direct_evaluation(self):
+        kwargs = dict(
+            mass_1=30 * lal.MSUN_SI, mass_2=25 * lal.MSUN_SI, a_1=0.4, a_2=0.3,
+            spin_1z=0.4, spin_2z=-0.3, H_eff5=0.5, H_eff8=0.3, Q_tilde=1.0,
+            start_frequency=20.0, delta_frequency=0.25)
+        expected = self._direct_phase_TH(self.frequency_array, **kwargs)
+        kwargs.update(spin_1x=0, spin_1y=0, spin_2x=0, spin_2y=0)
+        for _ in range(2):
+            delta_phase = bilby.gw.source.phase_TH(self.frequency_array, **kwargs)
+            self.assertLess(np.max(abs(delta_phase - expected)), 1e-10 * np.max(abs(expected)))
+
+    def test_phase_TH_writes_into_output_buffer(self):
+        buffer = np.ones_like(self.frequency_array)
+        out = bilby.gw.source.phase_TH(
+            self.frequency_array, mass_1=30 * lal.MSUN_SI, mass_2=25 * lal.MSUN_SI,
+            a_1=0.4, a_2=0.3, spin_1x=0, spin_1y=0, spin_1z=0.4, spin_2x=0,
+            spin_2y=0, spin_2z=-0.3, H_eff5=0.5, H_eff8=0.3, Q_tilde=1.0,
+            start_frequency=20.0, delta_frequency=0.25, out=buffer)
+        self.assertIs(out, buffer)
+        self.assertTrue(np.all(buffer[:80] == 0))
+
+    def test_phase_TH_returns_new_arrays(self):
+        kwargs = dict(
+            mass_1=30 * lal.MSUN_SI, mass_2=25 * lal.MSUN_SI, a_1=0.4, a_2=0.3,
+            spin_1x=0, spin_1y=0, spin_1z=0.4, spin_2x=0, spin_2y=0, spin_2z=-0.3,
+            H_eff5=0.5, H_eff8=0.3, Q_tilde=1.0, start_frequency=20.0, delta_frequency=0.25)
+        first = bilby.gw.source.phase_TH(self.frequency_array, **kwargs)
+        expected = first.copy()
+        kwargs.update(H_eff5=-0.2, Q_tilde=3.0)
+        second = bilby.gw.source.phase_TH(self.frequency_array, **kwargs)
+        self.assertFalse(np.array_equal(first, second))
+        self.assertTrue(np.array_equal(first, expected))
+        expected = second.copy()
+        second[:] = 0
+        self.assertTrue(np.array_equal(bilby.gw.source.phase_TH(self.frequency_array, **kwargs), expected))
+
+    def test_frequency_powers_cache_is_least_recently_used(self):
+        maximum = bilby.gw.source._MAXIMUM_TIDAL_HEATING_CACHE_ENTRIES
+        frequency_arrays = [self.frequency_array[:1000 + ii] for ii in range(maximum)]
+        powers = [bilby.gw.source._get_tidal_heating_frequency_powers(frequencies, 80)
+                  for frequencies in frequency_arrays]
+        for frequencies, cached in zip(frequency_arrays, powers):
+            self.assertIs(cached, bilby.gw.source._get_tidal_heating_frequency_powers(frequencies, 80))
+        bilby.gw.source._get_tidal_heating_frequency_powers(self.frequency_array[:999], 80)
+        self.assertEqual(len(bilby.gw.source._TIDAL_HEATING_FREQUENCY_POWERS), maximum)
+        self.assertIsNot(
+            powers[0], bilby.gw.source._get_tidal_heating_frequency_powers(frequency_arrays[0], 80))
+        self.assertFalse(powers[0].log_frequencies.flags.writeable)
+
+    def test_tidal_heating_reduces_to_taylorf2(self):
+        self.parameters.update(H_eff5=0.0, H_eff8=0.0, Q_tilde=0.0)
+        heated = bilby.gw.source.lal_binary_black_hole_tidal_heating(
+            self.frequency_array, **self.parameters)
+        for key in ["H_eff5", "H_eff8", "Q_tilde"]:
+            del self.parameters[key]
+        taylor_f2 = bilby.gw.source.lal_binary_black_hole(
+            self.frequency_array, waveform_approximant="TaylorF2", **self.parameters)
+        for mode in ["plus", "cross"]:
+            self.assertTrue(np.allclose(heated[mode], taylor_f2[mode], atol=0, rtol=1e-12))
+
+
 class TestLalBNS(unittest.TestCase):
     def setUp(self):
         self.parameters = dict(
@@ -423,5 +526,178 @@ class TestBNSfreqseq(unittest.TestCase):
             self.assertLess(diff / norm, 1e-5)
 
 
+class TestTidalHeatingFrequencySequence(unittest.TestCase):
+    def setUp(self):
+        self.parameters = dict(
+            mass_1=12.0,
+            mass_2=8.0,
+            luminosity_distance=400.0,
+            a_1=0.4,
+            a_2=0.3,
+            tilt_1=0.0,
+            tilt_2=np.pi,
+            phi_jl=0.0,
+            phi_12=0.0,
+            theta_jn=0.5,
+            phase=1.2,
+            H_eff5=0.7,
+            H_eff8=-0.3,
+            Q_tilde=0.05,
+        )
+        self.frequency_array = bilby.core.utils.create_frequency_series(2048, 8)
+        self.indices = np.unique(np.concatenate([
+            np.arange(100, 300), np.arange(300, len(self.frequency_array), 37)]))
+        self.frequencies = self.frequency_array[self.indices]
+
+    def tearDown(self):
+        del self.parameters
+        del self.frequency_array
+        del self.indices
+        del self.frequencies
+
+    def _assert_match(self, sequence, full, indices):
+        norm = np.max(abs(full["plus"]))
+        for mode in ["plus", "cross"]:
+            self.assertLess(np.max(abs(sequence[mode] - full[mode][indices])), 1e-10 * norm)
+            self.assertTrue(np.array_equal(sequence[mode] != 0, full[mode][indices] != 0))
+
+    def test_phase_TH_frequency_sequence_matches_phase_TH(self):
+        kwargs = dict(
+            mass_1=30 * lal.MSUN_SI, mass_2=25 * lal.MSUN_SI, a_1=0.4, a_2=0.3,
+            spin_1z=0.4, spin_2z=-0.3, H_eff5=0.5, H_eff8=0.3, Q_tilde=1.0)
+        expected = bilby.gw.source.phase_TH(
+            self.frequency_array, spin_1x=0, spin_1y=0, spin_2x=0, spin_2y=0,
+            start_frequency=20.0, delta_frequency=0.125, **kwargs)
+        for _ in range(2):
+            delta_phase = bilby.gw.source.phase_TH_frequency_sequence(
+                self.frequencies, start_frequency=20.0, **kwargs)
+            self.assertLess(
+                np.max(abs(delta_phase - expected[self.indices])),
+                1e-10 * np.max(abs(expected)))
+
+    def test_phase_TH_frequency_sequence_returns_new_arrays(self):
+        kwargs = dict(
+            mass_1=30 * lal.MSUN_SI, mass_2=25 * lal.MSUN_SI, a_1=0.4, a_2=0.3,
+            spin_1z=0.4, spin_2z=-0.3, H_eff5=0.5, H_eff8=0.3, Q_tilde=1.0,
+            start_frequency=20.0)
+        first = bilby.gw.source.phase_TH_frequency_sequence(self.frequencies, **kwargs)
+        expected = first.copy()
+        kwargs.update(H_eff5=-0.2, Q_tilde=3.0)
+        second = bilby.gw.source.phase_TH_frequency_sequence(self.frequencies, **kwargs)
+        self.assertFalse(np.array_equal(first, second))
+        self.assertTrue(np.array_equal(first, expected))
+
+    def test_match_lal_binary_black_hole_tidal_heating(self):
+        sequence = bilby.gw.source.binary_black_hole_tidal_heating_frequency_sequence(
+            self.frequency_array, frequencies=self.frequencies, **self.parameters)
+        full = bilby.gw.source.lal_binary_black_hole_tidal_heating(
+            self.frequency_array, **self.parameters)
+        self._assert_match(sequence, full, self.indices)
+
+    def test_match_lal_binary_neutron_star_tidal_heating(self):
+        self.parameters.update(mass_1=1.5, mass_2=1.3, lambda_1=300.0, lambda_2=500.0)
+        sequence = bilby.gw.source.binary_neutron_star_tidal_heating_frequency_sequence(
+            self.frequency_array, frequencies=self.frequencies, **self.parameters)
+        full = bilby.gw.source.lal_binary_neutron_star_tidal_heating(
+            self.frequency_array, **self.parameters)
+        self._assert_match(sequence, full, self.indices)
+
+    def test_roq_match_lal_binary_neutron_star_tidal_heating(self):
+        self.parameters.update(mass_1=1.5, mass_2=1.3, lambda_1=300.0, lambda_2=500.0)
+        quadratic_indices = self.indices[::3]
+        roq = bilby.gw.source.binary_neutron_star_tidal_heating_roq(
+            self.frequency_array, frequency_nodes_linear=self.frequencies,
+            frequency_nodes_quadratic=self.frequency_array[quadratic_indices],
+            **self.parameters)
+        full = bilby.gw.source.lal_binary_neutron_star_tidal_heating(
+            self.frequency_array, **self.parameters)
+        self._assert_match(roq["linear"], full, self.indices)
+        self._assert_match(roq["quadratic"], full, quadratic_indices)
+
+    def test_taylorf2_approximant_has_no_tidal_heating(self):
+        sequence = bilby.gw.source.binary_black_hole_tidal_heating_frequency_sequence(
+            self.frequency_array, frequencies=self.frequencies,
+            waveform_approximant="TaylorF2", **self.parameters)
+        for key in ["H_eff5", "H_eff8", "Q_tilde"]:
+            del self.parameters[key]
+        full = bilby.gw.source.lal_binary_black_hole(
+            self.frequency_array, waveform_approximant="TaylorF2", **self.parameters)
+        self._assert_match(sequence, full, self.indices)
+
+
+class TestLALWaveformContext(unittest.TestCase):
+    def setUp(self):
+        self.parameters = dict(
+            mass_1=1.5,
+            mass_2=1.3,
+            luminosity_distance=400.0,
+            a_1=0.4,
+            a_2=0.3,
+            tilt_1=0.0,
+            tilt_2=np.pi,
+            phi_jl=0.0,
+            phi_12=0.0,
+            theta_jn=0.5,
+            phase=1.2,
+            lambda_1=300.0,
+            lambda_2=500.0,
+        )
+        self.waveform_kwargs = dict(
+            waveform_approximant="TaylorF2", pn_spin_order=-1, pn_tidal_order=-1,
+            pn_phase_order=-1, pn_amplitude_order=0)
+        self.frequency_array = bilby.core.utils.create_frequency_series(2048, 8)
+
+    def tearDown(self):
+        del self.parameters
+        del self.waveform_kwargs
+        del self.frequency_array
+
+    def test_context_is_reused(self):
+        context = bilby.gw.source._get_lal_waveform_context("TaylorF2", self.waveform_kwargs)
+        self.assertIs(
+            context, bilby.gw.source._get_lal_waveform_context("TaylorF2", self.waveform_kwargs))
+        self.waveform_kwargs["mode_array"] = [[2, 2]]
+        self.assertIsNot(
+            context, bilby.gw.source._get_lal_waveform_context("TaylorF2", self.waveform_kwargs))
+
+    def test_lal_waveform_dictionary_is_not_cached(self):
+        self.waveform_kwargs["lal_waveform_dictionary"] = lal.CreateDict()
+        self.assertIsNot(
+            bilby.gw.source._get_lal_waveform_context("TaylorF2", self.waveform_kwargs),
+            bilby.gw.source._get_lal_waveform_context("TaylorF2", self.waveform_kwargs))
+
+    def test_fixing_one_tidal_deformability_keeps_the_other(self):
+        for fixed, sampled in [("TidalLambda1", "TidalLambda2"), ("TidalLambda2", "TidalLambda1")]:
+            self.waveform_kwargs[fixed] = 100.0
+            context = bilby.gw.source._get_lal_waveform_context("TaylorF2", self.waveform_kwargs)
+            waveform_dictionary = context.create_waveform_dictionary(
+                self.parameters["lambda_1"], self.parameters["lambda_2"])
+            expected = lal.CreateDict()
+            lalsimulation.SimInspiralWaveformParamsInsertTidalLambda1(expected, self.parameters["lambda_1"])
+            lalsimulation.SimInspiralWaveformParamsInsertTidalLambda2(expected, self.parameters["lambda_2"])
+            getattr(lalsimulation, "SimInspiralWaveformParamsInsert" + fixed)(expected, 100.0)
+            for key in [fixed, sampled]:
+                lookup = getattr(lalsimulation, "SimInspiralWaveformParamsLookup" + key)
+                self.assertEqual(lookup(waveform_dictionary), lookup(expected))
+            del self.waveform_kwargs[fixed]
+
+    def test_changing_tidal_parameters_match_new_dictionary(self):
+        frequencies = self.frequency_array[160::5]
+        for lambda_1 in [300.0, 0.0, 1000.0]:
+            self.parameters["lambda_1"] = lambda_1
+            for model, kwargs in [
+                    (bilby.gw.source.lal_binary_neutron_star, dict()),
+                    (bilby.gw.source.binary_neutron_star_frequency_sequence,
+                     dict(frequencies=frequencies))]:
+                waveform = model(
+                    self.frequency_array, waveform_approximant="TaylorF2",
+                    **kwargs, **self.parameters)
+                expected = model(
+                    self.frequency_array, waveform_approximant="TaylorF2",
+                    lal_waveform_dictionary=lal.CreateDict(), **kwargs, **self.parameters)
+                for mode in ["plus", "cross"]:
+                    self.assertTrue(np.array_equal(waveform[mode], expected[mode]))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+import bilby
+from bilby.gw import taylorf2
+
+
+class TestHeatedTaylorF2(unittest.TestCase):
+    def setUp(self):
+        self.parameters = dict(
+            mass_1=30.0,
+            mass_2=25.0,
+            luminosity_distance=400.0,
+            a_1=0.3,
+            tilt_1=0.0,
+            phi_12=0.0,
+            a_2=0.2,
+            tilt_2=np.pi,
+            phi_jl=0.0,
+            theta_jn=0.4,
+            phase=0.7,
+            H_eff5=0.5,
+            H_eff8=0.3,
+            Q_tilde=1.0,
+        )
+        self.waveform_kwargs = dict(
+            reference_frequency=50.0, minimum_frequency=20.0)
+        self.frequency_array = bilby.core.utils.create_frequency_series(4096, 8)
+
+    def tearDown(self):
+        del self.parameters
+        del self.waveform_kwargs
+        del self.frequency_array
+
+    def assert_waveforms_close(self, lal_waveform, numpy_waveform):
+        for mode in ["plus", "cross"]:
+            self.assertLess(
+                np.max(np.abs(lal_waveform[mode] - numpy_waveform[mode])),
+                1e-9 * np.max(np.abs(lal_waveform[mode])))
+            np.testing.assert_array_equal(
+                lal_waveform[mode] != 0, numpy_waveform[mode] != 0)
+
+    def test_binary_black_hole_matches_lal(self):
+        lal_waveform = bilby.gw.source.lal_binary_black_hole_tidal_heating(
+            self.frequency_array, **self.parameters, **self.waveform_kwargs)
+        numpy_waveform = taylorf2.binary_black_hole_heated_taylor_f2(
+            self.frequency_array, **self.parameters, **self.waveform_kwargs)
+        self.assert_waveforms_close(lal_waveform, numpy_waveform)
+
+    def test_binary_neutron_star_matches_lal(self):
+        self.parameters.update(
+            mass_1=1.5, mass_2=1.3, lambda_1=400.0, lambda_2=600.0)
+        lal_waveform = bilby.gw.source.lal_binary_neutron_star_tidal_heating(
+            self.frequency_array, **self.parameters, **self.waveform_kwargs)
+        numpy_waveform = taylorf2.binary_neutron_star_heated_taylor_f2(
+            self.frequency_array, **self.parameters, **self.waveform_kwargs)
+        self.assert_waveforms_close(lal_waveform, numpy_waveform)
+
+    def test_batch_matches_single_evaluations(self):
+        n_samples = 4
+        parameters = {key: np.full(n_samples, value) for key, value in self.parameters.items()}
+        parameters["mass_1"] = np.linspace(20, 40, n_samples)
+        parameters["H_eff5"] = np.linspace(-1, 1, n_samples)
+        batch = taylorf2.heated_taylor_f2(
+            self.frequency_array, **parameters, **self.waveform_kwargs)
+        self.assertEqual(batch["plus"].shape, (n_samples, len(self.frequency_array)))
+        for ii in range(n_samples):
+            single = taylorf2.heated_taylor_f2(
+                self.frequency_array, **{key: value[ii] for key, value in parameters.items()},
+                **self.waveform_kwargs)
+            for mode in ["plus", "cross"]:
+                np.testing.assert_allclose(batch[mode][ii], single[mode], rtol=1e-12, atol=0)
+
+    def test_unsupported_amplitude_order_raises(self):
+        with self.assertRaises(ValueError):
+            taylorf2.heated_taylor_f2(
+                self.frequency_array, pn_amplitude_order=1, **self.parameters)
+
+    def test_quadrupole_monopole_parameter_is_one_for_black_holes(self):
+        self.assertEqual(taylorf2.quadrupole_monopole_parameter_from_lambda(0.0), 1.0)
+        self.assertGreater(taylorf2.quadrupole_monopole_parameter_from_lambda(400.0), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
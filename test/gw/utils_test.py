@@ -64,6 +64,63 @@ class TestGWUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             gwutils.get_polarization_tensor(ra, dec, time, psi, "not-a-mode")
 
+    def test_get_polarization_basis(self):
+        ra = np.array([1, 1.5])
+        dec = np.array([2.0, -0.3])
+        time = 10
+        psi = 0.1
+        m, n, omega = gwutils.get_polarization_basis(ra, dec, time, psi)
+        self.assertEqual(m.shape, (3, 2))
+        for ii in range(2):
+            self.assertTrue(np.allclose(
+                np.outer(m[:, ii], m[:, ii]) - np.outer(n[:, ii], n[:, ii]),
+                gwutils.get_polarization_tensor(ra[ii], dec[ii], time, psi, "plus"),
+            ))
+            self.assertTrue(np.allclose(
+                np.outer(omega[:, ii], omega[:, ii]),
+                gwutils.get_polarization_tensor(ra[ii], dec[ii], time, psi, "longitudinal"),
+            ))
+
+    def test_greenwich_mean_sidereal_time_matches_lal(self):
+        times = 1126259642 + np.random.uniform(-10000, 10000, 20)
+        expected = np.array([lal.GreenwichMeanSiderealTime(tt) for tt in times])
+        self.assertTrue(np.array_equal(gwutils.greenwich_mean_sidereal_time(times), expected))
+        for tt, value in zip(times, expected):
+            self.assertEqual(gwutils.greenwich_mean_sidereal_time(tt), value)
+
+    def test_cached_greenwich_mean_sidereal_time_across_segment_boundary(self):
+        cache = gwutils.CachedGreenwichMeanSiderealTime()
+        boundary = 4096 * np.ceil(1126259642 / 4096)
+        times = boundary + np.linspace(-4096, 4096, 2001)
+        expected = np.array([lal.GreenwichMeanSiderealTime(tt) for tt in times])
+        self.assertLess(max(abs(cache(times) - expected)), 1e-8)
+        for tt, value in zip(times[::100], expected[::100]):
+            self.assertLess(abs(cache(tt) - value), 1e-8)
+
+    def test_cached_greenwich_mean_sidereal_time_is_bounded(self):
+        cache = gwutils.CachedGreenwichMeanSiderealTime(segment_length=16, maximum_segments=4)
+        times = 1126259642 + 16 * np.arange(10)
+        for tt in times:
+            cache(tt)
+            self.assertLessEqual(len(cache._references), 4)
+        self.assertEqual(
+            list(cache._references), list(np.floor(times[-4:] / 16))
+        )
+
+    def test_greenwich_mean_sidereal_time_across_leap_second(self):
+        cache = gwutils.CachedGreenwichMeanSiderealTime(segment_length=16)
+        times = 1167264018 + np.linspace(-20, 20, 81)
+        expected = np.array([lal.GreenwichMeanSiderealTime(tt) for tt in times])
+        self.assertTrue(np.allclose(cache(times), expected, atol=1e-8, rtol=0))
+
+    def test_time_shift_phasor(self):
+        frequencies = 20 + 0.25 * np.arange(1001)
+        for time_shift in [0, 1e-3, 1.2345, -37.5]:
+            self.assertLess(max(abs(
+                gwutils.time_shift_phasor(time_shift, 20, 0.25, 1001)
+                - np.exp(-2j * np.pi * time_shift * frequencies)
+            )), 1e-10)
+
     def test_inner_product(self):
         aa = np.array([1, 2, 3])
         bb = np.array([5, 6, 7])
@@ -622,5 +622,234 @@ class TestTimeDomainStrainMethod(unittest.TestCase):
         self.assertNotEqual(original_waveform, new_waveform)
 
 
+class TestTidalHeatingWaveformGenerator(unittest.TestCase):
+    def setUp(self):
+        self.parameters = dict(
+            mass_1=12.0, mass_2=8.0, luminosity_distance=400.0, a_1=0.4,
+            a_2=0.3, tilt_1=0.0, tilt_2=np.pi, phi_jl=0.0, phi_12=0.0,
+            theta_jn=0.5, phase=1.2, H_eff5=0.7, H_eff8=-0.3, Q_tilde=0.05,
+            ra=1.0, dec=0.3, psi=0.5, geocent_time=0.0)
+        self.model = MagicMock(
+            side_effect=bilby.gw.source.lal_binary_black_hole_tidal_heating)
+        self.waveform_generator = bilby.gw.waveform_generator.TidalHeatingWaveformGenerator(
+            duration=8, sampling_frequency=2048,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_tidal_heating)
+        self.waveform_generator.frequency_domain_source_model = self.model
+        self.reference_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=8, sampling_frequency=2048,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_tidal_heating)
+
+    def tearDown(self):
+        del self.parameters
+        del self.model
+        del self.waveform_generator
+        del self.reference_generator
+
+    def _assert_matches_reference(self, waveform, parameters):
+        expected = self.reference_generator.frequency_domain_strain(parameters)
+        for mode in ["plus", "cross"]:
+            self.assertLess(
+                np.max(abs(waveform[mode] - expected[mode])),
+                1e-10 * np.max(abs(expected[mode])))
+
+    def test_matches_waveform_generator(self):
+        waveform = self.waveform_generator.frequency_domain_strain(self.parameters)
+        self._assert_matches_reference(waveform, self.parameters)
+
+    def test_phase_parameters_reuse_base_waveform(self):
+        self.waveform_generator.frequency_domain_strain(self.parameters)
+        for H_eff5 in [0.1, -0.5]:
+            self.parameters.update(H_eff5=H_eff5, Q_tilde=H_eff5 / 10, ra=H_eff5)
+            waveform = self.waveform_generator.frequency_domain_strain(self.parameters)
+            self._assert_matches_reference(waveform, self.parameters)
+        self.assertEqual(self.model.call_count, 1)
+
+    def test_intrinsic_parameters_invalidate_base_waveform(self):
+        self.waveform_generator.frequency_domain_strain(self.parameters)
+        self.parameters["mass_1"] = 12.5
+        waveform = self.waveform_generator.frequency_domain_strain(self.parameters)
+        self._assert_matches_reference(waveform, self.parameters)
+        self.assertEqual(self.model.call_count, 2)
+
+    def test_frequency_sequence_model(self):
+        frequencies = self.reference_generator.frequency_array[160::7]
+        self.waveform_generator = bilby.gw.waveform_generator.TidalHeatingWaveformGenerator(
+            duration=8, sampling_frequency=2048,
+            frequency_domain_source_model=bilby.gw.source.binary_black_hole_tidal_heating_frequency_sequence,
+            waveform_arguments=dict(frequencies=frequencies))
+        self.waveform_generator.frequency_domain_strain(self.parameters)
+        self.parameters["H_eff8"] = 0.4
+        waveform = self.waveform_generator.frequency_domain_strain(self.parameters)
+        expected = bilby.gw.source.binary_black_hole_tidal_heating_frequency_sequence(
+            None, frequencies=frequencies,
+            **{key: self.parameters[key] for key in self.waveform_generator.source_parameter_keys})
+        for mode in ["plus", "cross"]:
+            self.assertLess(
+                np.max(abs(waveform[mode] - expected[mode])),
+                1e-10 * np.max(abs(expected[mode])))
+
+
+class TestWaveformCache(unittest.TestCase):
+    def setUp(self):
+        self.model = MagicMock(side_effect=dummy_func_dict_return_value)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1,
+            sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_dict_return_value,
+            cache_size=2,
+        )
+        self.waveform_generator.frequency_domain_source_model = self.model
+        self.simulation_parameters = dict(
+            amplitude=1e-2,
+            mu=100,
+            sigma=1,
+            ra=1.375,
+            dec=-1.2108,
+            geocent_time=1126259642.413,
+            psi=2.659,
+        )
+        self.other_parameters = dict(self.simulation_parameters, mu=200)
+
+    def tearDown(self):
+        del self.model
+        del self.waveform_generator
+        del self.simulation_parameters
+        del self.other_parameters
+
+    def test_alternating_parameters_hit_cache(self):
+        for _ in range(3):
+            self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+            self.waveform_generator.frequency_domain_strain(self.other_parameters)
+        self.assertEqual(self.model.call_count, 2)
+        statistics = self.waveform_generator.cache_statistics
+        self.assertEqual(statistics["hits"], 4)
+        self.assertEqual(statistics["misses"], 2)
+        self.assertEqual(statistics["evictions"], 0)
+        self.assertEqual(statistics["size"], 2)
+
+    def test_least_recently_used_is_evicted(self):
+        third_parameters = dict(self.simulation_parameters, mu=300)
+        for parameters in [self.simulation_parameters, self.other_parameters,
+                           self.simulation_parameters, third_parameters,
+                           self.simulation_parameters]:
+            self.waveform_generator.frequency_domain_strain(parameters)
+        self.assertEqual(self.model.call_count, 3)
+        self.assertEqual(self.waveform_generator.cache_statistics["evictions"], 1)
+        self.waveform_generator.frequency_domain_strain(self.other_parameters)
+        self.assertEqual(self.model.call_count, 4)
+
+    def test_memory_limit(self):
+        waveform = self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        nbytes = waveform["plus"].nbytes + waveform["cross"].nbytes
+        self.waveform_generator.cache.maximum_memory = 1.5 * nbytes
+        self.waveform_generator.frequency_domain_strain(self.other_parameters)
+        statistics = self.waveform_generator.cache_statistics
+        self.assertEqual(statistics["size"], 1)
+        self.assertEqual(statistics["memory"], nbytes)
+        self.assertEqual(statistics["evictions"], 1)
+
+    def test_array_arguments_are_keyed_on_content(self):
+        self.waveform_generator.waveform_arguments["frequencies"] = np.arange(3.)
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.waveform_generator.waveform_arguments["frequencies"] = np.arange(3.)
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(self.model.call_count, 1)
+        self.waveform_generator.waveform_arguments["frequencies"] = np.arange(1., 4.)
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(self.model.call_count, 2)
+
+    def test_array_digest_computed_once_per_array(self):
+        self.waveform_generator.waveform_arguments["frequencies"] = np.arange(3.)
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        with mock.patch("bilby.gw.waveform_generator.hashlib.sha1") as sha1:
+            self.waveform_generator.frequency_domain_strain(self.other_parameters)
+            self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+            sha1.assert_not_called()
+        self.assertEqual(self.model.call_count, 2)
+
+    def test_unhashable_arguments_are_not_cached(self):
+        self.waveform_generator.waveform_arguments["argument"] = [set()]
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.waveform_generator.waveform_arguments["argument"][0].add(1)
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        self.assertEqual(self.model.call_count, 2)
+        self.assertEqual(self.waveform_generator.cache_statistics["size"], 0)
+
+    def test_shared_cache_is_read_only(self):
+        self.waveform_generator.frequency_domain_strain(self.simulation_parameters)
+        shared_cache = self.waveform_generator.cache
+        shared_cache.read_only = True
+        other_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=1,
+            sampling_frequency=4096,
+            frequency_domain_source_model=dummy_func_dict_return_value,
+            shared_cache=shared_cache,
+        )
+        other_generator.frequency_domain_source_model = self.model
+        other_generator.frequency_domain_strain(self.simulation_parameters)
+        other_generator.frequency_domain_strain(self.other_parameters)
+        self.assertEqual(self.model.call_count, 2)
+        self.assertEqual(len(shared_cache), 1)
+        self.assertEqual(other_generator.cache_statistics["hits"], 1)
+        self.assertEqual(shared_cache.statistics["hits"], 0)
+        self.assertEqual(shared_cache.statistics["misses"], 1)
+
+    def test_invalid_cache_size(self):
+        with self.assertRaises(ValueError):
+            bilby.gw.waveform_generator.WaveformCache(maximum_size=0)
+
+
+class TestOutputBuffers(unittest.TestCase):
+    def setUp(self):
+        self.parameters = dict(
+            mass_1=12.0, mass_2=8.0, luminosity_distance=400.0, a_1=0.4,
+            a_2=0.3, tilt_1=0.0, tilt_2=np.pi, phi_jl=0.0, phi_12=0.0,
+            theta_jn=0.5, phase=1.2, H_eff5=0.7, H_eff8=-0.3, Q_tilde=0.05)
+        self.waveform_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=4, sampling_frequency=2048,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_tidal_heating,
+            reuse_output_buffers=True)
+        self.reference_generator = bilby.gw.waveform_generator.WaveformGenerator(
+            duration=4, sampling_frequency=2048,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_tidal_heating)
+
+    def tearDown(self):
+        del self.parameters
+        del self.waveform_generator
+        del self.reference_generator
+
+    def test_buffers_match_new_arrays(self):
+        previous = None
+        for mass_1, minimum_frequency in [(12.0, 20.0), (40.0, 20.0), (5.0, 30.0), (20.0, 10.0)]:
+            self.parameters["mass_1"] = mass_1
+            self.waveform_generator.waveform_arguments["minimum_frequency"] = minimum_frequency
+            self.reference_generator.waveform_arguments["minimum_frequency"] = minimum_frequency
+            waveform = self.waveform_generator.frequency_domain_strain(self.parameters)
+            expected = self.reference_generator.frequency_domain_strain(self.parameters)
+            for mode in ["plus", "cross"]:
+                self.assertTrue(np.array_equal(waveform[mode], expected[mode]))
+                if previous is not None:
+                    self.assertIs(waveform[mode], previous[mode])
+            previous = waveform
+
+    def test_buffers_are_not_shared_between_generators(self):
+        waveform_arguments = dict(minimum_frequency=20.0)
+        generators = [bilby.gw.waveform_generator.WaveformGenerator(
+            duration=4, sampling_frequency=2048,
+            frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_tidal_heating,
+            waveform_arguments=waveform_arguments, reuse_output_buffers=True)
+            for _ in range(2)]
+        self.assertNotIn("output_buffers", waveform_arguments)
+        waveforms = [generator.frequency_domain_strain(self.parameters) for generator in generators]
+        self.assertIsNot(waveforms[0]["plus"], waveforms[1]["plus"])
+
+    def test_buffers_require_single_entry_cache(self):
+        with self.assertRaises(ValueError):
+            bilby.gw.waveform_generator.WaveformGenerator(
+                duration=4, sampling_frequency=2048,
+                frequency_domain_source_model=bilby.gw.source.lal_binary_black_hole_tidal_heating,
+                reuse_output_buffers=True, cache_size=2)
+
+
 if __name__ == "__main__":
     unittest.main()